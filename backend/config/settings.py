@@ -56,17 +56,74 @@ class Settings(BaseSettings):
     embedding_dimension: int = Field(default=1536, env="EMBEDDING_DIMENSION")
     openai_embedding_model: str = Field(default="text-embedding-3-small", env="OPENAI_EMBEDDING_MODEL")
     gemini_embedding_model: str = Field(default="text-embedding-004", env="GEMINI_EMBEDDING_MODEL")
+    # Local CPU embeddings (EMBEDDING_PREFERRED=local); model dir holds model.onnx + tokenizer.json
+    local_embedding_model: str = Field(default="all-MiniLM-L6-v2", env="LOCAL_EMBEDDING_MODEL")
+    local_embedding_model_path: Optional[str] = Field(default=None, env="LOCAL_EMBEDDING_MODEL_PATH")
+    local_embedding_workers: int = Field(default=2, env="LOCAL_EMBEDDING_WORKERS")
+    local_embedding_batch_size: int = Field(default=32, env="LOCAL_EMBEDDING_BATCH_SIZE")
+    local_embedding_max_length: int = Field(default=256, env="LOCAL_EMBEDDING_MAX_LENGTH")
     # Optional API keys (providers read directly from env too)
     google_api_key: Optional[str] = Field(default=None, env="GOOGLE_API_KEY")
     gemini_api_key: Optional[str] = Field(default=None, env="GEMINI_API_KEY")
     # Embedding batching
     embedding_batch_size: int = Field(default=64, env="EMBEDDING_BATCH_SIZE")
+    # Content-addressed embedding cache (shared across sources and bots)
+    embedding_cache_enabled: bool = Field(default=True, env="EMBEDDING_CACHE_ENABLED")
+
+    # Chunking (large documents are split and tokenized across a process pool)
+    chunking_workers: int = Field(default=2, env="CHUNKING_WORKERS")
+    chunking_parallel_min_chars: int = Field(default=1_000_000, env="CHUNKING_PARALLEL_MIN_CHARS")
+    chunking_partition_chars: int = Field(default=250_000, env="CHUNKING_PARTITION_CHARS")
+
+    # PDF extraction: "pdfplumber" (layout-aware headings) or "pdfium" (fast plain text, needs pypdfium2)
+    pdf_backend: str = Field(default="pdfplumber", env="PDF_BACKEND")
+    pdf_workers: int = Field(default=2, env="PDF_WORKERS")
+    pdf_parallel_min_pages: int = Field(default=16, env="PDF_PARALLEL_MIN_PAGES")
+    pdf_pages_per_task: int = Field(default=8, env="PDF_PAGES_PER_TASK")
+    # OCR for pages without a text layer (needs pytesseract and the tesseract binary)
+    pdf_ocr_enabled: bool = Field(default=False, env="PDF_OCR_ENABLED")
+    pdf_ocr_workers: int = Field(default=2, env="PDF_OCR_WORKERS")
+    pdf_ocr_time_budget_seconds: float = Field(default=300.0, env="PDF_OCR_TIME_BUDGET_SECONDS")
+    pdf_ocr_dpi: int = Field(default=200, env="PDF_OCR_DPI")
+    pdf_ocr_language: str = Field(default="eng", env="PDF_OCR_LANGUAGE")
+
+    # Streaming ingestion (download -> pages -> chunks -> embed -> insert in batches)
+    ingest_chunk_batch_size: int = Field(default=64, env="INGEST_CHUNK_BATCH_SIZE")
+    # Downloads larger than this are spooled to a temp file instead of memory
+    ingest_spool_max_bytes: int = Field(default=8 * 1024 * 1024, env="INGEST_SPOOL_MAX_BYTES")
+    # Cache parser output in storage by file sha256 (retries/re-indexes skip download and parse)
+    parse_cache_enabled: bool = Field(default=True, env="PARSE_CACHE_ENABLED")
+    # ZIP bulk import: members are parsed in parallel, within these limits
+    zip_workers: int = Field(default=2, env="ZIP_WORKERS")
+    zip_max_files: int = Field(default=1000, env="ZIP_MAX_FILES")
+    zip_max_total_bytes: int = Field(default=200 * 1024 * 1024, env="ZIP_MAX_TOTAL_BYTES")
+
+    # Ingestion job queue (drained by worker.py processes, not the API)
+    ingest_worker_concurrency: int = Field(default=2, env="INGEST_WORKER_CONCURRENCY")
+    ingest_max_running_per_bot: int = Field(default=1, env="INGEST_MAX_RUNNING_PER_BOT")
+    ingest_job_max_attempts: int = Field(default=3, env="INGEST_JOB_MAX_ATTEMPTS")
+    ingest_job_backoff_base_seconds: float = Field(default=30.0, env="INGEST_JOB_BACKOFF_BASE_SECONDS")
+    ingest_job_backoff_max_seconds: float = Field(default=1800.0, env="INGEST_JOB_BACKOFF_MAX_SECONDS")
+    ingest_job_lease_seconds: int = Field(default=300, env="INGEST_JOB_LEASE_SECONDS")
+    ingest_job_poll_interval_seconds: float = Field(default=2.0, env="INGEST_JOB_POLL_INTERVAL_SECONDS")
 
     # Crawler settings
     crawler_render_js: bool = Field(default=True, env="CRAWLER_RENDER_JS")
+    crawler_js_max_contexts: int = Field(default=2, env="CRAWLER_JS_MAX_CONTEXTS")
     crawler_min_content_chars: int = Field(default=500, env="CRAWLER_MIN_CONTENT_CHARS")
+    crawler_extraction_mode: str = Field(default="fast", env="CRAWLER_EXTRACTION_MODE")
+    crawler_dedup_enabled: bool = Field(default=True, env="CRAWLER_DEDUP_ENABLED")
     crawler_max_depth: int = Field(default=1, env="CRAWLER_MAX_DEPTH")
     crawler_max_pages: int = Field(default=10, env="CRAWLER_MAX_PAGES")
+    crawler_concurrency: int = Field(default=4, env="CRAWLER_CONCURRENCY")
+    crawler_politeness_delay_seconds: float = Field(default=1.0, env="CRAWLER_POLITENESS_DELAY_SECONDS")
+    crawler_max_connections_per_host: int = Field(default=4, env="CRAWLER_MAX_CONNECTIONS_PER_HOST")
+    crawler_max_page_bytes: int = Field(default=5 * 1024 * 1024, env="CRAWLER_MAX_PAGE_BYTES")
+    crawler_use_sitemaps: bool = Field(default=True, env="CRAWLER_USE_SITEMAPS")
+    crawler_sitemap_max_files: int = Field(default=50, env="CRAWLER_SITEMAP_MAX_FILES")
+    crawler_robots_ttl_seconds: int = Field(default=3600, env="CRAWLER_ROBOTS_TTL_SECONDS")
+    crawler_refresh_interval_hours: float = Field(default=24.0, env="CRAWLER_REFRESH_INTERVAL_HOURS")
+    crawler_refresh_check_seconds: int = Field(default=300, env="CRAWLER_REFRESH_CHECK_SECONDS")
 
     # LLM generation settings
     llm_preferred: str = Field(default="gemini", env="LLM_PREFERRED")
@@ -4,9 +4,9 @@ Source API Controller
 Handles HTTP requests for source management (file uploads and URL submissions).
 """
 
-from fastapi import APIRouter, Request, HTTPException, status, UploadFile, File, Form, BackgroundTasks
-from typing import Optional
+from fastapi import APIRouter, Request, HTTPException, status, UploadFile, File, Form
 from uuid import UUID
+import hashlib
 import logging
 import os
 from pathlib import Path
@@ -20,7 +20,7 @@ from models.source_model import (
 )
 from services.source_service import SourceService
 from starlette.concurrency import run_in_threadpool
-from services.parsing_service import ParsingService
+from services.ingestion_queue_service import IngestionQueueService
 from middleware.auth_guard import auth_guard
 from middleware.auth import get_access_token_from_request
 from core.exceptions import (
@@ -40,14 +40,36 @@ ALLOWED_FILE_TYPES = {
     "application/pdf": SourceType.PDF,
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document": SourceType.DOCX,
     "text/plain": SourceType.TEXT,
+    "text/markdown": SourceType.MARKDOWN,
+    "text/x-markdown": SourceType.MARKDOWN,
+    "text/html": SourceType.HTML_FILE,
+    "text/csv": SourceType.CSV,
+    "text/tab-separated-values": SourceType.CSV,
+    # Browsers on Windows report CSV files as Excel
+    "application/vnd.ms-excel": SourceType.CSV,
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": SourceType.XLSX,
+    "application/zip": SourceType.ZIP,
+    "application/x-zip-compressed": SourceType.ZIP,
 }
 
 ALLOWED_EXTENSIONS = {
     ".pdf": SourceType.PDF,
     ".docx": SourceType.DOCX,
     ".txt": SourceType.TEXT,
+    ".md": SourceType.MARKDOWN,
+    ".markdown": SourceType.MARKDOWN,
+    ".html": SourceType.HTML_FILE,
+    ".htm": SourceType.HTML_FILE,
+    ".csv": SourceType.CSV,
+    ".tsv": SourceType.CSV,
+    ".xlsx": SourceType.XLSX,
+    ".zip": SourceType.ZIP,
 }
 
+# Generic MIME types browsers send for files they don't recognize (.md, .csv, ...);
+# the extension decides the source type
+GENERIC_MIME_TYPES = {"text/plain", "application/octet-stream"}
+
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
 
@@ -76,7 +98,7 @@ def validate_file(file: UploadFile) -> tuple[SourceType, str]:
     source_type = ALLOWED_EXTENSIONS[file_ext]
     
     # Check MIME type if provided
-    if file.content_type:
+    if file.content_type and file.content_type not in GENERIC_MIME_TYPES:
         if file.content_type not in ALLOWED_FILE_TYPES:
             raise ValidationError(f"MIME type not allowed: {file.content_type}")
         
@@ -97,11 +119,10 @@ def validate_file(file: UploadFile) -> tuple[SourceType, str]:
 async def upload_file_source(
     request: Request,
     bot_id: UUID,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
 ):
     """
-    Upload a file source (PDF, DOCX, or TXT).
+    Upload a file source (PDF, DOCX, TXT, Markdown, HTML, CSV, XLSX, or a ZIP of these).
     
     Returns the created source record.
     """
@@ -123,6 +144,8 @@ async def upload_file_source(
         # Read file content
         file_content = await file.read()
         file_size = len(file_content)
+        # Content address for the parsed-text cache
+        content_sha256 = hashlib.sha256(file_content).hexdigest()
         
         # Validate file size
         if file_size > MAX_FILE_SIZE:
@@ -185,18 +208,13 @@ async def upload_file_source(
             storage_path,
             file_size,
             mime_type,
+            content_sha256,
         )
         
         source_id = UUID(source_data["id"])
         
-        # Trigger parsing in background (non-blocking)
-        # Background task will run after response is sent
-        background_tasks.add_task(
-            _parse_source_background,
-            source_id=source_id,
-            bot_id=bot_id,
-            access_token=access_token
-        )
+        # Queue parsing for the ingestion workers (durable, off the API process)
+        await run_in_threadpool(IngestionQueueService().enqueue, source_id, bot_id)
         
         response_data = SourceResponseModel(**source_data)
         
@@ -238,7 +256,6 @@ async def create_url_source(
     request: Request,
     bot_id: UUID,
     source_data: SourceCreateModel,
-    background_tasks: BackgroundTasks,
 ):
     """
     Submit a URL as a source.
@@ -273,13 +290,8 @@ async def create_url_source(
             source_data.original_url,
         )
         
-        # Trigger parsing in background (non-blocking) for URL crawl + chunk + embed
-        background_tasks.add_task(
-            _parse_source_background,
-            source_id=UUID(source_result["id"]),
-            bot_id=bot_id,
-            access_token=access_token,
-        )
+        # Queue crawl + chunk + embed for the ingestion workers
+        await run_in_threadpool(IngestionQueueService().enqueue, UUID(source_result["id"]), bot_id)
 
         response_data = SourceResponseModel(**source_result)
 
@@ -433,6 +445,75 @@ async def get_source(
         )
 
 
+@source_router.post("/bots/{bot_id}/sources/{source_id}/reindex")
+@auth_guard
+async def reindex_source(
+    request: Request,
+    bot_id: UUID,
+    source_id: UUID,
+):
+    """Re-index a source; only new or changed chunks are stored and embedded"""
+    try:
+        user_data = request.state.user
+        user_id = getattr(user_data, 'id', None)
+        
+        if not user_id:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User ID not found in token"
+            )
+        
+        access_token = get_access_token_from_request(request)
+        
+        source_service = SourceService(access_token=access_token)
+        
+        source = await run_in_threadpool(
+            source_service.reindex_source,
+            source_id,
+            bot_id,
+            UUID(user_id),
+        )
+        
+        response_data = SourceResponseModel(**source)
+        
+        return SourceResponse(
+            status="success",
+            data=response_data,
+            message="Re-indexing will begin shortly.",
+        )
+        
+    except ValidationError as e:
+        logger.error(f"Validation error re-indexing source: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+    except NotFoundError as e:
+        logger.error(f"Source not found: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Source not found",
+        )
+    except AuthorizationError as e:
+        logger.error(f"Authorization error re-indexing source: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to re-index this source",
+        )
+    except DatabaseError as e:
+        logger.error(f"Database error re-indexing source: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to re-index source",
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error re-indexing source: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred",
+        )
+
+
 @source_router.delete("/bots/{bot_id}/sources/{source_id}")
 @auth_guard
 async def delete_source(
@@ -492,31 +573,3 @@ async def delete_source(
             detail="An unexpected error occurred",
         )
 
-
-# Background task function for parsing
-def _parse_source_background(
-    source_id: UUID,
-    bot_id: UUID,
-    access_token: Optional[str] = None
-):
-    """
-    Background task to parse a source document.
-    This runs asynchronously after the upload response is sent.
-    
-    Args:
-        source_id: Source UUID to parse
-        bot_id: Bot UUID
-        access_token: User's JWT token for RLS operations
-    """
-    try:
-        parsing_service = ParsingService(access_token=access_token)
-        success = parsing_service.parse_source(source_id, bot_id)
-        
-        if success:
-            logger.info(f"Background parsing completed: source_id={source_id}, bot_id={bot_id}")
-        else:
-            logger.warning(f"Background parsing failed: source_id={source_id}, bot_id={bot_id}")
-            
-    except Exception as e:
-        logger.error(f"Background parsing error: source_id={source_id}, bot_id={bot_id}, error={str(e)}", exc_info=True)
-
@@ -19,6 +19,9 @@ class ChunkCreateModel(BaseModel):
     publish_date: Optional[datetime] = Field(None, description="Publish date for web sources")
     char_range: Optional[Dict[str, int]] = Field(None, description="Character range {start: int, end: int}")
     tokens_estimate: int = Field(..., description="Estimated token count")
+    page_start: Optional[int] = Field(None, description="First page of the chunk (paged documents)")
+    page_end: Optional[int] = Field(None, description="Last page of the chunk (paged documents)")
+    page_url: Optional[str] = Field(None, description="Page the chunk was crawled from (web sources)")
 
     model_config = {"use_enum_values": True}
 
@@ -34,6 +37,9 @@ class ChunkResponseModel(BaseModel):
     publish_date: Optional[str] = Field(None, description="Publish date for web sources")
     char_range: Optional[Dict[str, int]] = Field(None, description="Character range")
     tokens_estimate: int = Field(..., description="Estimated token count")
+    page_start: Optional[int] = Field(None, description="First page of the chunk (paged documents)")
+    page_end: Optional[int] = Field(None, description="Last page of the chunk (paged documents)")
+    page_url: Optional[str] = Field(None, description="Page the chunk was crawled from (web sources)")
     embedding: Optional[list[float]] = Field(None, description="Vector embedding (Phase 6)")
     created_at: str = Field(..., description="Creation timestamp")
 
@@ -9,6 +9,24 @@ class SourceType(str, Enum):
     DOCX = "docx"
     HTML = "html"
     TEXT = "text"
+    MARKDOWN = "markdown"
+    HTML_FILE = "html_file"
+    CSV = "csv"
+    XLSX = "xlsx"
+    ZIP = "zip"
+
+
+# Source types backed by an uploaded file in storage (HTML is a crawled URL)
+FILE_SOURCE_TYPES = (
+    SourceType.PDF,
+    SourceType.DOCX,
+    SourceType.TEXT,
+    SourceType.MARKDOWN,
+    SourceType.HTML_FILE,
+    SourceType.CSV,
+    SourceType.XLSX,
+    SourceType.ZIP,
+)
 
 
 class SourceStatus(str, Enum):
@@ -19,6 +37,14 @@ class SourceStatus(str, Enum):
     FAILED = "failed"
 
 
+class IngestStage(str, Enum):
+    """Last completed ingestion stage, checkpointed on the source for resumable retries"""
+    DOWNLOADED = "downloaded"
+    PARSED = "parsed"
+    CHUNKED = "chunked"
+    EMBEDDED = "embedded"
+
+
 class SourceCreateModel(BaseModel):
     """Model for creating a new source"""
     source_type: SourceType = Field(..., description="Type of source")
@@ -54,6 +80,9 @@ class SourceResponseModel(BaseModel):
     error_message: Optional[str] = Field(None, description="Error message if failed")
     file_size: Optional[int] = Field(None, description="File size in bytes")
     mime_type: Optional[str] = Field(None, description="MIME type")
+    content_sha256: Optional[str] = Field(None, description="sha256 of the uploaded file")
+    ingest_stage: Optional[str] = Field(None, description="Last completed ingestion stage")
+    last_crawled_at: Optional[str] = Field(None, description="When the URL source's site was last crawled")
     created_at: str = Field(..., description="Creation timestamp")
     updated_at: str = Field(..., description="Update timestamp")
 
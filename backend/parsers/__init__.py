@@ -6,15 +6,20 @@ Each parser is independent and implements a common interface, making it easy to
 
 Architecture:
 - BaseParser: Abstract base class defining the parser interface
-- Individual parsers: PDFParser, DOCXParser, TextParser
+- Individual parsers: PDFParser, DOCXParser, TextParser, MarkdownParser, HTMLParser,
+  CSVParser, XLSXParser, ZipParser (bulk import of the formats above)
 - ParserFactory: Factory pattern for selecting appropriate parser
 - All parsers are dependency-injected and can be easily swapped or extended
 """
 
-from parsers.base import BaseParser, ParseResult
+from parsers.base import BaseParser, ParseResult, DocumentElement, join_elements
 from parsers.pdf_parser import PDFParser
 from parsers.docx_parser import DOCXParser
 from parsers.text_parser import TextParser
+from parsers.markdown_parser import MarkdownParser
+from parsers.html_parser import HTMLParser
+from parsers.spreadsheet_parser import CSVParser, XLSXParser
+from parsers.zip_parser import ZipParser
 from parsers.factory import ParserFactory
 from parsers.exceptions import (
     ParserError,
@@ -26,9 +31,16 @@ from parsers.exceptions import (
 __all__ = [
     "BaseParser",
     "ParseResult",
+    "DocumentElement",
+    "join_elements",
     "PDFParser",
     "DOCXParser",
     "TextParser",
+    "MarkdownParser",
+    "HTMLParser",
+    "CSVParser",
+    "XLSXParser",
+    "ZipParser",
     "ParserFactory",
     "ParserError",
     "UnsupportedFileTypeError",
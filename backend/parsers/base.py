@@ -6,11 +6,46 @@ This ensures consistency and allows for easy extension with new parsers.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import BinaryIO, Iterator, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Separator between elements in ParseResult.text (chunkers rely on it for offsets)
+ELEMENT_SEPARATOR = "\n\n"
+
+
+class DocumentElement:
+    """A structural element of a parsed document"""
+    
+    HEADING = "heading"
+    PARAGRAPH = "paragraph"
+    TABLE = "table"
+    
+    def __init__(
+        self,
+        kind: str,
+        text: str,
+        level: Optional[int] = None,
+        page: Optional[int] = None
+    ):
+        """
+        Args:
+            kind: "heading", "paragraph" or "table"
+            text: Element text (table rows are newline-separated, cells " | "-separated)
+            level: Heading level (1 = top level), headings only
+            page: 1-based page number, if the format has pages
+        """
+        self.kind = kind
+        self.text = text
+        self.level = level
+        self.page = page
+
+
+def join_elements(elements: List[DocumentElement]) -> str:
+    """Flatten elements into the plain text stored on ParseResult.text"""
+    return ELEMENT_SEPARATOR.join(e.text for e in elements)
+
 
 class ParseResult:
     """Result of parsing operation"""
@@ -20,12 +55,15 @@ class ParseResult:
         text: str,
         metadata: Optional[dict] = None,
         success: bool = True,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        elements: Optional[List[DocumentElement]] = None
     ):
         self.text = text
         self.metadata = metadata or {}
         self.success = success
         self.error_message = error_message
+        # Structured element stream; when present, text == join_elements(elements)
+        self.elements = elements
     
     def __bool__(self):
         return self.success
@@ -39,8 +77,13 @@ class BaseParser(ABC):
     - parse(): Extract text from document
     - can_parse(): Check if parser can handle file type
     - get_supported_types(): Return list of supported MIME types
+    
+    Parsers that set supports_streaming also implement iter_elements(), which
+    yields elements from a file object without holding the whole document.
     """
     
+    supports_streaming = False
+    
     def __init__(self):
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
     
@@ -85,6 +128,27 @@ class BaseParser(ABC):
         """
         pass
     
+    def iter_elements(self, file_obj: BinaryIO, metadata: Optional[dict] = None) -> Iterator[DocumentElement]:
+        """
+        Stream document elements from a file object.
+        
+        Args:
+            file_obj: Seekable binary file
+            metadata: Optional dict the parser updates with document statistics
+        
+        Yields:
+            DocumentElement objects in document order
+        """
+        raise NotImplementedError(f"{self.get_name()} does not support streaming")
+    
+    def cache_key(self) -> str:
+        """
+        Identifies this parser's output in the parsed-text cache.
+        
+        Parsers whose output depends on configuration include it here.
+        """
+        return self.get_name()
+    
     def get_name(self) -> str:
         """Get parser name for logging/debugging"""
         return self.__class__.__name__
@@ -3,12 +3,15 @@ DOCX Parser
 
 Extracts text from Microsoft Word DOCX documents using python-docx.
 Preserves paragraph structure and handles formatting.
+Emits headings (from "Heading N"/"Title" styles), paragraphs and tables
+in document order.
 """
 
-from typing import Optional
+from typing import Iterator, Optional
 import io
 import logging
-from parsers.base import BaseParser, ParseResult
+import re
+from parsers.base import BaseParser, ParseResult, DocumentElement, join_elements
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +19,24 @@ logger = logging.getLogger(__name__)
 class DOCXParser(BaseParser):
     """Parser for DOCX documents"""
     
+    HEADING_STYLE = re.compile(r"^heading\s*(\d)$", re.IGNORECASE)
+    
     def __init__(self):
         super().__init__()
         self._docx = None
+        self._Paragraph = None
+        self._Table = None
     
     def _get_docx(self):
         """Lazy load python-docx to avoid import errors if not installed"""
         if self._docx is None:
             try:
                 from docx import Document
+                from docx.table import Table
+                from docx.text.paragraph import Paragraph
                 self._docx = Document
+                self._Paragraph = Paragraph
+                self._Table = Table
             except ImportError:
                 raise ImportError(
                     "python-docx is required for DOCX parsing. "
@@ -53,28 +64,37 @@ class DOCXParser(BaseParser):
             # Load document
             doc = Document(docx_file)
             
-            text_parts = []
             metadata = {
                 "paragraph_count": 0,
                 "total_chars": 0,
             }
             
-            # Extract text from all paragraphs
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text.strip())
-                    metadata["paragraph_count"] += 1
-                    metadata["total_chars"] += len(paragraph.text)
-            
-            # Extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            text_parts.append(cell.text.strip())
-                            metadata["total_chars"] += len(cell.text)
+            # Walk paragraphs and tables in document order
+            elements = []
+            for block in self._iter_blocks(doc):
+                if isinstance(block, self._Table):
+                    rows = []
+                    for row in block.rows:
+                        cells = [cell.text.strip() for cell in row.cells]
+                        if any(cells):
+                            rows.append(" | ".join(cells))
+                            metadata["total_chars"] += sum(len(c) for c in cells)
+                    if rows:
+                        elements.append(DocumentElement(DocumentElement.TABLE, "\n".join(rows)))
+                    continue
+                
+                text = block.text.strip()
+                if not text:
+                    continue
+                level = self._heading_level(block)
+                if level:
+                    elements.append(DocumentElement(DocumentElement.HEADING, text, level=level))
+                else:
+                    elements.append(DocumentElement(DocumentElement.PARAGRAPH, text))
+                metadata["paragraph_count"] += 1
+                metadata["total_chars"] += len(block.text)
             
-            full_text = "\n\n".join(text_parts)
+            full_text = join_elements(elements)
             
             if not full_text.strip():
                 return ParseResult(
@@ -85,6 +105,7 @@ class DOCXParser(BaseParser):
                 )
             
             metadata["extracted_chars"] = len(full_text)
+            metadata["element_count"] = len(elements)
             
             self.logger.info(
                 f"Successfully parsed DOCX: {metadata['paragraph_count']} paragraphs, "
@@ -93,7 +114,8 @@ class DOCXParser(BaseParser):
             
             return ParseResult(
                 text=full_text,
-                metadata=metadata
+                metadata=metadata,
+                elements=elements
             )
             
         except Exception as e:
@@ -106,6 +128,26 @@ class DOCXParser(BaseParser):
                 error_message=error_msg
             )
     
+    def _iter_blocks(self, doc) -> Iterator:
+        """Yield Paragraph and Table objects in the order they appear in the body"""
+        for child in doc.element.body.iterchildren():
+            tag = child.tag.rsplit("}", 1)[-1]
+            if tag == "p":
+                yield self._Paragraph(child, doc)
+            elif tag == "tbl":
+                yield self._Table(child, doc)
+    
+    def _heading_level(self, paragraph) -> Optional[int]:
+        """Heading level from the paragraph style ("Title" counts as level 1)"""
+        try:
+            style_name = (paragraph.style.name or "").strip()
+        except Exception:
+            return None
+        if style_name.lower() == "title":
+            return 1
+        match = self.HEADING_STYLE.match(style_name)
+        return int(match.group(1)) if match else None
+    
     def can_parse(self, mime_type: str, file_extension: Optional[str] = None) -> bool:
         """Check if this parser can handle DOCX files"""
         return (
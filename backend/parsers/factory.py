@@ -11,6 +11,10 @@ from parsers.base import BaseParser
 from parsers.pdf_parser import PDFParser
 from parsers.docx_parser import DOCXParser
 from parsers.text_parser import TextParser
+from parsers.markdown_parser import MarkdownParser
+from parsers.html_parser import HTMLParser
+from parsers.spreadsheet_parser import CSVParser, XLSXParser
+from parsers.zip_parser import ZipParser
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,12 @@ class ParserFactory:
         self._parsers: list[BaseParser] = [
             PDFParser(),
             DOCXParser(),
+            # Before TextParser, which also accepts text/* files
+            MarkdownParser(),
+            HTMLParser(),
+            CSVParser(),
+            XLSXParser(),
+            ZipParser(),
             TextParser(),
         ]
         self._parser_cache: dict[str, BaseParser] = {}
@@ -0,0 +1,160 @@
+"""
+HTML Parser
+
+Extracts a structured element stream from uploaded HTML files using lxml:
+h1-h6 become headings, block-level text (p, li, pre, blockquote, ...) becomes
+paragraphs and tables become table elements, all in document order.
+Scripts, styles and page chrome (nav, footer, aside) are dropped.
+"""
+
+from typing import List, Optional, Set
+import logging
+import re
+from parsers.base import BaseParser, ParseResult, DocumentElement, join_elements
+
+logger = logging.getLogger(__name__)
+
+
+class HTMLParser(BaseParser):
+    """Parser for uploaded HTML documents"""
+    
+    HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+    BLOCK_TAGS = {"p", "li", "pre", "blockquote", "dt", "dd", "figcaption", "caption", "address"}
+    DROP_TAGS = ["script", "style", "noscript", "template", "svg", "nav", "footer", "aside", "form"]
+    # Children whose text is emitted as elements of their own, not as loose div text
+    STRUCTURAL_TAGS = BLOCK_TAGS | set(HEADING_TAGS) | {
+        "table", "div", "ul", "ol", "dl", "section", "article", "main", "header", "figure"
+    }
+    WHITESPACE = re.compile(r"\s+")
+    
+    def __init__(self):
+        super().__init__()
+        self._lxml_html = None
+    
+    def _get_lxml(self):
+        """Lazy load lxml to avoid import errors if not installed"""
+        if self._lxml_html is None:
+            try:
+                import lxml.html
+                self._lxml_html = lxml.html
+            except ImportError:
+                raise ImportError(
+                    "lxml is required for HTML parsing. "
+                    "Install it with: pip install lxml"
+                )
+        return self._lxml_html
+    
+    def parse(self, file_content: bytes, file_path: Optional[str] = None) -> ParseResult:
+        """
+        Extract structured text from an HTML file.
+        
+        Args:
+            file_content: HTML file content as bytes (charset from <meta> or BOM)
+            file_path: Optional file path for error messages
+        
+        Returns:
+            ParseResult with text and elements
+        """
+        try:
+            lxml_html = self._get_lxml()
+            root = lxml_html.document_fromstring(file_content)
+            for element in list(root.iter(*self.DROP_TAGS)):
+                if element.getparent() is not None:
+                    element.drop_tree()
+            
+            title = self._clean(root.findtext(".//title") or "")
+            body = root.find("body")
+            if body is None:
+                body = root
+            
+            elements = self._extract_elements(body)
+            if not any(e.kind == DocumentElement.HEADING for e in elements) and title:
+                elements.insert(0, DocumentElement(DocumentElement.HEADING, title, level=1))
+            
+            text = join_elements(elements)
+            metadata = {
+                "title": title or None,
+                "element_count": len(elements),
+                "total_chars": len(text),
+            }
+            
+            if not text.strip():
+                return ParseResult(
+                    text="",
+                    metadata=metadata,
+                    success=False,
+                    error_message="HTML file contains no extractable text."
+                )
+            
+            self.logger.info(
+                f"Successfully parsed HTML file: {len(elements)} elements, {len(text)} characters"
+            )
+            return ParseResult(text=text, metadata=metadata, elements=elements)
+        
+        except Exception as e:
+            error_msg = f"Failed to parse HTML file: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            return ParseResult(
+                text="",
+                metadata={},
+                success=False,
+                error_message=error_msg
+            )
+    
+    def _clean(self, text: str) -> str:
+        return self.WHITESPACE.sub(" ", text).strip()
+    
+    def _extract_elements(self, body) -> List[DocumentElement]:
+        """Walk the tree in document order, emitting each block once"""
+        elements: List[DocumentElement] = []
+        consumed: Set = set()
+        
+        for node in body.iter():
+            if not isinstance(node.tag, str):
+                continue  # comments, processing instructions
+            if any(ancestor in consumed for ancestor in node.iterancestors()):
+                continue
+            
+            tag = node.tag.lower()
+            if tag in self.HEADING_TAGS:
+                text = self._clean(node.text_content())
+                if text:
+                    elements.append(DocumentElement(DocumentElement.HEADING, text, level=self.HEADING_TAGS[tag]))
+                consumed.add(node)
+            elif tag == "table":
+                rows = []
+                for row in node.iter("tr"):
+                    cells = [self._clean(cell.text_content()) for cell in row if cell.tag in ("td", "th")]
+                    if any(cells):
+                        rows.append(" | ".join(cells))
+                if rows:
+                    elements.append(DocumentElement(DocumentElement.TABLE, "\n".join(rows)))
+                consumed.add(node)
+            elif tag in self.BLOCK_TAGS:
+                text = node.text_content().strip("\n").rstrip() if tag == "pre" else self._clean(node.text_content())
+                if text:
+                    elements.append(DocumentElement(DocumentElement.PARAGRAPH, text))
+                consumed.add(node)
+            elif tag == "div":
+                # Text placed directly in a div, outside any block element
+                parts = [node.text or ""]
+                for child in node:
+                    if isinstance(child.tag, str) and child.tag.lower() not in self.STRUCTURAL_TAGS:
+                        parts.append(child.text_content())
+                    parts.append(child.tail or "")
+                loose = self._clean(" ".join(parts))
+                if loose:
+                    elements.append(DocumentElement(DocumentElement.PARAGRAPH, loose))
+        
+        return elements
+    
+    def can_parse(self, mime_type: str, file_extension: Optional[str] = None) -> bool:
+        """Check if this parser can handle HTML files"""
+        return (
+            mime_type.lower() in ("text/html", "application/xhtml+xml") or
+            bool(file_extension and file_extension.lower() in (".html", ".htm", ".xhtml"))
+        )
+    
+    def get_supported_types(self) -> list[str]:
+        """Get supported MIME types"""
+        return ["text/html", "application/xhtml+xml"]
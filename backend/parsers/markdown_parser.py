@@ -0,0 +1,158 @@
+"""
+Markdown Parser
+
+Extracts a structured element stream from Markdown files: ATX (#) and
+setext (=== / ---) headings, paragraphs, and pipe tables. Fenced code blocks
+are kept as paragraphs and never scanned for headings. Decoding is shared
+with TextParser (single-pass, encoding sniffed once).
+"""
+
+from typing import BinaryIO, Iterator, List, Optional
+import io
+import re
+from parsers.base import DocumentElement, ParseResult, join_elements
+from parsers.text_parser import TextParser
+
+
+class MarkdownParser(TextParser):
+    """Parser for Markdown documents"""
+    
+    NO_TEXT_MESSAGE = "Markdown file is empty."
+    
+    ATX_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+    SETEXT_UNDERLINE = re.compile(r'^(=+|-+)\s*$')
+    FENCE = re.compile(r'^(```|~~~)')
+    TABLE_ROW = re.compile(r'^\|.*\|$')
+    TABLE_DIVIDER = re.compile(r'^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$')
+    
+    def parse(self, file_content: bytes, file_path: Optional[str] = None) -> ParseResult:
+        """
+        Extract structured text from a Markdown file.
+        
+        Args:
+            file_content: Markdown file content as bytes
+            file_path: Optional file path for error messages
+        
+        Returns:
+            ParseResult with text and elements
+        """
+        try:
+            metadata: dict = {}
+            elements = list(self.iter_elements(io.BytesIO(file_content), metadata))
+            text = join_elements(elements)
+            if not text.strip():
+                return ParseResult(
+                    text="",
+                    metadata=metadata,
+                    success=False,
+                    error_message=self.NO_TEXT_MESSAGE
+                )
+            metadata["element_count"] = len(elements)
+            return ParseResult(text=text, metadata=metadata, elements=elements)
+        except Exception as e:
+            error_msg = f"Failed to parse Markdown file: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            return ParseResult(
+                text="",
+                metadata={},
+                success=False,
+                error_message=error_msg
+            )
+    
+    def iter_elements(self, file_obj: BinaryIO, metadata: Optional[dict] = None) -> Iterator[DocumentElement]:
+        """Stream heading, paragraph and table elements from a Markdown file"""
+        metadata = metadata if metadata is not None else {}
+        encoding, bom_length = self.detect_encoding(file_obj.read(self.SAMPLE_BYTES))
+        file_obj.seek(bom_length)
+        metadata.update({"encoding": encoding, "total_chars": 0, "total_lines": 0})
+        
+        block: List[str] = []
+        block_chars = 0
+        table: List[str] = []
+        fence: Optional[str] = None
+        
+        def flush_block() -> Iterator[DocumentElement]:
+            nonlocal block_chars
+            if block:
+                yield DocumentElement(DocumentElement.PARAGRAPH, "\n".join(block))
+                block.clear()
+                block_chars = 0
+        
+        def flush_table() -> Iterator[DocumentElement]:
+            if table:
+                rows = [
+                    " | ".join(cell.strip() for cell in row.strip().strip("|").split("|"))
+                    for row in table
+                    if not self.TABLE_DIVIDER.match(row.strip())
+                ]
+                if rows:
+                    yield DocumentElement(DocumentElement.TABLE, "\n".join(rows))
+                table.clear()
+        
+        for line in self._iter_lines(file_obj, encoding):
+            metadata["total_lines"] += 1
+            metadata["total_chars"] += len(line) + 1
+            stripped = line.strip()
+            
+            # Fenced code: keep verbatim, never look for headings inside
+            if fence is not None:
+                block.append(line.rstrip())
+                block_chars += len(line)
+                if stripped.startswith(fence):
+                    fence = None
+                    yield from flush_block()
+                continue
+            fence_match = self.FENCE.match(stripped)
+            if fence_match:
+                yield from flush_table()
+                yield from flush_block()
+                fence = fence_match.group(1)
+                block.append(line.rstrip())
+                continue
+            
+            if self.TABLE_ROW.match(stripped):
+                yield from flush_block()
+                table.append(stripped)
+                continue
+            yield from flush_table()
+            
+            if not stripped:
+                yield from flush_block()
+                continue
+            
+            heading = self.ATX_HEADING.match(stripped)
+            if heading and heading.group(2):
+                yield from flush_block()
+                yield DocumentElement(DocumentElement.HEADING, heading.group(2), level=len(heading.group(1)))
+                continue
+            
+            # Setext heading: a single text line underlined with === or ---
+            underline = self.SETEXT_UNDERLINE.match(stripped)
+            if underline and len(block) == 1:
+                heading_text = block.pop()
+                block_chars = 0
+                yield DocumentElement(
+                    DocumentElement.HEADING,
+                    heading_text.strip(),
+                    level=1 if underline.group(1).startswith("=") else 2
+                )
+                continue
+            
+            block.append(stripped)
+            block_chars += len(stripped)
+            if block_chars >= self.MAX_PARAGRAPH_CHARS:
+                yield from flush_block()
+        
+        yield from flush_table()
+        yield from flush_block()
+    
+    def can_parse(self, mime_type: str, file_extension: Optional[str] = None) -> bool:
+        """Check if this parser can handle Markdown files"""
+        return (
+            mime_type.lower() in ("text/markdown", "text/x-markdown") or
+            bool(file_extension and file_extension.lower() in (".md", ".markdown"))
+        )
+    
+    def get_supported_types(self) -> list[str]:
+        """Get supported MIME types"""
+        return ["text/markdown", "text/x-markdown"]
@@ -1,24 +1,174 @@
 """
 PDF Parser
 
-Extracts text from PDF documents using pdfplumber.
-Handles encrypted, corrupted, and multi-page PDFs.
+Extracts text from PDF documents using pdfplumber, or pypdfium2 when layout
+fidelity isn't needed. Large PDFs are extracted page-parallel across a
+process pool, and scanned pages can be OCR'd with Tesseract. Handles
+encrypted, corrupted, and multi-page PDFs.
+Emits a structured element stream: headings (detected from font size),
+paragraphs (grouped by vertical line spacing) and page numbers. The stream
+can be consumed page by page for bounded-memory ingestion.
 """
 
-from typing import Optional
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import atexit
 import io
 import logging
-from parsers.base import BaseParser, ParseResult
+import os
+import shutil
+import tempfile
+import threading
+import time
+from config.settings import settings
+from parsers.base import BaseParser, ParseResult, DocumentElement, join_elements
 
 logger = logging.getLogger(__name__)
 
+PageLines = Tuple[int, List[Dict]]
+
+# Shared process pools, created on first use: "extract" for page-parallel text
+# extraction and "ocr" for Tesseract, kept apart so scanned documents never
+# queue ahead of text-only ones
+_pools: Dict[str, ProcessPoolExecutor] = {}
+_pool_lock = threading.Lock()
+
+
+def _get_pool(name: str, workers: int) -> ProcessPoolExecutor:
+    with _pool_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = ProcessPoolExecutor(max_workers=workers)
+            atexit.register(pool.shutdown, wait=False, cancel_futures=True)
+            logger.info(f"PDF {name} pool started: workers={workers}")
+        return pool
+
+
+def _reset_pool(name: str) -> None:
+    with _pool_lock:
+        pool = _pools.pop(name, None)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _iter_page_lines(source: Union[str, BinaryIO], first: int, last: int, backend: str) -> Iterator[PageLines]:
+    """
+    Yield (page_num, lines) for pages first..last (1-based, inclusive).
+    
+    Pages that fail to extract are logged and skipped.
+    """
+    if backend == "pdfium":
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(source)
+        try:
+            for page_num in range(first, last + 1):
+                try:
+                    page = pdf[page_num - 1]
+                    textpage = page.get_textpage()
+                    lines = PDFParser._lines_from_text(textpage.get_text_range())
+                    textpage.close()
+                    page.close()
+                except Exception as e:
+                    logger.warning(f"Failed to extract text from page {page_num}: {str(e)}")
+                    continue
+                yield page_num, lines
+        finally:
+            pdf.close()
+        return
+    
+    import pdfplumber
+    with pdfplumber.open(source) as pdf:
+        for page_num in range(first, last + 1):
+            page = pdf.pages[page_num - 1]
+            try:
+                lines = PDFParser._extract_lines(page)
+            except Exception as e:
+                logger.warning(f"Failed to extract text from page {page_num}: {str(e)}")
+                continue
+            finally:
+                # Drop pdfplumber's cached layout objects for this page
+                if hasattr(page, "close"):
+                    page.close()
+            yield page_num, lines
+
+
+def _extract_page_range(path: str, first: int, last: int, backend: str) -> List[PageLines]:
+    """Extract a page range from a PDF on disk (runs in a worker)"""
+    return list(_iter_page_lines(path, first, last, backend))
+
+
+def _ocr_page(path: str, page_num: int, dpi: int, language: str, deadline: float) -> List[Dict]:
+    """
+    Render one page and OCR it with Tesseract (runs in a worker).
+    
+    `deadline` is the document's OCR budget as a time.time() timestamp:
+    tesseract is killed when it runs past it, so the worker is freed.
+    """
+    import pypdfium2 as pdfium
+    import pytesseract
+    
+    if time.time() >= deadline:
+        raise TimeoutError("OCR time budget exhausted")
+    # Concurrency comes from the pool; keep each tesseract process single-threaded
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    pdf = pdfium.PdfDocument(path)
+    try:
+        page = pdf[page_num - 1]
+        image = page.render(scale=dpi / 72).to_pil()
+        page.close()
+    finally:
+        pdf.close()
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise TimeoutError("OCR time budget exhausted")
+    # Raises RuntimeError once tesseract has been killed at the timeout
+    text = pytesseract.image_to_string(image, lang=language, timeout=remaining)
+    return PDFParser._lines_from_text(text)
+
 
 class PDFParser(BaseParser):
     """Parser for PDF documents"""
     
-    def __init__(self):
+    supports_streaming = True
+    
+    def __init__(
+        self,
+        backend: str = settings.pdf_backend,
+        workers: int = settings.pdf_workers,
+        parallel_min_pages: int = settings.pdf_parallel_min_pages,
+        pages_per_task: int = settings.pdf_pages_per_task,
+        ocr_enabled: bool = settings.pdf_ocr_enabled,
+        ocr_workers: int = settings.pdf_ocr_workers,
+        ocr_time_budget: float = settings.pdf_ocr_time_budget_seconds,
+        ocr_dpi: int = settings.pdf_ocr_dpi,
+        ocr_language: str = settings.pdf_ocr_language
+    ):
+        """
+        Args:
+            backend: "pdfplumber" (layout-aware, font-size headings) or
+                "pdfium" (much faster plain text via pypdfium2, no headings)
+            workers: Process pool size for page-parallel extraction (0 disables)
+            parallel_min_pages: PDFs with at least this many pages are extracted in parallel
+            pages_per_task: Pages extracted per worker task
+            ocr_enabled: OCR pages without a text layer (needs pytesseract + tesseract)
+            ocr_workers: Pages OCR'd concurrently
+            ocr_time_budget: Seconds of OCR allowed per document; later pages are skipped
+            ocr_dpi: Render resolution for OCR
+            ocr_language: Tesseract language(s), e.g. "eng" or "eng+deu"
+        """
         super().__init__()
         self._pdfplumber = None
+        self.backend = backend
+        self.workers = max(0, workers)
+        self.parallel_min_pages = parallel_min_pages
+        self.pages_per_task = max(1, pages_per_task)
+        self.ocr_enabled = ocr_enabled
+        self.ocr_workers = max(1, ocr_workers)
+        self.ocr_time_budget = ocr_time_budget
+        self.ocr_dpi = ocr_dpi
+        self.ocr_language = ocr_language
     
     def _get_pdfplumber(self):
         """Lazy load pdfplumber to avoid import errors if not installed"""
@@ -45,44 +195,25 @@ class PDFParser(BaseParser):
             ParseResult with extracted text
         """
         try:
-            pdfplumber = self._get_pdfplumber()
-            
-            # Create file-like object from bytes
-            pdf_file = io.BytesIO(file_content)
-            
-            text_parts = []
             metadata = {
                 "page_count": 0,
                 "total_chars": 0,
             }
             
-            # Extract text from each page
-            with pdfplumber.open(pdf_file) as pdf:
-                metadata["page_count"] = len(pdf.pages)
-                
-                for page_num, page in enumerate(pdf.pages, 1):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
-                            metadata["total_chars"] += len(page_text)
-                    except Exception as e:
-                        self.logger.warning(
-                            f"Failed to extract text from page {page_num}: {str(e)}"
-                        )
-                        continue
-            
-            full_text = "\n\n".join(text_parts)
+            # Create file-like object from bytes
+            elements = list(self.iter_elements(io.BytesIO(file_content), metadata))
+            full_text = join_elements(elements)
             
             if not full_text.strip():
                 return ParseResult(
                     text="",
                     metadata=metadata,
                     success=False,
-                    error_message="PDF contains no extractable text. It may be image-based or encrypted."
+                    error_message=self.NO_TEXT_MESSAGE
                 )
             
             metadata["extracted_chars"] = len(full_text)
+            metadata["element_count"] = len(elements)
             
             self.logger.info(
                 f"Successfully parsed PDF: {metadata['page_count']} pages, "
@@ -91,7 +222,8 @@ class PDFParser(BaseParser):
             
             return ParseResult(
                 text=full_text,
-                metadata=metadata
+                metadata=metadata,
+                elements=elements
             )
             
         except Exception as e:
@@ -104,6 +236,340 @@ class PDFParser(BaseParser):
                 error_message=error_msg
             )
     
+    def iter_elements(self, file_obj: BinaryIO, metadata: Optional[dict] = None) -> Iterator[DocumentElement]:
+        """
+        Stream elements page by page.
+        
+        Only the first HEADING_SAMPLE_PAGES pages are buffered (to find the
+        body font size); after that each page is extracted, turned into
+        elements and released before the next one is read.
+        
+        Args:
+            file_obj: Seekable binary file (e.g. a spooled temp file)
+            metadata: Optional dict updated with page_count/total_chars
+        """
+        metadata = metadata if metadata is not None else {}
+        metadata.setdefault("total_chars", 0)
+        
+        sample: List[PageLines] = []
+        heading_levels: Optional[Dict[float, int]] = None
+        body_size: Optional[float] = None
+        
+        for page_num, lines in self._iter_pages(file_obj, metadata):
+            metadata["total_chars"] += sum(len(line["text"]) for line in lines)
+            
+            if heading_levels is None:
+                sample.append((page_num, lines))
+                if len(sample) < self.HEADING_SAMPLE_PAGES:
+                    continue
+                heading_levels, body_size = self._heading_levels(sample)
+                for sample_num, sample_lines in sample:
+                    yield from self._page_elements(sample_num, sample_lines, heading_levels, body_size)
+                sample = []
+                continue
+            
+            yield from self._page_elements(page_num, lines, heading_levels, body_size)
+        
+        if heading_levels is None:
+            heading_levels, body_size = self._heading_levels(sample)
+            for sample_num, sample_lines in sample:
+                yield from self._page_elements(sample_num, sample_lines, heading_levels, body_size)
+    
+    NO_TEXT_MESSAGE = "PDF contains no extractable text. It may be image-based or encrypted."
+    
+    # Lines at least this much larger than body text are treated as headings
+    HEADING_SIZE_RATIO = 1.15
+    MAX_HEADING_CHARS = 200
+    # Pages buffered to estimate the body font size when streaming
+    HEADING_SAMPLE_PAGES = 10
+    
+    def _resolve_backend(self) -> str:
+        """Configured backend, falling back to pdfplumber when pypdfium2 is missing"""
+        if self.backend == "pdfium":
+            try:
+                import pypdfium2  # noqa: F401
+                return "pdfium"
+            except ImportError:
+                self.logger.warning("pypdfium2 not installed; falling back to pdfplumber extraction")
+        self._get_pdfplumber()
+        return "pdfplumber"
+    
+    def _page_count(self, file_obj: BinaryIO, backend: str) -> int:
+        file_obj.seek(0)
+        if backend == "pdfium":
+            import pypdfium2 as pdfium
+            pdf = pdfium.PdfDocument(file_obj)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+        with self._get_pdfplumber().open(file_obj) as pdf:
+            return len(pdf.pages)
+    
+    def _iter_pages(self, file_obj: BinaryIO, metadata: dict) -> Iterator[PageLines]:
+        """
+        Yield (page_num, lines) in page order.
+        
+        Large PDFs are split into page ranges that are extracted across the
+        process pool; at most 2 × workers ranges are in flight so results are
+        merged in order without buffering the whole document. If the pool
+        fails, the remaining pages are extracted in-process. With OCR
+        enabled, pages without a text layer are OCR'd (see _with_ocr).
+        """
+        backend = self._resolve_backend()
+        page_count = self._page_count(file_obj, backend)
+        metadata["page_count"] = page_count
+        metadata["extraction_backend"] = backend
+        file_obj.seek(0)
+        
+        parallel = self.workers > 0 and page_count >= self.parallel_min_pages
+        ocr = self.ocr_enabled and self._ocr_available()
+        if not parallel and not ocr:
+            yield from _iter_page_lines(file_obj, 1, page_count, backend)
+            return
+        
+        # Workers open the PDF by path; spill the (possibly in-memory) file to disk once
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            shutil.copyfileobj(file_obj, tmp)
+        try:
+            if parallel:
+                pages = self._iter_pages_parallel(tmp.name, page_count, backend)
+            else:
+                pages = _iter_page_lines(tmp.name, 1, page_count, backend)
+            if ocr:
+                pages = self._with_ocr(pages, tmp.name, metadata)
+            yield from pages
+        finally:
+            os.unlink(tmp.name)
+    
+    def _iter_pages_parallel(self, path: str, page_count: int, backend: str) -> Iterator[PageLines]:
+        """Extract page ranges across the process pool, yielding pages in order"""
+        next_page = 1
+        ranges = deque(
+            (first, min(first + self.pages_per_task - 1, page_count))
+            for first in range(1, page_count + 1, self.pages_per_task)
+        )
+        pool = _get_pool("extract", self.workers)
+        in_flight = deque()
+        try:
+            while ranges or in_flight:
+                while ranges and len(in_flight) < self.workers * 2:
+                    first, last = ranges.popleft()
+                    in_flight.append((last, pool.submit(_extract_page_range, path, first, last, backend)))
+                last, future = in_flight.popleft()
+                yield from future.result()
+                next_page = last + 1
+        except Exception as e:
+            for _, future in in_flight:
+                future.cancel()
+            if isinstance(e, BrokenProcessPool):
+                _reset_pool("extract")
+            self.logger.warning(
+                f"Parallel PDF extraction failed, continuing in-process from page {next_page}: {str(e)}"
+            )
+            if next_page <= page_count:
+                yield from _iter_page_lines(path, next_page, page_count, backend)
+    
+    def _ocr_available(self) -> bool:
+        """pytesseract and the tesseract binary are both required"""
+        try:
+            import pytesseract  # noqa: F401
+            import pypdfium2  # noqa: F401
+        except ImportError:
+            self.logger.warning("OCR enabled but pytesseract/pypdfium2 are not installed; skipping OCR")
+            return False
+        if not shutil.which("tesseract"):
+            self.logger.warning("OCR enabled but the tesseract binary was not found; skipping OCR")
+            return False
+        return True
+    
+    def _with_ocr(self, pages: Iterator[PageLines], path: str, metadata: dict) -> Iterator[PageLines]:
+        """
+        OCR pages that came back without text, preserving page order.
+        
+        OCR runs on its own process pool (ocr_workers pages at a time) while
+        text pages keep being read ahead, up to a bounded window. Once the
+        per-document time budget is spent, remaining image-only pages are
+        skipped rather than holding up the rest of the document, and OCR
+        still running is stopped in its worker.
+        """
+        metadata.setdefault("ocr_pages", 0)
+        metadata.setdefault("ocr_skipped_pages", 0)
+        deadline = time.monotonic() + self.ocr_time_budget
+        # The same deadline for the workers (another process: wall clock)
+        worker_deadline = time.time() + self.ocr_time_budget
+        window = max(self.ocr_workers * 4, 16)
+        pending: deque = deque()  # (page_num, lines, future or None), in page order
+        
+        try:
+            for page_num, lines in pages:
+                future = None
+                if not lines and time.monotonic() < deadline:
+                    pool = _get_pool("ocr", self.ocr_workers)
+                    future = pool.submit(_ocr_page, path, page_num, self.ocr_dpi, self.ocr_language, worker_deadline)
+                elif not lines:
+                    metadata["ocr_skipped_pages"] += 1
+                pending.append((page_num, lines, future))
+                
+                # Emit everything at the head that's ready; block only when the window is full
+                while pending and (
+                    pending[0][2] is None or pending[0][2].done() or len(pending) >= window
+                ):
+                    yield self._resolve_ocr(pending.popleft(), deadline, metadata)
+            
+            while pending:
+                yield self._resolve_ocr(pending.popleft(), deadline, metadata)
+        finally:
+            for _, _, future in pending:
+                if future is not None:
+                    future.cancel()
+    
+    def _resolve_ocr(self, item: Tuple[int, List[Dict], Optional[Future]], deadline: float, metadata: dict) -> PageLines:
+        page_num, lines, future = item
+        if future is None:
+            return page_num, lines
+        
+        try:
+            lines = future.result(timeout=max(deadline - time.monotonic(), 0))
+            metadata["ocr_pages"] += 1
+            return page_num, lines
+        except FutureTimeoutError:
+            future.cancel()
+            self.logger.warning(f"OCR time budget exhausted, skipping page {page_num}")
+        except BrokenProcessPool as e:
+            _reset_pool("ocr")
+            self.logger.warning(f"OCR worker crashed on page {page_num}: {str(e)}")
+        except Exception as e:
+            self.logger.warning(f"OCR failed for page {page_num}: {str(e)}")
+        metadata["ocr_skipped_pages"] += 1
+        return page_num, []
+    
+    @staticmethod
+    def _lines_from_text(text: str) -> List[Dict]:
+        """
+        Lines for text without layout info (pypdfium2, OCR).
+        
+        Blank lines are turned into a vertical gap so _page_elements still
+        splits paragraphs on them; there is no font size, so no headings.
+        """
+        lines = []
+        top = 0.0
+        for raw in text.splitlines():
+            line = raw.strip()
+            if not line:
+                top += 1.0
+                continue
+            lines.append({"text": line, "top": top, "bottom": top + 1.0, "size": None})
+            top += 1.0
+        return lines
+    
+    @staticmethod
+    def _extract_lines(page) -> List[Dict]:
+        """
+        Extract text lines with their vertical position and font size.
+        
+        Falls back to plain page text (one line, no size) on pdfplumber
+        versions without extract_text_lines.
+        """
+        if not hasattr(page, "extract_text_lines"):
+            page_text = page.extract_text() or ""
+            return [{"text": page_text, "top": 0.0, "bottom": 0.0, "size": None}] if page_text.strip() else []
+        
+        lines = []
+        for line in page.extract_text_lines(return_chars=True):
+            text = (line.get("text") or "").strip()
+            if not text:
+                continue
+            sizes = [c.get("size") for c in line.get("chars", []) if c.get("size")]
+            lines.append({
+                "text": text,
+                "top": line.get("top", 0.0),
+                "bottom": line.get("bottom", 0.0),
+                "size": round(sum(sizes) / len(sizes), 1) if sizes else None,
+            })
+        return lines
+    
+    def _heading_levels(self, page_lines: List[Tuple[int, List[Dict]]]) -> Tuple[Dict[float, int], Optional[float]]:
+        """
+        Map font sizes noticeably larger than the body size to heading levels (1 = largest).
+        
+        Returns:
+            (size -> level mapping, body font size)
+        """
+        size_chars: Counter = Counter()
+        for _, lines in page_lines:
+            for line in lines:
+                if line["size"]:
+                    size_chars[line["size"]] += len(line["text"])
+        if not size_chars:
+            return {}, None
+        
+        body_size = size_chars.most_common(1)[0][0]
+        heading_sizes = sorted(
+            (size for size in size_chars if size >= body_size * self.HEADING_SIZE_RATIO),
+            reverse=True
+        )
+        return {size: min(level, 6) for level, size in enumerate(heading_sizes, 1)}, body_size
+    
+    def _heading_level(self, size: Optional[float], heading_levels: Dict[float, int], body_size: Optional[float]) -> Optional[int]:
+        """Level for a line's font size; heading sizes first seen after the sample are ranked on the fly"""
+        if not size or not body_size:
+            return None
+        if size not in heading_levels:
+            if size < body_size * self.HEADING_SIZE_RATIO:
+                return None
+            heading_levels[size] = min(1 + sum(1 for known in heading_levels if known > size), 6)
+        return heading_levels[size]
+    
+    def _page_elements(
+        self,
+        page_num: int,
+        lines: List[Dict],
+        heading_levels: Dict[float, int],
+        body_size: Optional[float]
+    ) -> List[DocumentElement]:
+        """Group one page's extracted lines into heading and paragraph elements"""
+        elements: List[DocumentElement] = []
+        paragraph: List[str] = []
+        prev = None
+        
+        def flush():
+            if paragraph:
+                elements.append(DocumentElement(
+                    DocumentElement.PARAGRAPH, "\n".join(paragraph), page=page_num
+                ))
+                paragraph.clear()
+        
+        for line in lines:
+            level = self._heading_level(line["size"], heading_levels, body_size)
+            if level and len(line["text"]) <= self.MAX_HEADING_CHARS:
+                flush()
+                last = elements[-1] if elements else None
+                # Multi-line headings come through as consecutive lines of the same size
+                if prev is not None and prev.get("heading_level") == level and last and last.kind == DocumentElement.HEADING:
+                    last.text = f"{last.text} {line['text']}"
+                else:
+                    elements.append(DocumentElement(
+                        DocumentElement.HEADING, line["text"], level=level, page=page_num
+                    ))
+                prev = dict(line, heading_level=level)
+                continue
+            
+            # A vertical gap larger than ~a line height starts a new paragraph
+            if prev is not None and paragraph:
+                line_height = max(prev["bottom"] - prev["top"], 1.0)
+                if line["top"] - prev["bottom"] > 0.8 * line_height:
+                    flush()
+            paragraph.append(line["text"])
+            prev = line
+        
+        flush()
+        return elements
+    
+    def cache_key(self) -> str:
+        """Extraction backend and OCR change the output, so they are part of the key"""
+        return f"{self.get_name()}-{self.backend}{'-ocr' if self.ocr_enabled else ''}"
+    
     def can_parse(self, mime_type: str, file_extension: Optional[str] = None) -> bool:
         """Check if this parser can handle PDF files"""
         return (
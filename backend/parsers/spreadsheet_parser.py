@@ -0,0 +1,176 @@
+"""
+Spreadsheet Parsers
+
+CSV and XLSX parsers that turn each row into a self-describing record
+("Column: value" lines) so any chunk boundary keeps rows intact and
+readable without the header row. Rows are streamed: CSV through the shared
+single-pass text decoder, XLSX through openpyxl's read-only mode.
+"""
+
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence
+import csv
+import io
+import logging
+from parsers.base import BaseParser, DocumentElement, ParseResult, join_elements
+from parsers.text_parser import TextParser
+
+logger = logging.getLogger(__name__)
+
+
+def rows_to_elements(rows: Iterable[Sequence], title: Optional[str], metadata: dict) -> Iterator[DocumentElement]:
+    """
+    Turn a header row plus data rows into record elements.
+    
+    The first non-empty row is the header; blank headers fall back to
+    "Column N". Each data row becomes one paragraph element.
+    """
+    if title:
+        yield DocumentElement(DocumentElement.HEADING, title, level=1)
+    
+    header: Optional[List[str]] = None
+    for row in rows:
+        values = ["" if value is None else str(value).strip() for value in row]
+        if not any(values):
+            continue
+        if header is None:
+            header = [value or f"Column {n}" for n, value in enumerate(values, 1)]
+            metadata["columns"] = len(header)
+            continue
+        
+        fields = []
+        for n, value in enumerate(values):
+            if value:
+                name = header[n] if n < len(header) else f"Column {n + 1}"
+                fields.append(f"{name}: {value}")
+        if fields:
+            metadata["row_count"] = metadata.get("row_count", 0) + 1
+            yield DocumentElement(DocumentElement.PARAGRAPH, "\n".join(fields))
+
+
+class _SpreadsheetParser(BaseParser):
+    """Shared parse() for the streaming spreadsheet parsers"""
+    
+    supports_streaming = True
+    
+    NO_TEXT_MESSAGE = "Spreadsheet contains no data rows."
+    
+    def parse(self, file_content: bytes, file_path: Optional[str] = None) -> ParseResult:
+        """
+        Extract row records from a spreadsheet.
+        
+        Args:
+            file_content: File content as bytes
+            file_path: Optional file path for error messages
+        
+        Returns:
+            ParseResult with text and elements
+        """
+        try:
+            metadata: dict = {}
+            elements = list(self.iter_elements(io.BytesIO(file_content), metadata))
+            if not metadata.get("row_count"):
+                return ParseResult(
+                    text="",
+                    metadata=metadata,
+                    success=False,
+                    error_message=self.NO_TEXT_MESSAGE
+                )
+            text = join_elements(elements)
+            metadata["total_chars"] = len(text)
+            self.logger.info(f"Successfully parsed spreadsheet: {metadata['row_count']} rows")
+            return ParseResult(text=text, metadata=metadata, elements=elements)
+        except Exception as e:
+            error_msg = f"Failed to parse spreadsheet: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            return ParseResult(
+                text="",
+                metadata={},
+                success=False,
+                error_message=error_msg
+            )
+
+
+class CSVParser(_SpreadsheetParser):
+    """Parser for CSV/TSV files"""
+    
+    def __init__(self):
+        super().__init__()
+        # Encoding detection and the single-pass decoder are shared with TextParser
+        self._text = TextParser()
+    
+    def iter_elements(self, file_obj: BinaryIO, metadata: Optional[dict] = None) -> Iterator[DocumentElement]:
+        """Stream one record element per CSV row"""
+        metadata = metadata if metadata is not None else {}
+        sample = file_obj.read(self._text.SAMPLE_BYTES)
+        encoding, bom_length = self._text.detect_encoding(sample)
+        metadata["encoding"] = encoding
+        
+        sample_lines = sample[bom_length:].decode(encoding, errors="ignore").splitlines()
+        if len(sample) == self._text.SAMPLE_BYTES:
+            sample_lines = sample_lines[:-1]  # the last sampled line may be cut off
+        try:
+            dialect = csv.Sniffer().sniff("\n".join(sample_lines[:50]), delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        metadata["delimiter"] = dialect.delimiter
+        
+        file_obj.seek(bom_length)
+        # csv needs line terminators to keep newlines inside quoted fields
+        lines = (line + "\n" for line in self._text._iter_lines(file_obj, encoding))
+        yield from rows_to_elements(csv.reader(lines, dialect), None, metadata)
+    
+    def can_parse(self, mime_type: str, file_extension: Optional[str] = None) -> bool:
+        """Check if this parser can handle CSV files"""
+        return (
+            mime_type.lower() in ("text/csv", "text/tab-separated-values") or
+            bool(file_extension and file_extension.lower() in (".csv", ".tsv"))
+        )
+    
+    def get_supported_types(self) -> list[str]:
+        """Get supported MIME types"""
+        return ["text/csv", "text/tab-separated-values"]
+
+
+class XLSXParser(_SpreadsheetParser):
+    """Parser for Excel XLSX workbooks (every sheet, values only)"""
+    
+    def __init__(self):
+        super().__init__()
+        self._openpyxl = None
+    
+    def _get_openpyxl(self):
+        """Lazy load openpyxl to avoid import errors if not installed"""
+        if self._openpyxl is None:
+            try:
+                import openpyxl
+                self._openpyxl = openpyxl
+            except ImportError:
+                raise ImportError(
+                    "openpyxl is required for XLSX parsing. "
+                    "Install it with: pip install openpyxl"
+                )
+        return self._openpyxl
+    
+    def iter_elements(self, file_obj: BinaryIO, metadata: Optional[dict] = None) -> Iterator[DocumentElement]:
+        """Stream one heading per sheet followed by one record element per row"""
+        metadata = metadata if metadata is not None else {}
+        openpyxl = self._get_openpyxl()
+        # read_only streams rows from the sheet XML instead of loading the workbook
+        workbook = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+        try:
+            metadata["sheet_count"] = len(workbook.sheetnames)
+            for sheet in workbook.worksheets:
+                yield from rows_to_elements(sheet.iter_rows(values_only=True), sheet.title, metadata)
+        finally:
+            workbook.close()
+    
+    def can_parse(self, mime_type: str, file_extension: Optional[str] = None) -> bool:
+        """Check if this parser can handle XLSX files"""
+        return (
+            mime_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" or
+            bool(file_extension and file_extension.lower() == ".xlsx")
+        )
+    
+    def get_supported_types(self) -> list[str]:
+        """Get supported MIME types"""
+        return ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"]
@@ -2,12 +2,16 @@
 Text Parser
 
 Extracts text from plain text files (TXT).
-Handles various text encodings (UTF-8, ASCII, etc.).
+Detects the encoding once from a sample (BOM, UTF-8, charset detection) and
+decodes in a single incremental pass, so large files can be streamed.
 """
 
-from typing import Optional
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+import codecs
+import io
 import logging
-from parsers.base import BaseParser, ParseResult
+import re
+from parsers.base import BaseParser, DocumentElement, ParseResult
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +19,30 @@ logger = logging.getLogger(__name__)
 class TextParser(BaseParser):
     """Parser for plain text documents"""
     
+    supports_streaming = True
+    
+    NO_TEXT_MESSAGE = "Text file is empty."
+    
+    # Bytes sniffed for BOM/charset detection
+    SAMPLE_BYTES = 64 * 1024
+    # Bytes decoded per step of the single decode pass
+    BLOCK_BYTES = 1024 * 1024
+    # Paragraphs (and runaway lines) are cut at this size to bound memory
+    MAX_PARAGRAPH_CHARS = 64 * 1024
+    
+    # BOMs, longest first (the UTF-32 LE BOM starts with the UTF-16 LE one)
+    BOMS = [
+        (codecs.BOM_UTF32_LE, "utf-32-le"),
+        (codecs.BOM_UTF32_BE, "utf-32-be"),
+        (codecs.BOM_UTF8, "utf-8"),
+        (codecs.BOM_UTF16_LE, "utf-16-le"),
+        (codecs.BOM_UTF16_BE, "utf-16-be"),
+    ]
+    
+    # Same heading conventions the plain-text chunker recognizes
+    MARKDOWN_HEADING = re.compile(r'^(#{1,6})\s+(.+)$')
+    ALL_CAPS_HEADING = re.compile(r'^[A-Z][A-Z\s]{10,}$')
+    
     def __init__(self):
         super().__init__()
     
@@ -30,37 +58,19 @@ class TextParser(BaseParser):
             ParseResult with extracted text
         """
         try:
-            # Try UTF-8 first (most common)
-            encodings = ["utf-8", "utf-8-sig", "latin-1", "ascii", "cp1252"]
-            
-            text = None
-            used_encoding = None
-            
-            for encoding in encodings:
-                try:
-                    text = file_content.decode(encoding)
-                    used_encoding = encoding
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if text is None:
-                return ParseResult(
-                    text="",
-                    metadata={},
-                    success=False,
-                    error_message="Unable to decode text file. Unknown encoding."
-                )
+            file_obj = io.BytesIO(file_content)
+            used_encoding, bom_length = self.detect_encoding(file_obj.read(self.SAMPLE_BYTES))
+            file_obj.seek(bom_length)
             
             # Clean up text
-            text = text.strip()
+            text = "\n".join(self._iter_lines(file_obj, used_encoding)).strip()
             
             if not text:
                 return ParseResult(
                     text="",
                     metadata={"encoding": used_encoding},
                     success=False,
-                    error_message="Text file is empty."
+                    error_message=self.NO_TEXT_MESSAGE
                 )
             
             metadata = {
@@ -89,6 +99,125 @@ class TextParser(BaseParser):
                 error_message=error_msg
             )
     
+    def iter_elements(self, file_obj: BinaryIO, metadata: Optional[dict] = None) -> Iterator[DocumentElement]:
+        """
+        Stream heading and paragraph elements from a text file.
+        
+        The file is decoded once, block by block. Markdown (#) and ALL CAPS
+        lines become headings; blank lines separate paragraphs.
+        """
+        metadata = metadata if metadata is not None else {}
+        encoding, bom_length = self.detect_encoding(file_obj.read(self.SAMPLE_BYTES))
+        file_obj.seek(bom_length)
+        metadata.update({"encoding": encoding, "total_chars": 0, "total_lines": 0})
+        
+        paragraph: List[str] = []
+        paragraph_chars = 0
+        
+        def flush() -> Iterator[DocumentElement]:
+            nonlocal paragraph_chars
+            if paragraph:
+                yield DocumentElement(DocumentElement.PARAGRAPH, "\n".join(paragraph))
+                paragraph.clear()
+                paragraph_chars = 0
+        
+        for line in self._iter_lines(file_obj, encoding):
+            metadata["total_lines"] += 1
+            metadata["total_chars"] += len(line) + 1
+            stripped = line.strip()
+            
+            if not stripped:
+                yield from flush()
+                continue
+            
+            heading = self.MARKDOWN_HEADING.match(stripped)
+            if heading or self.ALL_CAPS_HEADING.match(stripped):
+                yield from flush()
+                yield DocumentElement(
+                    DocumentElement.HEADING,
+                    heading.group(2).strip() if heading else stripped,
+                    level=len(heading.group(1)) if heading else 1
+                )
+                continue
+            
+            paragraph.append(stripped)
+            paragraph_chars += len(stripped)
+            if paragraph_chars >= self.MAX_PARAGRAPH_CHARS:
+                yield from flush()
+        
+        yield from flush()
+    
+    def detect_encoding(self, sample: bytes) -> Tuple[str, int]:
+        """
+        Detect the encoding from a sample of the file.
+        
+        Checks for a BOM, then UTF-8 validity, then charset detection
+        (charset-normalizer, when installed), and finally cp1252/latin-1.
+        
+        Returns:
+            (codec name, BOM length to skip)
+        """
+        for bom, encoding in self.BOMS:
+            if sample.startswith(bom):
+                return encoding, len(bom)
+        
+        try:
+            # final=False: the sample may end mid-character
+            codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+            return "utf-8", 0
+        except UnicodeDecodeError:
+            pass
+        
+        try:
+            from charset_normalizer import from_bytes
+            best = from_bytes(sample).best()
+            if best is not None and best.encoding:
+                return best.encoding, 0
+        except ImportError:
+            pass
+        
+        try:
+            sample.decode("cp1252")
+            return "cp1252", 0
+        except UnicodeDecodeError:
+            # latin-1 maps every byte
+            return "latin-1", 0
+    
+    def _iter_lines(self, file_obj: BinaryIO, encoding: str) -> Iterator[str]:
+        """
+        Decode the file once, yielding lines with \r\n and \r normalized to \n.
+        
+        Bytes that don't decode (e.g. past a misleading sample) are replaced
+        rather than failing the whole file.
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        pending = ""
+        
+        while True:
+            block = file_obj.read(self.BLOCK_BYTES)
+            text = pending + decoder.decode(block, final=not block)
+            # A trailing \r may be the first half of a \r\n split across blocks
+            if block and text.endswith("\r"):
+                pending = "\r"
+                text = text[:-1]
+            else:
+                pending = ""
+            
+            lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+            tail = lines.pop()
+            yield from lines
+            
+            if not block:
+                if tail:
+                    yield tail
+                return
+            
+            if len(tail) >= self.MAX_PARAGRAPH_CHARS:
+                # Runaway line without newlines; don't let it grow unbounded
+                yield tail
+                tail = ""
+            pending = tail + pending
+    
     def can_parse(self, mime_type: str, file_extension: Optional[str] = None) -> bool:
         """Check if this parser can handle text files"""
         text_mimes = ["text/plain", "text/txt"]
@@ -0,0 +1,275 @@
+"""
+ZIP Parser
+
+Bulk import: every supported file inside a ZIP archive is handed to its own
+parser, fanned out across a process pool, and the results are emitted as one
+element stream in archive order. Each file starts with a heading carrying its
+path, so chunks never span files and citations keep the file name.
+Nested archives, hidden files and unsupported formats are skipped.
+"""
+
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import atexit
+import io
+import logging
+import mimetypes
+import os
+import threading
+import zipfile
+from config.settings import settings
+from parsers.base import BaseParser, ParseResult, DocumentElement, join_elements
+
+logger = logging.getLogger(__name__)
+
+ParsedMember = Tuple[List[DocumentElement], Optional[str]]
+
+# Shared member-parsing pool, created on first use
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# One ParserFactory per process (workers and the in-process fallback)
+_factory = None
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+            logger.info(f"ZIP parsing pool started: workers={workers}")
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _member_type(name: str) -> Tuple[str, str]:
+    """(mime type, extension) for an archive member, guessed from its name"""
+    extension = os.path.splitext(name)[1].lower()
+    return mimetypes.guess_type(name)[0] or "application/octet-stream", extension
+
+
+def _parse_member(name: str, data: bytes) -> ParsedMember:
+    """
+    Parse one archive member (runs in a worker).
+    
+    Returns:
+        (elements, error message); elements is empty when the member failed
+    """
+    global _factory
+    if _factory is None:
+        # Imported here: the factory itself registers ZipParser
+        from parsers.factory import ParserFactory
+        _factory = ParserFactory()
+    
+    mime_type, extension = _member_type(name)
+    parser = _factory.get_parser(mime_type, extension)
+    if parser is None or isinstance(parser, ZipParser):
+        return [], "unsupported file type"
+    
+    try:
+        if parser.supports_streaming:
+            elements = list(parser.iter_elements(io.BytesIO(data), {}))
+            if not any(e.text.strip() for e in elements):
+                return [], getattr(parser, "NO_TEXT_MESSAGE", "no extractable text")
+            return elements, None
+        
+        result = parser.parse(data, name)
+        if not result.success:
+            return [], result.error_message
+        if result.elements:
+            return result.elements, None
+        if result.text.strip():
+            return [DocumentElement(DocumentElement.PARAGRAPH, result.text.strip())], None
+        return [], "no extractable text"
+    except Exception as e:
+        return [], str(e)
+
+
+class ZipParser(BaseParser):
+    """Parser for ZIP archives of supported documents"""
+    
+    supports_streaming = True
+    
+    NO_TEXT_MESSAGE = "ZIP archive contains no supported files with text."
+    
+    def __init__(
+        self,
+        workers: int = settings.zip_workers,
+        max_files: int = settings.zip_max_files,
+        max_total_bytes: int = settings.zip_max_total_bytes
+    ):
+        """
+        Args:
+            workers: Process pool size for parsing members in parallel (0 = in-process)
+            max_files: Maximum number of files imported from one archive
+            max_total_bytes: Maximum total uncompressed size of imported files
+        """
+        super().__init__()
+        self.workers = workers
+        self.max_files = max_files
+        self.max_total_bytes = max_total_bytes
+    
+    def parse(self, file_content: bytes, file_path: Optional[str] = None) -> ParseResult:
+        """
+        Extract text from every supported file in a ZIP archive.
+        
+        Args:
+            file_content: ZIP file content as bytes
+            file_path: Optional file path for error messages
+        
+        Returns:
+            ParseResult with text and elements
+        """
+        try:
+            metadata: dict = {}
+            elements = list(self.iter_elements(io.BytesIO(file_content), metadata))
+            if not elements:
+                return ParseResult(
+                    text="",
+                    metadata=metadata,
+                    success=False,
+                    error_message=self.NO_TEXT_MESSAGE
+                )
+            text = join_elements(elements)
+            metadata["total_chars"] = len(text)
+            self.logger.info(
+                f"Successfully parsed ZIP archive: {metadata['file_count']} files, "
+                f"{len(metadata['skipped_files'])} skipped"
+            )
+            return ParseResult(text=text, metadata=metadata, elements=elements)
+        
+        except zipfile.BadZipFile as e:
+            error_msg = f"Invalid or corrupted ZIP file: {str(e)}"
+            self.logger.error(error_msg)
+            return ParseResult(
+                text="",
+                metadata={},
+                success=False,
+                error_message=error_msg
+            )
+        except Exception as e:
+            error_msg = f"Failed to parse ZIP archive: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            return ParseResult(
+                text="",
+                metadata={},
+                success=False,
+                error_message=error_msg
+            )
+    
+    def iter_elements(self, file_obj: BinaryIO, metadata: Optional[dict] = None) -> Iterator[DocumentElement]:
+        """Stream a file-name heading plus the parsed elements of each member, in archive order"""
+        metadata = metadata if metadata is not None else {}
+        metadata.update({"file_count": 0, "skipped_files": []})
+        
+        with zipfile.ZipFile(file_obj) as archive:
+            members = self._select_members(archive, metadata)
+            for name, (elements, error) in self._iter_parsed(archive, members):
+                if not elements:
+                    self.logger.info(f"Skipping {name} in ZIP archive: {error}")
+                    metadata["skipped_files"].append(name)
+                    continue
+                metadata["file_count"] += 1
+                yield DocumentElement(DocumentElement.HEADING, name, level=1)
+                yield from elements
+    
+    def _select_members(self, archive: zipfile.ZipFile, metadata: dict) -> List[zipfile.ZipInfo]:
+        """Regular, supported-looking files, within the file count and size limits"""
+        members = []
+        total_bytes = 0
+        for info in archive.infolist():
+            name = info.filename
+            basename = os.path.basename(name.rstrip("/"))
+            if info.is_dir() or name.startswith("__MACOSX/") or basename.startswith("."):
+                continue
+            if _member_type(name)[1] == ".zip":
+                metadata["skipped_files"].append(name)
+                continue
+            if len(members) >= self.max_files or total_bytes + info.file_size > self.max_total_bytes:
+                # Sizes come from the archive directory; reads are capped below as well
+                metadata["skipped_files"].append(name)
+                continue
+            total_bytes += info.file_size
+            members.append(info)
+        return members
+    
+    def _read_member(self, archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+        """Read a member, refusing to inflate past its declared size"""
+        with archive.open(info) as member:
+            data = member.read(info.file_size + 1)
+        if len(data) > info.file_size:
+            raise ValueError(f"{info.filename} is larger than its declared size")
+        return data
+    
+    def _iter_parsed(self, archive: zipfile.ZipFile, members: List[zipfile.ZipInfo]) -> Iterator[Tuple[str, ParsedMember]]:
+        """
+        Parse members across the process pool, yielding results in archive order.
+        
+        At most workers * 2 members are read and in flight at once, which
+        bounds memory for large archives. If the pool fails, the remaining
+        members are parsed in-process.
+        """
+        pending = deque(members)
+        if self.workers > 0 and len(members) > 1:
+            pool = _get_pool(self.workers)
+            in_flight = deque()
+            try:
+                while pending or in_flight:
+                    while pending and len(in_flight) < self.workers * 2:
+                        info = pending.popleft()
+                        try:
+                            data = self._read_member(archive, info)
+                        except Exception as e:
+                            in_flight.append((info, None, str(e)))
+                            continue
+                        try:
+                            future = pool.submit(_parse_member, info.filename, data)
+                        except Exception:
+                            pending.appendleft(info)
+                            raise
+                        in_flight.append((info, future, None))
+                    info, future, error = in_flight[0]
+                    parsed = ([], error) if future is None else future.result()
+                    in_flight.popleft()
+                    yield info.filename, parsed
+            except Exception as e:
+                for _, future, _ in in_flight:
+                    if future is not None:
+                        future.cancel()
+                if isinstance(e, BrokenProcessPool):
+                    _reset_pool()
+                self.logger.warning(f"Parallel ZIP parsing failed, continuing in-process: {str(e)}")
+                # Members not yet yielded are re-parsed here
+                pending.extendleft(reversed([info for info, _, _ in in_flight]))
+        
+        while pending:
+            info = pending.popleft()
+            try:
+                parsed = _parse_member(info.filename, self._read_member(archive, info))
+            except Exception as e:
+                parsed = ([], str(e))
+            yield info.filename, parsed
+    
+    def cache_key(self) -> str:
+        """Members are parsed with the default PDF settings, which change the output"""
+        return f"{self.get_name()}-{settings.pdf_backend}{'-ocr' if settings.pdf_ocr_enabled else ''}"
+    
+    def can_parse(self, mime_type: str, file_extension: Optional[str] = None) -> bool:
+        """Check if this parser can handle ZIP archives"""
+        return (
+            mime_type.lower() in ("application/zip", "application/x-zip-compressed") or
+            bool(file_extension and file_extension.lower() == ".zip")
+        )
+    
+    def get_supported_types(self) -> list[str]:
+        """Get supported MIME types"""
+        return ["application/zip", "application/x-zip-compressed"]
@@ -181,6 +181,156 @@ class ChunkRepository:
             logger.error(f"Error deleting chunks for source {source_id}: {str(e)}")
             raise DatabaseError(f"Failed to delete chunks: {str(e)}")
 
+    def delete_chunks_from_index(self, source_id: UUID, first_index: int) -> None:
+        """
+        Delete a source's chunks from chunk_index first_index on.
+
+        Used when resuming ingestion to drop chunks stored after the last
+        checkpoint (e.g. a batch inserted just before a crash).
+
+        Args:
+            source_id: ID of the source
+            first_index: First chunk_index to delete (0 deletes all chunks)
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            (
+                self.client.table("chunks")
+                .delete()
+                .eq("source_id", str(source_id))
+                .gte("chunk_index", first_index)
+                .execute()
+            )
+            logger.debug(f"Deleted chunks for source {source_id} from index {first_index}")
+
+        except Exception as e:
+            logger.error(f"Error deleting chunks for source {source_id}: {str(e)}")
+            raise DatabaseError(f"Failed to delete chunks: {str(e)}")
+
+    def get_unembedded_chunks(self, source_id: UUID, after_index: int, limit: int) -> List[dict]:
+        """
+        Get the next page of a source's chunks that have no embedding yet.
+
+        Pages are keyset-paginated by chunk_index so embedding can resume
+        where it stopped.
+
+        Args:
+            source_id: ID of the source
+            after_index: Last chunk_index processed (exclusive), -1 to start
+            limit: Page size
+
+        Returns:
+            List of {id, chunk_index, excerpt} records ordered by chunk_index
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            response = (
+                self.client.table("chunks")
+                .select("id, chunk_index, excerpt")
+                .eq("source_id", str(source_id))
+                .is_("embedding", "null")
+                .gt("chunk_index", after_index)
+                .order("chunk_index", desc=False)
+                .limit(limit)
+                .execute()
+            )
+            return response.data or []
+
+        except Exception as e:
+            logger.error(f"Error fetching unembedded chunks for source {source_id}: {str(e)}")
+            raise DatabaseError(f"Failed to fetch chunks: {str(e)}")
+
+    def get_chunk_fingerprints(self, source_id: UUID, page_size: int = 1000) -> List[dict]:
+        """
+        Get every chunk of a source without its text or embedding.
+
+        Used to diff a re-chunked source against its stored chunks.
+
+        Args:
+            source_id: ID of the source
+            page_size: Rows fetched per request
+
+        Returns:
+            List of {id, chunk_index, content_hash, heading, char_range,
+            tokens_estimate, page_start, page_end, page_url} records
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            rows: List[dict] = []
+            after_id: Optional[str] = None
+            while True:
+                query = (
+                    self.client.table("chunks")
+                    .select("id, chunk_index, content_hash, heading, char_range, tokens_estimate, page_start, page_end, page_url")
+                    .eq("source_id", str(source_id))
+                )
+                if after_id:
+                    query = query.gt("id", after_id)
+                page = query.order("id", desc=False).limit(page_size).execute().data or []
+                rows.extend(page)
+                if len(page) < page_size:
+                    return rows
+                after_id = page[-1]["id"]
+
+        except Exception as e:
+            logger.error(f"Error fetching chunk fingerprints for source {source_id}: {str(e)}")
+            raise DatabaseError(f"Failed to fetch chunks: {str(e)}")
+
+    def update_chunk_positions(self, updates: List[dict]) -> int:
+        """
+        Move existing chunks to new positions/metadata in one statement.
+
+        Args:
+            updates: {id, chunk_index, heading, char_range, tokens_estimate,
+                page_start, page_end, page_url} records; text and embedding are untouched
+
+        Returns:
+            Number of updated rows
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        if not updates:
+            return 0
+
+        try:
+            response = self.client.rpc("update_chunk_positions", {"updates": updates}).execute()
+            return int(response.data or 0)
+
+        except Exception as e:
+            logger.error(f"Error updating chunk positions: count={len(updates)}, error={str(e)}")
+            raise DatabaseError(f"Failed to update chunks: {str(e)}")
+
+    def delete_chunks_by_ids(self, chunk_ids: List[str], batch_size: int = 200) -> None:
+        """
+        Delete chunks by ID.
+
+        Args:
+            chunk_ids: IDs of chunks to delete
+            batch_size: IDs per request (they are sent in the URL)
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            for i in range(0, len(chunk_ids), batch_size):
+                (
+                    self.client.table("chunks")
+                    .delete()
+                    .in_("id", chunk_ids[i : i + batch_size])
+                    .execute()
+                )
+
+        except Exception as e:
+            logger.error(f"Error deleting chunks: count={len(chunk_ids)}, error={str(e)}")
+            raise DatabaseError(f"Failed to delete chunks: {str(e)}")
+
     def count_chunks_by_source(self, source_id: UUID) -> int:
         """
         Count chunks for a source.
@@ -208,13 +358,19 @@ class ChunkRepository:
             logger.error(f"Error counting chunks for source {source_id}: {str(e)}")
             raise DatabaseError(f"Failed to count chunks: {str(e)}")
 
-    def update_chunk_embeddings(self, chunk_ids: List[UUID], embeddings: List[List[float]]) -> int:
+    def update_chunk_embeddings(
+        self,
+        chunk_ids: List[UUID],
+        embeddings: List[List[float]],
+        column: str = "embedding",
+    ) -> int:
         """
         Update embeddings for a batch of chunks.
 
         Args:
             chunk_ids: IDs of chunks to update
             embeddings: Corresponding embedding vectors
+            column: Vector column to write ("embedding", or "embedding_next" during migrations)
 
         Returns:
             Number of updated rows
@@ -231,7 +387,7 @@ class ChunkRepository:
             for cid, vec in zip(chunk_ids, embeddings):
                 response = (
                     self.client.table("chunks")
-                    .update({"embedding": vec})
+                    .update({column: vec})
                     .eq("id", str(cid))
                     .execute()
                 )
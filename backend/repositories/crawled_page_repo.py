@@ -0,0 +1,116 @@
+"""
+Crawled Page Repository
+
+Handles database operations for crawled_pages: per-page state of a URL
+source's last site crawl (sitemap lastmod, HTTP validators, checksums, links),
+used to skip pages that haven't changed when the site is crawled again.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+import logging
+
+from core.exceptions import DatabaseError
+from config.supabasedb import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Per-page state recorded by save_pages
+PAGE_STATE_FIELDS = (
+    "url", "page_url", "lastmod", "etag", "last_modified", "page_checksum", "body_checksum", "simhash", "links",
+)
+
+
+class CrawledPageRepository:
+    """Repository for crawled page state"""
+
+    WRITE_BATCH_SIZE = 500
+
+    def __init__(self, access_token: Optional[str] = None):
+        """
+        Initialize the repository with a Supabase client.
+
+        Args:
+            access_token: User's JWT token for RLS-enabled operations.
+                         If None, uses service role (ingestion workers).
+        """
+        if access_token is None:
+            self.client = get_supabase_client(use_service_role=True)
+        else:
+            self.client = get_supabase_client(access_token=access_token)
+
+    def get_pages(self, source_id: UUID, page_size: int = 1000) -> Dict[str, dict]:
+        """
+        Get the state of every page of a source's last crawl.
+
+        Args:
+            source_id: ID of the source
+            page_size: Rows fetched per request
+
+        Returns:
+            Mapping of requested URL to its page record
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            pages: Dict[str, dict] = {}
+            offset = 0
+            while True:
+                response = (
+                    self.client.table("crawled_pages")
+                    .select("*")
+                    .eq("source_id", str(source_id))
+                    .order("url", desc=False)
+                    .range(offset, offset + page_size - 1)
+                    .execute()
+                )
+                rows = response.data or []
+                for row in rows:
+                    pages[row["url"]] = row
+                if len(rows) < page_size:
+                    return pages
+                offset += page_size
+
+        except Exception as e:
+            logger.error(f"Error fetching crawled pages for source {source_id}: {str(e)}")
+            raise DatabaseError(f"Failed to fetch crawled pages: {str(e)}")
+
+    def save_pages(self, source_id: UUID, bot_id: UUID, pages: List[dict], crawled_at: datetime) -> None:
+        """
+        Record the pages of a finished crawl and forget pages it no longer found.
+
+        Args:
+            source_id: ID of the source
+            bot_id: ID of the bot
+            pages: {url, page_url, lastmod, etag, last_modified, page_checksum,
+                body_checksum, simhash, links} records of the crawl's indexed pages
+            crawled_at: Start of the crawl; older records are deleted
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        stamp = crawled_at.isoformat()
+        rows = [
+            {**page, "source_id": str(source_id), "bot_id": str(bot_id), "crawled_at": stamp}
+            for page in pages
+        ]
+        try:
+            for i in range(0, len(rows), self.WRITE_BATCH_SIZE):
+                self.client.table("crawled_pages").upsert(
+                    rows[i : i + self.WRITE_BATCH_SIZE],
+                    on_conflict="source_id,url",
+                ).execute()
+            (
+                self.client.table("crawled_pages")
+                .delete()
+                .eq("source_id", str(source_id))
+                .lt("crawled_at", stamp)
+                .execute()
+            )
+            logger.debug(f"Crawled pages saved: source_id={source_id}, pages={len(rows)}")
+
+        except Exception as e:
+            logger.error(f"Crawled page save failed: source_id={source_id}, pages={len(rows)}, error={str(e)}")
+            raise DatabaseError(f"Failed to save crawled pages: {str(e)}")
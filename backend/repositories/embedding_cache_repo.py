@@ -0,0 +1,131 @@
+"""
+Embedding Cache Repository
+
+Handles database operations for the content-addressed embedding cache.
+Entries are keyed by (content_hash, provider, model, dimension) and are shared
+across sources and bots, so the table is only accessed with the service role.
+"""
+
+from typing import Dict, List
+import json
+import logging
+
+from core.exceptions import DatabaseError
+from config.supabasedb import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCacheRepository:
+    """Repository for embedding cache operations"""
+
+    # PostgREST encodes `in` filters in the URL; keep lookups well below URL limits
+    LOOKUP_BATCH_SIZE = 100
+
+    def __init__(self):
+        """
+        Initialize the repository with a service role Supabase client.
+
+        Cached vectors are not tied to a single bot, so RLS does not apply.
+        """
+        self.client = get_supabase_client(use_service_role=True)
+
+    @staticmethod
+    def _parse_vector(raw) -> List[float]:
+        """pgvector columns come back from PostgREST as a '[x,y,...]' string."""
+        if isinstance(raw, str):
+            return json.loads(raw)
+        return list(raw or [])
+
+    def get_embeddings(
+        self,
+        content_hashes: List[str],
+        provider: str,
+        model: str,
+        dimension: int,
+    ) -> Dict[str, List[float]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            content_hashes: sha256 hex digests of chunk texts
+            provider: Embedding provider name
+            model: Embedding model name
+            dimension: Embedding dimension
+
+        Returns:
+            Mapping of content_hash to embedding vector for every cache hit
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        if not content_hashes:
+            return {}
+
+        unique_hashes = list(dict.fromkeys(content_hashes))
+        found: Dict[str, List[float]] = {}
+        try:
+            for i in range(0, len(unique_hashes), self.LOOKUP_BATCH_SIZE):
+                batch = unique_hashes[i : i + self.LOOKUP_BATCH_SIZE]
+                response = (
+                    self.client.table("embedding_cache")
+                    .select("content_hash, embedding")
+                    .eq("provider", provider)
+                    .eq("model", model)
+                    .eq("dimension", dimension)
+                    .in_("content_hash", batch)
+                    .execute()
+                )
+                for row in response.data or []:
+                    found[row["content_hash"]] = self._parse_vector(row.get("embedding"))
+            return found
+        except Exception as e:
+            logger.error(f"Embedding cache lookup failed: provider={provider}, model={model}, error={str(e)}")
+            raise DatabaseError(f"Failed to read embedding cache: {str(e)}")
+
+    def upsert_embeddings(
+        self,
+        entries: Dict[str, List[float]],
+        provider: str,
+        model: str,
+        dimension: int,
+    ) -> int:
+        """
+        Store embeddings in the cache, ignoring entries that already exist.
+
+        Args:
+            entries: Mapping of content_hash to embedding vector
+            provider: Embedding provider name
+            model: Embedding model name
+            dimension: Embedding dimension
+
+        Returns:
+            Number of entries written
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        if not entries:
+            return 0
+
+        rows = [
+            {
+                "content_hash": content_hash,
+                "provider": provider,
+                "model": model,
+                "dimension": dimension,
+                "embedding": vector,
+            }
+            for content_hash, vector in entries.items()
+        ]
+        try:
+            self.client.table("embedding_cache").upsert(
+                rows,
+                on_conflict="content_hash,provider,model,dimension",
+                ignore_duplicates=True,
+            ).execute()
+            logger.debug(f"Embedding cache updated: provider={provider}, model={model}, entries={len(rows)}")
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Embedding cache write failed: provider={provider}, model={model}, error={str(e)}")
+            raise DatabaseError(f"Failed to write embedding cache: {str(e)}")
@@ -0,0 +1,188 @@
+"""
+Embedding Migration Repository
+
+Handles database operations for re-embedding jobs and the `embedding_next`
+shadow column. Migrations are operator jobs, so the service role is used.
+"""
+
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import logging
+
+from core.exceptions import DatabaseError, NotFoundError
+from config.supabasedb import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingMigrationRepository:
+    """Repository for embedding migration operations"""
+
+    def __init__(self):
+        """Initialize the repository with a service role Supabase client."""
+        self.client = get_supabase_client(use_service_role=True)
+
+    def create_job(
+        self,
+        bot_id: Optional[UUID],
+        provider: str,
+        model: str,
+        dimension: int,
+        total_chunks: int,
+    ) -> Dict[str, Any]:
+        """
+        Create a migration job record.
+
+        Args:
+            bot_id: Bot to migrate, or None for all bots
+            provider: Target embedding provider
+            model: Target embedding model
+            dimension: Target embedding dimension
+            total_chunks: Number of chunks in scope when the job was created
+
+        Returns:
+            Created job record
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            payload = {
+                "bot_id": str(bot_id) if bot_id else None,
+                "provider": provider,
+                "model": model,
+                "dimension": dimension,
+                "total_chunks": total_chunks,
+                "status": "pending",
+            }
+            response = self.client.table("embedding_migrations").insert(payload).execute()
+            if not response.data:
+                raise DatabaseError("Failed to create embedding migration")
+            return response.data[0]
+        except DatabaseError:
+            raise
+        except Exception as e:
+            logger.error(f"Embedding migration creation failed: bot_id={bot_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to create embedding migration: {str(e)}")
+
+    def get_job(self, job_id: UUID) -> Dict[str, Any]:
+        """
+        Get a migration job by ID.
+
+        Raises:
+            NotFoundError: If the job does not exist
+            DatabaseError: If database operation fails
+        """
+        try:
+            response = (
+                self.client.table("embedding_migrations")
+                .select("*")
+                .eq("id", str(job_id))
+                .maybe_single()
+                .execute()
+            )
+        except Exception as e:
+            logger.error(f"Error fetching embedding migration {job_id}: {str(e)}")
+            raise DatabaseError(f"Failed to fetch embedding migration: {str(e)}")
+        if not response or not response.data:
+            raise NotFoundError("Embedding migration", str(job_id))
+        return response.data
+
+    def update_job(self, job_id: UUID, fields: Dict[str, Any]) -> None:
+        """
+        Update progress/status fields of a migration job.
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            self.client.table("embedding_migrations").update(fields).eq("id", str(job_id)).execute()
+        except Exception as e:
+            logger.error(f"Embedding migration update failed: job_id={job_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to update embedding migration: {str(e)}")
+
+    def count_chunks(self, bot_id: Optional[UUID]) -> int:
+        """Count chunks in the migration scope."""
+        try:
+            query = self.client.table("chunks").select("id", count="exact")
+            if bot_id:
+                query = query.eq("bot_id", str(bot_id))
+            response = query.limit(1).execute()
+            return response.count or 0
+        except Exception as e:
+            logger.error(f"Error counting chunks for migration: bot_id={bot_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to count chunks: {str(e)}")
+
+    def get_pending_chunks(
+        self,
+        bot_id: Optional[UUID],
+        after_id: Optional[str],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the next page of chunks whose shadow embedding is still missing.
+
+        Pages are keyset-paginated by chunk id so a job can resume from its cursor.
+
+        Args:
+            bot_id: Bot scope, or None for all bots
+            after_id: Last chunk id processed (exclusive), or None to start over
+            limit: Page size
+
+        Returns:
+            List of {id, excerpt} records ordered by id
+        """
+        try:
+            query = (
+                self.client.table("chunks")
+                .select("id, excerpt")
+                .is_("embedding_next", "null")
+            )
+            if bot_id:
+                query = query.eq("bot_id", str(bot_id))
+            if after_id:
+                query = query.gt("id", after_id)
+            response = query.order("id", desc=False).limit(limit).execute()
+            return response.data or []
+        except Exception as e:
+            logger.error(f"Error fetching chunks for migration: bot_id={bot_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to fetch chunks: {str(e)}")
+
+    def reset_shadow(self, bot_id: Optional[UUID], dimension: int) -> int:
+        """Clear `embedding_next` in scope before a fresh migration, as vector(dimension)."""
+        try:
+            response = self.client.rpc(
+                "reset_embedding_shadow",
+                {"target_dimension": dimension, "bot_uuid": str(bot_id) if bot_id else None},
+            ).execute()
+            return int(response.data or 0)
+        except Exception as e:
+            logger.error(f"Shadow embedding reset failed: bot_id={bot_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to reset shadow embeddings: {str(e)}")
+
+    def shadow_dimension(self) -> Optional[int]:
+        """Dimension of the `embedding_next` column."""
+        try:
+            response = self.client.rpc("shadow_embedding_dimension", {}).execute()
+            return int(response.data) if response.data is not None else None
+        except Exception as e:
+            logger.error(f"Error fetching shadow embedding dimension: {str(e)}")
+            raise DatabaseError(f"Failed to fetch shadow embedding dimension: {str(e)}")
+
+    def switch_column(self, bot_id: Optional[UUID]) -> int:
+        """
+        Atomically make `embedding_next` the searched embedding.
+
+        Returns:
+            Chunks switched, or -N if N embedded chunks in scope have no
+            shadow vector yet (nothing was switched)
+        """
+        try:
+            response = self.client.rpc(
+                "switch_embedding_column",
+                {"bot_uuid": str(bot_id) if bot_id else None},
+            ).execute()
+            return int(response.data or 0)
+        except Exception as e:
+            logger.error(f"Embedding column switch failed: bot_id={bot_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to switch embedding column: {str(e)}")
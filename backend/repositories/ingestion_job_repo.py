@@ -0,0 +1,200 @@
+"""
+Ingestion Job Repository
+
+Handles database operations for the durable ingestion job queue
+(`ingestion_jobs`). Jobs are enqueued by the API and claimed by worker
+processes, so the service role is used.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from uuid import UUID
+import logging
+
+from core.exceptions import DatabaseError, ValidationError
+from config.supabasedb import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Postgres unique_violation: the source already has a queued or running job
+UNIQUE_VIOLATION = "23505"
+
+
+class IngestionJobRepository:
+    """Repository for ingestion job queue operations"""
+
+    def __init__(self):
+        """Initialize the repository with a service role Supabase client."""
+        self.client = get_supabase_client(use_service_role=True)
+
+    def enqueue(self, source_id: UUID, bot_id: UUID, max_attempts: int) -> Dict[str, Any]:
+        """
+        Queue a source for ingestion.
+
+        Args:
+            source_id: Source to parse, chunk and embed
+            bot_id: Owning bot (used for per-bot fairness)
+            max_attempts: Attempts before the job is marked failed
+
+        Returns:
+            Created job record
+
+        Raises:
+            ValidationError: If the source already has a queued or running job
+            DatabaseError: If database operation fails
+        """
+        try:
+            payload = {
+                "source_id": str(source_id),
+                "bot_id": str(bot_id),
+                "max_attempts": max_attempts,
+                "status": "queued",
+            }
+            response = self.client.table("ingestion_jobs").insert(payload).execute()
+            if not response.data:
+                raise DatabaseError("Failed to enqueue ingestion job")
+            logger.debug(f"Ingestion job queued: job_id={response.data[0].get('id')}, source_id={source_id}")
+            return response.data[0]
+        except DatabaseError:
+            raise
+        except Exception as e:
+            if getattr(e, "code", None) == UNIQUE_VIOLATION:
+                raise ValidationError("Source is already queued for indexing")
+            logger.error(f"Ingestion job enqueue failed: source_id={source_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to enqueue ingestion job: {str(e)}")
+
+    def has_active_job(self, source_id: UUID) -> bool:
+        """
+        Whether a source has a queued or running job.
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            response = (
+                self.client.table("ingestion_jobs")
+                .select("id")
+                .eq("source_id", str(source_id))
+                .in_("status", ["queued", "running"])
+                .limit(1)
+                .execute()
+            )
+            return bool(response.data)
+        except Exception as e:
+            logger.error(f"Ingestion job lookup failed: source_id={source_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to look up ingestion jobs: {str(e)}")
+
+    def claim(self, worker_id: str, lease_seconds: int, max_running_per_bot: int) -> Optional[Dict[str, Any]]:
+        """
+        Claim the next due job (SELECT ... FOR UPDATE SKIP LOCKED).
+
+        Returns:
+            Claimed job record, or None if nothing is due
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            response = self.client.rpc(
+                "claim_ingestion_job",
+                {
+                    "worker_id": worker_id,
+                    "lease_seconds": lease_seconds,
+                    "max_running_per_bot": max_running_per_bot,
+                },
+            ).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            logger.error(f"Ingestion job claim failed: worker_id={worker_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to claim ingestion job: {str(e)}")
+
+    def enqueue_due_refreshes(self, refresh_interval_seconds: int, max_attempts: int, limit: int = 100) -> int:
+        """
+        Queue a refresh crawl for indexed URL sources not crawled within the interval.
+
+        Returns:
+            Number of jobs queued
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            response = self.client.rpc(
+                "enqueue_url_refreshes",
+                {
+                    "refresh_interval_seconds": refresh_interval_seconds,
+                    "max_attempts": max_attempts,
+                    "batch_limit": limit,
+                },
+            ).execute()
+            return int(response.data or 0)
+        except Exception as e:
+            logger.error(f"URL refresh enqueue failed: error={str(e)}")
+            raise DatabaseError(f"Failed to enqueue URL refreshes: {str(e)}")
+
+    def heartbeat(self, job_id: UUID, worker_id: str) -> None:
+        """
+        Renew a running job's lease.
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        self._update(
+            job_id,
+            {"locked_at": datetime.now(timezone.utc).isoformat()},
+            worker_id=worker_id,
+        )
+
+    def complete(self, job_id: UUID, worker_id: str) -> None:
+        """Mark a job succeeded."""
+        now = datetime.now(timezone.utc).isoformat()
+        self._update(
+            job_id,
+            {"status": "succeeded", "locked_by": None, "locked_at": None, "finished_at": now},
+            worker_id=worker_id,
+        )
+
+    def retry(self, job_id: UUID, worker_id: str, run_at: datetime, error: str) -> None:
+        """Release a failed job back to the queue, due again at run_at."""
+        self._update(
+            job_id,
+            {
+                "status": "queued",
+                "run_at": run_at.isoformat(),
+                "locked_by": None,
+                "locked_at": None,
+                "last_error": error,
+            },
+            worker_id=worker_id,
+        )
+
+    def fail(self, job_id: UUID, worker_id: str, error: str) -> None:
+        """Mark a job permanently failed."""
+        now = datetime.now(timezone.utc).isoformat()
+        self._update(
+            job_id,
+            {"status": "failed", "locked_by": None, "locked_at": None, "last_error": error, "finished_at": now},
+            worker_id=worker_id,
+        )
+
+    def _update(self, job_id: UUID, fields: Dict[str, Any], worker_id: str) -> None:
+        """
+        Update a job this worker holds.
+
+        Filtering on locked_by keeps a worker whose lease expired (and whose
+        job was reclaimed) from overwriting the new owner's state.
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            (
+                self.client.table("ingestion_jobs")
+                .update(fields)
+                .eq("id", str(job_id))
+                .eq("locked_by", worker_id)
+                .execute()
+            )
+        except Exception as e:
+            logger.error(f"Ingestion job update failed: job_id={job_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to update ingestion job: {str(e)}")
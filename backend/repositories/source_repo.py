@@ -18,14 +18,18 @@ logger = logging.getLogger(__name__)
 class SourceRepository:
     """Repository for source operations"""
 
-    def __init__(self, access_token: Optional[str] = None):
+    def __init__(self, access_token: Optional[str] = None, use_service_role: bool = False):
         """
         Initialize the repository with a Supabase client.
         
         Args:
             access_token: User's JWT token for RLS-enabled operations
+            use_service_role: Bypass RLS (ingestion workers, which have no user token)
         """
-        self.client = get_supabase_client(access_token=access_token)
+        if use_service_role:
+            self.client = get_supabase_client(use_service_role=True)
+        else:
+            self.client = get_supabase_client(access_token=access_token)
         self.access_token = access_token
 
     def create_source(self, source_data: dict) -> dict:
@@ -161,6 +165,103 @@ class SourceRepository:
             logger.error(f"Source status update failed: source_id={source_id}, status={status}, error={str(e)}")
             raise DatabaseError(f"Failed to update source status: {str(e)}")
 
+    def update_ingest_checkpoint(
+        self,
+        source_id: UUID,
+        stage: Optional[str],
+        checkpoint: dict,
+    ) -> None:
+        """
+        Persist ingestion progress so a retry can resume from the last completed stage.
+
+        Args:
+            source_id: ID of the source
+            stage: Last completed stage (see IngestStage), or None to start over
+            checkpoint: Progress within the stage (chunks stored, batches embedded)
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            (
+                self.client.table("sources")
+                .update({"ingest_stage": stage, "ingest_checkpoint": checkpoint})
+                .eq("id", str(source_id))
+                .execute()
+            )
+            logger.debug(f"Ingest checkpoint: source_id={source_id}, stage={stage}, checkpoint={checkpoint}")
+
+        except Exception as e:
+            logger.error(f"Ingest checkpoint update failed: source_id={source_id}, stage={stage}, error={str(e)}")
+            raise DatabaseError(f"Failed to update ingest checkpoint: {str(e)}")
+
+    def update_crawl_metadata(self, source_id: UUID, fields: dict) -> None:
+        """
+        Store the result of a URL source's crawl.
+
+        Args:
+            source_id: ID of the source
+            fields: Any of canonical_url, etag, last_modified, page_checksum,
+                last_crawled_at, crawl_boilerplate
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            (
+                self.client.table("sources")
+                .update(fields)
+                .eq("id", str(source_id))
+                .execute()
+            )
+            logger.debug(f"Crawl metadata updated: source_id={source_id}, fields={list(fields)}")
+
+        except Exception as e:
+            logger.error(f"Crawl metadata update failed: source_id={source_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to update crawl metadata: {str(e)}")
+
+    def set_content_sha256(self, source_id: UUID, content_sha256: str) -> None:
+        """
+        Record the sha256 of a source's file (parsed-text cache key).
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            (
+                self.client.table("sources")
+                .update({"content_sha256": content_sha256})
+                .eq("id", str(source_id))
+                .execute()
+            )
+
+        except Exception as e:
+            logger.error(f"Content hash update failed: source_id={source_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to update content hash: {str(e)}")
+
+    def content_sha256_in_use(self, content_sha256: str) -> bool:
+        """
+        Whether any source (of any bot) still has a file with this sha256.
+
+        Needs a service role repository to see other users' sources.
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            response = (
+                self.client.table("sources")
+                .select("id")
+                .eq("content_sha256", content_sha256)
+                .limit(1)
+                .execute()
+            )
+            return bool(response.data)
+
+        except Exception as e:
+            logger.error(f"Content hash lookup failed: sha256={content_sha256}, error={str(e)}")
+            raise DatabaseError(f"Failed to look up content hash: {str(e)}")
+
     def delete_source(self, source_id: UUID, bot_id: UUID) -> bool:
         """
         Delete a source.
@@ -0,0 +1,145 @@
+"""
+Storage Repository
+
+Handles Supabase Storage object operations (uploaded source files and
+derived artifacts such as the parsed-text cache). Uses the service role;
+callers are responsible for authorization.
+"""
+
+from tempfile import SpooledTemporaryFile
+from typing import Optional
+import logging
+
+import httpx
+
+from core.exceptions import DatabaseError
+from config.settings import settings
+from config.supabasedb import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+class StorageRepository:
+    """Repository for storage bucket operations"""
+
+    # Read size when streaming downloads into a spool
+    DOWNLOAD_BLOCK_SIZE = 1024 * 1024
+    SIGNED_URL_TTL_SECONDS = 300
+
+    def __init__(self, bucket: str = "sources"):
+        """
+        Initialize the repository with a service role Supabase client.
+
+        Args:
+            bucket: Storage bucket name
+        """
+        self.client = get_supabase_client(use_service_role=True)
+        self.bucket = bucket
+
+    def download(self, path: str) -> bytes:
+        """
+        Download an object into memory.
+
+        Raises:
+            DatabaseError: If the download fails
+        """
+        try:
+            response = self.client.storage.from_(self.bucket).download(path)
+            if not response:
+                raise DatabaseError(f"Failed to download file from storage: {path}")
+            return response
+        except DatabaseError:
+            raise
+        except Exception as e:
+            logger.error(f"File download failed: path={path}, error={str(e)}")
+            raise DatabaseError(f"Failed to download file: {str(e)}")
+
+    def download_to_spool(self, path: str, missing_ok: bool = False) -> Optional[SpooledTemporaryFile]:
+        """
+        Download an object into a spooled temp file.
+
+        The body is streamed through a short-lived signed URL, so large objects
+        are written to disk in blocks rather than held in memory. If no signed
+        URL can be created, this falls back to a regular download.
+
+        Args:
+            path: Object path in the bucket
+            missing_ok: Return None instead of raising when the object doesn't exist
+
+        Returns:
+            Spool positioned at 0 (caller closes it), or None if missing and missing_ok
+
+        Raises:
+            DatabaseError: If the download fails
+        """
+        spool = SpooledTemporaryFile(max_size=settings.ingest_spool_max_bytes)
+        try:
+            try:
+                signed = self.client.storage.from_(self.bucket).create_signed_url(path, self.SIGNED_URL_TTL_SECONDS)
+                url = (signed or {}).get("signedURL") or (signed or {}).get("signedUrl")
+            except Exception as e:
+                if missing_ok:
+                    # Signing fails for objects that don't exist
+                    spool.close()
+                    return None
+                logger.debug(f"Signed URL unavailable, using direct download: path={path}, reason={str(e)}")
+                url = None
+
+            if url:
+                with httpx.stream("GET", url, timeout=60.0, follow_redirects=True) as response:
+                    if response.status_code in (400, 404) and missing_ok:
+                        spool.close()
+                        return None
+                    response.raise_for_status()
+                    for block in response.iter_bytes(self.DOWNLOAD_BLOCK_SIZE):
+                        spool.write(block)
+            else:
+                spool.write(self.download(path))
+        except DatabaseError:
+            spool.close()
+            raise
+        except Exception as e:
+            spool.close()
+            logger.error(f"File download failed: path={path}, error={str(e)}")
+            raise DatabaseError(f"Failed to download file: {str(e)}")
+
+        spool.seek(0)
+        return spool
+
+    def upload(self, path: str, content: bytes, content_type: str, upsert: bool = False) -> None:
+        """
+        Upload an object.
+
+        Raises:
+            DatabaseError: If the upload fails
+        """
+        try:
+            self.client.storage.from_(self.bucket).upload(
+                path,
+                content,
+                {"content-type": content_type, "x-upsert": "true" if upsert else "false"},
+            )
+        except Exception as e:
+            logger.error(f"File upload failed: path={path}, error={str(e)}")
+            raise DatabaseError(f"Failed to upload file: {str(e)}")
+
+    def remove_prefix(self, prefix: str) -> int:
+        """
+        Remove every object directly under a folder prefix.
+
+        Returns:
+            Number of objects removed
+
+        Raises:
+            DatabaseError: If listing or removal fails
+        """
+        prefix = prefix.rstrip("/")
+        try:
+            bucket = self.client.storage.from_(self.bucket)
+            paths = [f"{prefix}/{entry['name']}" for entry in bucket.list(prefix) or [] if entry.get("name")]
+            if paths:
+                bucket.remove(paths)
+            return len(paths)
+        except Exception as e:
+            logger.error(f"Prefix removal failed: prefix={prefix}, error={str(e)}")
+            raise DatabaseError(f"Failed to remove files: {str(e)}")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-page HTML extraction cost of the crawler's extractors.
+Run this from the backend directory; pages are fetched once, then only
+extraction is timed.
+
+Examples:
+    python scripts/benchmark_extraction.py saved_pages/*.html
+    python scripts/benchmark_extraction.py https://example.com/docs/ https://example.com/blog/ --repeat 20
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.crawling.extractor import LxmlExtractor, ReadabilityExtractor  # noqa: E402
+from services.crawling.fetcher import RequestsFetcher  # noqa: E402
+
+EXTRACTORS = {"fast": LxmlExtractor, "readability": ReadabilityExtractor}
+
+
+def load_pages(sources: List[str]) -> List[Tuple[str, str]]:
+    """(url, html) for each URL or HTML file"""
+    fetcher = RequestsFetcher()
+    pages = []
+    for source in sources:
+        if source.startswith(("http://", "https://")):
+            resp = fetcher.fetch(source)
+            if resp["status"] >= 400 or not resp["content"]:
+                print(f"⚠️  Skipping {source}: HTTP {resp['status']}")
+                continue
+            pages.append((resp["final_url"], resp["content"]))
+        else:
+            path = Path(source)
+            pages.append((path.resolve().as_uri(), path.read_text(encoding="utf-8", errors="replace")))
+    return pages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time HTML extraction per page")
+    parser.add_argument("sources", nargs="+", help="Page URLs or saved HTML files")
+    parser.add_argument("--repeat", type=int, default=10, help="Extractions per page (default: 10)")
+    parser.add_argument("--extractor", default="all", choices=["all", *EXTRACTORS])
+    args = parser.parse_args()
+
+    pages = load_pages(args.sources)
+    if not pages:
+        print("❌ No pages to benchmark")
+        return 1
+    names = list(EXTRACTORS) if args.extractor == "all" else [args.extractor]
+
+    print(f"{len(pages)} pages, {args.repeat} runs each")
+    print(f"{'extractor':<12} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'chars':>10} {'headings':>9} {'fallbacks':>10} {'errors':>7}")
+    for name in names:
+        extractor = EXTRACTORS[name]()
+        timings = []
+        chars = headings = fallbacks = errors = 0
+        for url, html in pages:
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                result = extractor.extract(url, html)
+                timings.append((time.perf_counter() - started) * 1000)
+            if not result.success:
+                errors += 1
+            chars += len(result.text)
+            if result.elements:
+                headings += sum(1 for element in result.elements if element.kind == element.HEADING)
+            elif name == "fast":
+                fallbacks += 1
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        print(
+            f"{name:<12} {statistics.mean(timings):>9.2f} {statistics.median(timings):>9.2f} "
+            f"{p95:>9.2f} {chars:>10} {headings:>9} {fallbacks:>10} {errors:>7}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
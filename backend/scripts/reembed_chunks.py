@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script to migrate chunk embeddings to a new embedding model.
+Run this from the backend directory on a worker host, not inside the API.
+
+Examples:
+    python scripts/reembed_chunks.py --provider openai --model text-embedding-3-large
+    python scripts/reembed_chunks.py --bot-id <uuid> --concurrency 8
+    python scripts/reembed_chunks.py --resume <job-id>
+"""
+import argparse
+import sys
+from pathlib import Path
+from uuid import UUID
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings  # noqa: E402
+from core.logging import setup_logging  # noqa: E402
+from services.reembedding_service import ReembeddingService  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Re-embed chunks into the shadow column and switch search to them")
+    parser.add_argument("--bot-id", type=UUID, default=None, help="Migrate a single bot (default: all bots)")
+    parser.add_argument("--resume", type=UUID, default=None, help="Resume an existing migration job")
+    parser.add_argument("--provider", default=settings.embedding_preferred, choices=["openai", "gemini", "local"])
+    parser.add_argument("--model", default=None, help="Target model (default: configured model for the provider)")
+    parser.add_argument("--dimension", type=int, default=settings.embedding_dimension)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--no-switch", action="store_true", help="Fill the shadow column without switching search")
+    args = parser.parse_args()
+
+    setup_logging()
+    service = ReembeddingService(
+        provider=args.provider,
+        model=args.model,
+        embedding_dimension=args.dimension,
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+    )
+
+    job_id = args.resume or service.start(bot_id=args.bot_id)["id"]
+    try:
+        job = service.run(job_id, switch=not args.no_switch)
+    except Exception as e:
+        print(f"❌ Migration {job_id} failed: {e}. Re-run with --resume {job_id}")
+        return 1
+
+    print(
+        f"✅ Migration {job_id} {job.get('status')}: "
+        f"{job.get('processed_chunks')}/{job.get('total_chunks')} chunks, "
+        f"{job.get('chunks_per_second')} chunks/s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,22 +5,38 @@ Business logic for chunk operations.
 Orchestrates chunking, storage, and retrieval.
 """
 
-from typing import List, Optional
+from collections import defaultdict, deque
+from typing import Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 from uuid import UUID
 import logging
 
+from config.settings import settings
 from core.exceptions import ValidationError, NotFoundError, AuthorizationError, DatabaseError
 from repositories.chunk_repo import ChunkRepository
 from services.bot_service import BotService
 from services.chunking_service import ChunkingService, TextChunk
+from services.embedding_service import content_hash
 from models.source_model import SourceType
+from parsers.base import DocumentElement
 
 logger = logging.getLogger(__name__)
 
 
+class ResumeMismatchError(Exception):
+    """Re-chunked output differs from the chunks stored before the checkpoint"""
+
+
+class KeepPage(NamedTuple):
+    """sync_chunks stream marker: keep the stored chunks of an unchanged crawled page"""
+    page_url: str
+
+
 class ChunkService:
     """Service for chunk operations"""
 
+    # Chunk columns that can change without the chunk text (and embedding) changing
+    POSITION_FIELDS = ("chunk_index", "heading", "char_range", "tokens_estimate", "page_start", "page_end", "page_url")
+
     def __init__(self, access_token: Optional[str] = None):
         """
         Initialize the service.
@@ -38,7 +54,8 @@ class ChunkService:
         bot_id: UUID,
         text: str,
         source_type: SourceType,
-        default_heading: Optional[str] = None
+        default_heading: Optional[str] = None,
+        elements: Optional[List[DocumentElement]] = None
     ) -> List[dict]:
         """
         Chunk text and store chunks in database.
@@ -48,6 +65,8 @@ class ChunkService:
             bot_id: Bot UUID
             text: Extracted text to chunk
             source_type: Type of source (pdf, docx, text, html)
+            elements: Structured parser output; when present, chunks follow
+                the document's headings, paragraphs and tables
 
         Returns:
             List of created chunk records
@@ -67,24 +86,17 @@ class ChunkService:
         # during source creation/parsing
         
         # Chunk the text
-        text_chunks = self.chunking_service.chunk_text(text, source_type.value)
+        text_chunks = self.chunk_source_text(text, source_type, elements)
         
         if not text_chunks:
             logger.warning(f"No chunks generated for source {source_id}")
             return []
 
         # Convert TextChunk objects to dicts for database insertion
-        chunks_data = []
-        for text_chunk in text_chunks:
-            chunk_dict = text_chunk.to_dict()
-            # Apply default heading if not present
-            if default_heading and not chunk_dict.get("heading"):
-                chunk_dict["heading"] = default_heading
-            chunk_dict.update({
-                "source_id": str(source_id),
-                "bot_id": str(bot_id),
-            })
-            chunks_data.append(chunk_dict)
+        chunks_data = [
+            self._chunk_row(text_chunk, source_id, bot_id, default_heading)
+            for text_chunk in text_chunks
+        ]
 
         # Store chunks in database
         try:
@@ -95,6 +107,198 @@ class ChunkService:
             logger.error(f"Chunk storage failed: source_id={source_id}, bot_id={bot_id}, error={str(e)}")
             raise DatabaseError(f"Failed to store chunks: {str(e)}")
 
+    def chunk_source_text(
+        self,
+        text: str,
+        source_type: SourceType,
+        elements: Optional[List[DocumentElement]] = None
+    ) -> List[TextChunk]:
+        """Chunk parser output: along the document structure when elements are present"""
+        if not text or not text.strip():
+            return []
+        if elements:
+            return self.chunking_service.chunk_elements(elements)
+        return self.chunking_service.chunk_text(text, source_type.value)
+
+    def sync_chunks(
+        self,
+        source_id: UUID,
+        bot_id: UUID,
+        text_chunks: Iterable[Union[TextChunk, KeepPage]],
+        default_heading: Optional[str] = None,
+        batch_size: int = settings.ingest_chunk_batch_size
+    ) -> Dict[str, int]:
+        """
+        Re-index a source by diffing new chunks against the stored ones.
+
+        Stored chunks are matched to the new chunks by content_hash (within
+        the same page for crawled sites). Matched rows keep their text and
+        embedding; only their position and metadata are updated when those
+        changed. New chunks are inserted without an embedding (picked up by
+        the embedding step) and stored chunks with no match are deleted.
+        Running it again after a partial failure converges to the same result,
+        since already-synced rows simply match. Nothing is deleted if the
+        stream raises.
+
+        A KeepPage in the stream keeps all stored chunks of that page as they
+        are, only renumbered into place, for pages that weren't re-fetched.
+
+        Args:
+            source_id: Source UUID
+            bot_id: Bot UUID
+            text_chunks: New chunks and KeepPage markers, in order; may be a
+                lazy stream. Chunks are numbered by their stream position.
+            default_heading: Heading for chunks without one
+            batch_size: Rows per insert/update request
+
+        Returns:
+            {"kept", "moved", "inserted", "deleted", "total"} chunk counts, plus
+            "last_chunk_hash" of the final chunk (None if there are no chunks)
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        stored_rows = sorted(self.repository.get_chunk_fingerprints(source_id), key=lambda r: r["chunk_index"])
+        # Identical texts are matched in stored order
+        existing: Dict[Tuple[Optional[str], str], Deque[dict]] = defaultdict(deque)
+        pages: Dict[str, List[dict]] = defaultdict(list)
+        for row in stored_rows:
+            # Rows stored before content hashes were recorded never match and are replaced
+            if row.get("content_hash"):
+                existing[(row.get("page_url"), row["content_hash"])].append(row)
+            if row.get("page_url"):
+                pages[row["page_url"]].append(row)
+        unmatched = {row["id"] for row in stored_rows}
+
+        stats = {"kept": 0, "moved": 0, "inserted": 0, "deleted": 0, "total": 0, "last_chunk_hash": None}
+        inserts: List[dict] = []
+        updates: List[dict] = []
+
+        def keep(stored: dict, position: dict) -> None:
+            nonlocal updates
+            unmatched.discard(stored["id"])
+            stats["total"] += 1
+            stats["last_chunk_hash"] = stored.get("content_hash")
+            if all(stored.get(key) == value for key, value in position.items()):
+                stats["kept"] += 1
+                return
+            updates.append({"id": stored["id"], **position})
+            if len(updates) >= batch_size:
+                stats["moved"] += self.repository.update_chunk_positions(updates)
+                updates = []
+
+        for item in text_chunks:
+            if isinstance(item, KeepPage):
+                for stored in pages.get(item.page_url, []):
+                    if stored["id"] in unmatched:
+                        position = {key: stored.get(key) for key in self.POSITION_FIELDS}
+                        keep(stored, {**position, "chunk_index": stats["total"]})
+                continue
+
+            row = self._chunk_row(item, source_id, bot_id, default_heading)
+            row["chunk_index"] = stats["total"]
+            matches = existing.get((row["page_url"], row["content_hash"]))
+            if matches:
+                keep(matches.popleft(), {key: row[key] for key in self.POSITION_FIELDS})
+                continue
+            stats["total"] += 1
+            stats["last_chunk_hash"] = row["content_hash"]
+            inserts.append(row)
+            if len(inserts) >= batch_size:
+                stats["inserted"] += len(self._store_batch(source_id, bot_id, inserts))
+                inserts = []
+
+        if inserts:
+            stats["inserted"] += len(self._store_batch(source_id, bot_id, inserts))
+        if updates:
+            stats["moved"] += self.repository.update_chunk_positions(updates)
+        if unmatched:
+            self.repository.delete_chunks_by_ids(list(unmatched))
+            stats["deleted"] = len(unmatched)
+
+        logger.info(
+            f"Chunks synced: source_id={source_id}, kept={stats['kept']}, moved={stats['moved']}, "
+            f"inserted={stats['inserted']}, deleted={stats['deleted']}"
+        )
+        return stats
+
+    def iter_store_chunks(
+        self,
+        source_id: UUID,
+        bot_id: UUID,
+        elements: Iterable[DocumentElement],
+        batch_size: int = settings.ingest_chunk_batch_size,
+        resume_from: int = 0,
+        resume_hash: Optional[str] = None
+    ) -> Iterator[List[dict]]:
+        """
+        Chunk an element stream and store it in batches.
+
+        Chunks are inserted as soon as `batch_size` of them are ready and the
+        created records are yielded, so the caller can embed each batch and
+        neither the document nor its full chunk list is ever held in memory.
+
+        Args:
+            source_id: Source UUID
+            bot_id: Bot UUID
+            elements: Lazily produced parser elements
+            batch_size: Chunks per insert
+            resume_from: Chunks already stored by an earlier attempt; they are
+                re-chunked but not inserted again
+            resume_hash: content_hash of the last already-stored chunk, checked
+                against the re-chunked output
+
+        Yields:
+            Created chunk records, one list per batch
+
+        Raises:
+            ResumeMismatchError: If the re-chunked output doesn't match resume_hash
+            DatabaseError: If database operation fails
+        """
+        batch: List[dict] = []
+        for text_chunk in self.chunking_service.iter_element_chunks(elements):
+            if text_chunk.index < resume_from:
+                if (
+                    text_chunk.index == resume_from - 1 and resume_hash
+                    and content_hash(text_chunk.text) != resume_hash
+                ):
+                    raise ResumeMismatchError(f"Chunk {text_chunk.index} of source {source_id} changed since the checkpoint")
+                continue
+            batch.append(self._chunk_row(text_chunk, source_id, bot_id))
+            if len(batch) >= batch_size:
+                yield self._store_batch(source_id, bot_id, batch)
+                batch = []
+        if batch:
+            yield self._store_batch(source_id, bot_id, batch)
+
+    def _chunk_row(
+        self,
+        text_chunk: TextChunk,
+        source_id: UUID,
+        bot_id: UUID,
+        default_heading: Optional[str] = None
+    ) -> dict:
+        """Chunk record for insertion, with the content_hash re-indexing matches on"""
+        chunk_dict = text_chunk.to_dict()
+        # Apply default heading if not present
+        if default_heading and not chunk_dict.get("heading"):
+            chunk_dict["heading"] = default_heading
+        chunk_dict.update({
+            "source_id": str(source_id),
+            "bot_id": str(bot_id),
+            "content_hash": content_hash(text_chunk.text),
+        })
+        return chunk_dict
+
+    def _store_batch(self, source_id: UUID, bot_id: UUID, chunks_data: List[dict]) -> List[dict]:
+        try:
+            created_chunks = self.repository.create_chunks(chunks_data)
+            logger.debug(f"Chunk batch stored: source_id={source_id}, bot_id={bot_id}, count={len(created_chunks)}")
+            return created_chunks
+        except Exception as e:
+            logger.error(f"Chunk storage failed: source_id={source_id}, bot_id={bot_id}, error={str(e)}")
+            raise DatabaseError(f"Failed to store chunks: {str(e)}")
+
     def get_chunks_by_source(
         self,
         source_id: UUID,
@@ -5,13 +5,72 @@ Service for splitting text into chunks with metadata extraction.
 Implements sentence-aware chunking with overlap for context preservation.
 """
 
-from typing import List, Optional, Dict
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Dict, Tuple
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+import atexit
 import re
 import logging
+import threading
+from config.settings import settings
+from parsers.base import DocumentElement, ELEMENT_SEPARATOR
 from services.tokenizer import Tokenizer
 
 logger = logging.getLogger(__name__)
 
+# Sentence boundary: whitespace after ., ! or ? followed by an uppercase letter
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+# Units whose tokens are counted in one batch when chunking element streams
+# (elements are usually only a sentence or two each)
+ELEMENT_TOKEN_BATCH = 256
+
+# Shared process pool for chunking large documents (created on first use)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Per-worker tokenizer so the tiktoken encoding loads once per process
+_worker_tokenizer: Optional[Tokenizer] = None
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+            logger.info(f"Chunking pool started: workers={workers}")
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _spans_and_tokens(part: str, offset: int) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """Split one partition into sentence spans and count their tokens (runs in a worker)."""
+    global _worker_tokenizer
+    if _worker_tokenizer is None:
+        _worker_tokenizer = Tokenizer()
+    spans = ChunkingService._split_into_sentence_spans(part)
+    tokens = _worker_tokenizer.count_tokens_batch([part[start:end] for start, end in spans])
+    return [(start + offset, end + offset) for start, end in spans], tokens
+
+
+class _Unit(NamedTuple):
+    """Smallest piece of text a chunk boundary may fall between"""
+    start: int
+    end: int
+    text: str
+    tokens: int
+    separator: str  # joins this unit to the previous one
+    heading: Optional[str]
+    page: Optional[int]
+    section_start: bool  # a heading: chunks do not overlap across it
+
 
 class ChunkMetadata:
     """Metadata for a text chunk"""
@@ -21,12 +80,18 @@ class ChunkMetadata:
         heading: Optional[str] = None,
         char_start: int = 0,
         char_end: int = 0,
-        token_count: int = 0
+        token_count: int = 0,
+        page_start: Optional[int] = None,
+        page_end: Optional[int] = None,
+        page_url: Optional[str] = None
     ):
         self.heading = heading
         self.char_start = char_start
         self.char_end = char_end
         self.token_count = token_count
+        self.page_start = page_start
+        self.page_end = page_end
+        self.page_url = page_url
 
 
 class TextChunk:
@@ -52,7 +117,10 @@ class TextChunk:
                 "start": self.metadata.char_start,
                 "end": self.metadata.char_end
             },
-            "tokens_estimate": self.metadata.token_count
+            "tokens_estimate": self.metadata.token_count,
+            "page_start": self.metadata.page_start,
+            "page_end": self.metadata.page_end,
+            "page_url": self.metadata.page_url
         }
 
 
@@ -72,7 +140,10 @@ class ChunkingService:
         target_tokens: int = 800,
         overlap_tokens: int = 100,
         min_chunk_tokens: int = 100,
-        max_chunk_tokens: int = 1200
+        max_chunk_tokens: int = 1200,
+        workers: int = settings.chunking_workers,
+        parallel_min_chars: int = settings.chunking_parallel_min_chars,
+        partition_chars: int = settings.chunking_partition_chars
     ):
         """
         Initialize chunking service.
@@ -82,11 +153,17 @@ class ChunkingService:
             overlap_tokens: Overlap tokens between chunks (default: 100)
             min_chunk_tokens: Minimum tokens per chunk (default: 100)
             max_chunk_tokens: Maximum tokens per chunk (default: 1200)
+            workers: Process pool size for large documents (0 disables)
+            parallel_min_chars: Texts at least this long are chunked in parallel
+            partition_chars: Approximate size of each parallel partition
         """
         self.target_tokens = target_tokens
         self.overlap_tokens = overlap_tokens
         self.min_chunk_tokens = min_chunk_tokens
         self.max_chunk_tokens = max_chunk_tokens
+        self.workers = workers
+        self.parallel_min_chars = parallel_min_chars
+        self.partition_chars = max(1, partition_chars)
         self.tokenizer = Tokenizer()
     
     def chunk_text(
@@ -111,18 +188,24 @@ class ChunkingService:
         # Extract headings if available (for structured documents)
         headings = self._extract_headings(text, source_type)
         
-        # Split into sentences (sentence-aware chunking)
-        sentences = self._split_into_sentences(text)
+        # Split into sentences (sentence-aware chunking) as exact character spans.
+        # Large documents are split and tokenized across a process pool.
+        sentence_tokens = None
+        if self.workers > 0 and len(text) >= self.parallel_min_chars:
+            spans, sentence_tokens = self._spans_and_tokens_parallel(text, headings)
+        else:
+            spans = self._split_into_sentence_spans(text)
         
-        if not sentences:
+        if not spans:
             logger.warning("No sentences found in text")
             return []
         
         # Build chunks with overlap
         chunks = self._build_chunks_with_overlap(
-            sentences=sentences,
+            spans=spans,
             headings=headings,
-            text=text
+            text=text,
+            sentence_tokens=sentence_tokens
         )
         
         avg_tokens = sum(c.metadata.token_count for c in chunks) / len(chunks) if chunks else 0
@@ -166,164 +249,309 @@ class ChunkingService:
         
         return headings
     
+    def _partition_offsets(self, text: str, headings: Dict[int, str]) -> List[int]:
+        """
+        Choose deterministic split points for parallel chunking.
+        
+        Every partition_chars, the split anchors at the next heading (if one is
+        close) or paragraph break, then moves to the first sentence boundary
+        after it. Splitting on sentence boundaries means each partition yields
+        exactly the sentence spans a serial pass would, so windows stitched
+        across seams are identical to serial chunking.
+        """
+        heading_offsets = sorted(headings)
+        offsets = [0]
+        target = self.partition_chars
+        while target < len(text):
+            idx = bisect_left(heading_offsets, target)
+            if idx < len(heading_offsets) and heading_offsets[idx] - target <= self.partition_chars // 4:
+                anchor = heading_offsets[idx]
+            else:
+                anchor = text.find("\n\n", target)
+                if anchor == -1:
+                    anchor = target
+            boundary = SENTENCE_BOUNDARY.search(text, anchor)
+            if not boundary:
+                break
+            offsets.append(boundary.end())
+            target = boundary.end() + self.partition_chars
+        offsets.append(len(text))
+        return offsets
+    
+    def _spans_and_tokens_parallel(
+        self,
+        text: str,
+        headings: Dict[int, str]
+    ) -> Tuple[List[Tuple[int, int]], Optional[List[int]]]:
+        """
+        Split and tokenize partitions of a large text in the process pool.
+        
+        Falls back to the serial splitter (tokens counted later) if the pool fails.
+        """
+        offsets = self._partition_offsets(text, headings)
+        parts = [text[a:b] for a, b in zip(offsets, offsets[1:])]
+        if len(parts) < 2:
+            return self._split_into_sentence_spans(text), None
+        
+        try:
+            results = list(_get_pool(self.workers).map(_spans_and_tokens, parts, offsets[:-1]))
+        except Exception as e:
+            logger.warning(f"Parallel chunking failed, falling back to serial: {str(e)}")
+            _reset_pool()
+            return self._split_into_sentence_spans(text), None
+        
+        spans: List[Tuple[int, int]] = []
+        tokens: List[int] = []
+        for part_spans, part_tokens in results:
+            spans.extend(part_spans)
+            tokens.extend(part_tokens)
+        logger.debug(f"Parallel chunking: chars={len(text)}, partitions={len(parts)}, sentences={len(spans)}")
+        return spans, tokens
+    
     def _split_into_sentences(self, text: str) -> List[str]:
         """
         Split text into sentences.
         
         Uses regex to detect sentence boundaries while preserving abbreviations.
         """
-        # Pattern to match sentence endings (period, exclamation, question mark)
-        # Excludes common abbreviations
-        sentence_endings = r'(?<=[.!?])\s+(?=[A-Z])'
+        return [text[start:end] for start, end in self._split_into_sentence_spans(text)]
+    
+    @staticmethod
+    def _split_into_sentence_spans(text: str) -> List[Tuple[int, int]]:
+        """
+        Split text into sentences in a single pass.
+        
+        Returns (start, end) character offsets of each sentence in `text`,
+        with surrounding whitespace excluded, so repeated sentences keep
+        their own positions.
+        """
+        spans = []
+        pos = 0
+        for boundary in SENTENCE_BOUNDARY.finditer(text):
+            ChunkingService._append_span(text, pos, boundary.start(), spans)
+            pos = boundary.end()
+        ChunkingService._append_span(text, pos, len(text), spans)
+        return spans
+    
+    @staticmethod
+    def _append_span(text: str, start: int, end: int, spans: List[Tuple[int, int]]) -> None:
+        """Append text[start:end] trimmed of whitespace, skipping empty sentences."""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            spans.append((start, end))
+    
+    def chunk_elements(self, elements: List[DocumentElement]) -> List[TextChunk]:
+        """
+        Chunk a structured element stream from a parser.
+        
+        Headings come from the parser instead of regex guesses. Each heading
+        starts a new section: the running chunk is closed there (no overlap
+        across sections) unless it is below min_chunk_tokens, in which case it
+        is carried into the next section rather than emitted as a tiny chunk.
+        Paragraphs are split into sentences, tables into rows, and chunks
+        record the pages they span. Character ranges refer to
+        join_elements(elements), i.e. ParseResult.text.
+        
+        Args:
+            elements: Parser output (ParseResult.elements)
+        
+        Returns:
+            List of TextChunk objects
+        """
+        chunks = list(self.iter_element_chunks(elements))
         
-        # Split by sentence endings
-        sentences = re.split(sentence_endings, text)
+        if not chunks:
+            logger.warning("No chunks produced from document elements")
+            return []
         
-        # Filter out empty sentences
-        sentences = [s.strip() for s in sentences if s.strip()]
+        avg_tokens = sum(c.metadata.token_count for c in chunks) / len(chunks)
+        logger.info(
+            f"Elements chunked: elements={len(elements)}, chunks={len(chunks)}, avg_tokens={avg_tokens:.0f}"
+        )
+        return chunks
+    
+    def iter_element_chunks(self, elements: Iterable[DocumentElement]) -> Iterator[TextChunk]:
+        """
+        Lazily chunk an element stream (see chunk_elements).
         
-        return sentences
+        Elements are consumed one at a time and chunks are yielded as soon as
+        they are complete, so memory is bounded by the chunk window rather
+        than the document size.
+        """
+        return self._iter_assembled_chunks(self._iter_element_units(elements))
+    
+    def _iter_element_units(self, elements: Iterable[DocumentElement]) -> Iterator[_Unit]:
+        """
+        Turn elements into chunking units with absolute offsets into join_elements()
+        
+        Units are held back until ELEMENT_TOKEN_BATCH of them (or the end of
+        the stream) so tokens are counted in a few large batches rather than
+        one small batch per element.
+        """
+        pending: List[_Unit] = []
+        
+        def flush() -> List[_Unit]:
+            tokens = self.tokenizer.count_tokens_batch([unit.text for unit in pending])
+            units = [unit._replace(tokens=count) for unit, count in zip(pending, tokens)]
+            pending.clear()
+            return units
+        
+        offset = 0
+        current_heading = None
+        for element in elements:
+            section_start = False
+            if element.kind == DocumentElement.HEADING:
+                current_heading = element.text.strip() or current_heading
+                section_start = True
+                element_spans = [(0, len(element.text))]
+                inner_separator = " "
+            elif element.kind == DocumentElement.TABLE:
+                element_spans = self._split_into_line_spans(element.text)
+                inner_separator = "\n"
+            else:
+                element_spans = self._split_into_sentence_spans(element.text)
+                inner_separator = " "
+            
+            element_spans = [(start, end) for start, end in element_spans if start < end]
+            for n, (start, end) in enumerate(element_spans):
+                pending.append(_Unit(
+                    start=start + offset,
+                    end=end + offset,
+                    text=element.text[start:end],
+                    tokens=0,
+                    separator=inner_separator if n else ELEMENT_SEPARATOR,
+                    heading=current_heading,
+                    page=element.page,
+                    section_start=section_start and n == 0
+                ))
+            offset += len(element.text) + len(ELEMENT_SEPARATOR)
+            if len(pending) >= ELEMENT_TOKEN_BATCH:
+                yield from flush()
+        if pending:
+            yield from flush()
+    
+    @staticmethod
+    def _split_into_line_spans(text: str) -> List[Tuple[int, int]]:
+        """(start, end) offsets of non-empty lines (table rows)"""
+        spans = []
+        pos = 0
+        for line in text.split("\n"):
+            ChunkingService._append_span(text, pos, pos + len(line), spans)
+            pos += len(line) + 1
+        return spans
     
     def _build_chunks_with_overlap(
         self,
-        sentences: List[str],
+        spans: List[Tuple[int, int]],
         headings: Dict[int, str],
-        text: str
+        text: str,
+        sentence_tokens: Optional[List[int]] = None
     ) -> List[TextChunk]:
         """
-        Build chunks with overlap between adjacent chunks.
+        Build chunks with overlap between adjacent chunks from plain text.
+        
+        Headings are resolved by bisecting a presorted offset array of the
+        regex-detected headings; see _iter_assembled_chunks for the windowing.
+        """
+        heading_offsets = sorted(headings)
+        heading_texts = [headings[offset] for offset in heading_offsets]
+        sentences = [text[start:end] for start, end in spans]
+        if sentence_tokens is None:
+            sentence_tokens = self.tokenizer.count_tokens_batch(sentences)
+        
+        def units() -> Iterator[_Unit]:
+            for (start, end), sentence, tokens in zip(spans, sentences, sentence_tokens):
+                idx = bisect_right(heading_offsets, end - 1) - 1
+                yield _Unit(
+                    start=start,
+                    end=end,
+                    text=sentence,
+                    tokens=tokens,
+                    separator=" ",
+                    heading=heading_texts[idx] if idx >= 0 else None,
+                    page=None,
+                    section_start=False
+                )
+        
+        return list(self._iter_assembled_chunks(units()))
+    
+    def _iter_assembled_chunks(self, units: Iterable[_Unit]) -> Iterator[TextChunk]:
+        """
+        Assemble chunks from a stream of text units (sentences, table rows, headings).
         
         Strategy:
-        1. Accumulate sentences until we reach target token count
-        2. When creating next chunk, include overlap from previous chunk
-        3. Preserve sentence boundaries
-        4. Associate chunks with nearest heading
+        1. Add units to a window, keeping a running token sum
+        2. Close the window once it reaches target tokens
+        3. Start the next window at the trailing units that fit in overlap_tokens
+        4. Preserve unit boundaries
+        5. Associate chunks with the heading of their last unit
+        
+        Units are tokenized once by the caller, so chunking is linear in
+        document length, and only the current window is held in memory.
         """
-        chunks = []
-        current_chunk_sentences = []
-        current_char_start = 0
-        current_heading = None
+        index = 0
+        window: List[_Unit] = []
+        window_tokens = 0  # running token sum of the current window
+        pending = 0  # trailing window units not yet part of an emitted chunk
         
-        # Rebuild text with sentence positions for accurate character tracking
-        # We'll use the original text and find positions by reconstructing
-        
-        for i, sentence in enumerate(sentences):
-            # Find the closest heading before or at this sentence
-            # Headings map is by character position, so we need to estimate
-            # For simplicity, we'll track heading by sentence index
-            sentence_in_text_pos = text.find(sentence, 0)  # Approximate
-            closest_heading = current_heading
-            for heading_pos, heading_text in sorted(headings.items()):
-                if sentence_in_text_pos >= heading_pos:
-                    closest_heading = heading_text
-                else:
-                    break
-            current_heading = closest_heading
-            
-            # Add sentence to current chunk
-            current_chunk_sentences.append(sentence)
+        def make_chunk() -> TextChunk:
+            chunk_text = window[0].text + ''.join(u.separator + u.text for u in window[1:])
+            chunk_pages = [u.page for u in window if u.page is not None]
+            return TextChunk(
+                text=chunk_text,
+                index=index,
+                metadata=ChunkMetadata(
+                    heading=window[-1].heading,
+                    char_start=window[0].start,
+                    char_end=window[-1].end,
+                    token_count=window_tokens,
+                    page_start=min(chunk_pages) if chunk_pages else None,
+                    page_end=max(chunk_pages) if chunk_pages else None
+                )
+            )
+        
+        for unit in units:
+            if unit.section_start and window:
+                if pending and window_tokens >= self.min_chunk_tokens:
+                    # Close the section's last chunk at the heading
+                    yield make_chunk()
+                    index += 1
+                    pending = 0
+                if not pending:
+                    # Don't carry overlap across a section boundary
+                    window = []
+                    window_tokens = 0
+                # Otherwise a small tail is carried into the new section
             
-            # Estimate tokens for current chunk
-            current_chunk_text = ' '.join(current_chunk_sentences)
-            token_count = self.tokenizer.count_tokens(current_chunk_text)
+            window.append(unit)
+            window_tokens += unit.tokens
+            pending += 1
             
-            # Decide if we should finalize this chunk
-            should_finalize = False
+            # Finalize once we reach the target size (max_chunk_tokens is always above it)
+            if window_tokens < self.target_tokens:
+                continue
             
-            if token_count >= self.target_tokens:
-                # We've reached target size
-                should_finalize = True
-            elif token_count >= self.max_chunk_tokens:
-                # We've exceeded max size, must finalize
-                should_finalize = True
+            yield make_chunk()
+            index += 1
+            pending = 0
             
-            if should_finalize:
-                # Calculate character range
-                chunk_text = ' '.join(current_chunk_sentences)
-                
-                # Find actual position in original text
-                # Start: find first sentence position
-                first_sentence = current_chunk_sentences[0]
-                chunk_start = text.find(first_sentence, current_char_start)
-                if chunk_start == -1:
-                    chunk_start = current_char_start
-                
-                # End: find last sentence position + length
-                last_sentence = current_chunk_sentences[-1]
-                last_sentence_start = text.find(last_sentence, chunk_start)
-                if last_sentence_start == -1:
-                    chunk_end = chunk_start + len(chunk_text)
-                else:
-                    chunk_end = last_sentence_start + len(last_sentence)
-                
-                # Create chunk
-                metadata = ChunkMetadata(
-                    heading=current_heading,
-                    char_start=chunk_start,
-                    char_end=chunk_end,
-                    token_count=token_count
-                )
-                
-                chunk = TextChunk(
-                    text=chunk_text,
-                    index=len(chunks),
-                    metadata=metadata
-                )
-                chunks.append(chunk)
-                
-                # Prepare overlap for next chunk
-                # Take last N sentences that fit within overlap token limit
-                overlap_sentences = []
-                overlap_tokens = 0
-                for sentence in reversed(current_chunk_sentences):
-                    sent_tokens = self.tokenizer.count_tokens(sentence)
-                    if overlap_tokens + sent_tokens <= self.overlap_tokens:
-                        overlap_sentences.insert(0, sentence)
-                        overlap_tokens += sent_tokens
-                    else:
-                        break
-                
-                # Start new chunk with overlap
-                current_chunk_sentences = overlap_sentences
-                if overlap_sentences:
-                    # Update char start to beginning of overlap
-                    overlap_start_sentence = overlap_sentences[0]
-                    overlap_start = text.find(overlap_start_sentence, chunk_start)
-                    if overlap_start != -1:
-                        current_char_start = overlap_start
-                    else:
-                        current_char_start = chunk_end
-                else:
-                    current_char_start = chunk_end
-        
-        # Handle remaining sentences
-        if current_chunk_sentences:
-            chunk_text = ' '.join(current_chunk_sentences)
-            token_count = self.tokenizer.count_tokens(chunk_text)
+            # Prepare overlap for next chunk: keep the trailing units (never
+            # the window's first) that fit within the overlap token limit
+            keep = 0
+            overlap_tokens = 0
+            while (
+                keep < len(window) - 1
+                and overlap_tokens + window[-1 - keep].tokens <= self.overlap_tokens
+            ):
+                overlap_tokens += window[-1 - keep].tokens
+                keep += 1
             
-            # Only add if it meets minimum size requirement
-            if token_count >= self.min_chunk_tokens:
-                # Find actual position in original text
-                first_sentence = current_chunk_sentences[0]
-                chunk_start = text.find(first_sentence, current_char_start)
-                if chunk_start == -1:
-                    chunk_start = current_char_start
-                
-                chunk_end = len(text)
-                
-                metadata = ChunkMetadata(
-                    heading=current_heading,
-                    char_start=chunk_start,
-                    char_end=chunk_end,
-                    token_count=token_count
-                )
-                
-                chunk = TextChunk(
-                    text=chunk_text,
-                    index=len(chunks),
-                    metadata=metadata
-                )
-                chunks.append(chunk)
+            window = window[len(window) - keep:]
+            window_tokens = overlap_tokens
         
-        return chunks
-
+        # Handle remaining units (only if they add new text and meet the minimum size)
+        if pending and window_tokens >= self.min_chunk_tokens:
+            yield make_chunk()
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 
 class CrawlResult:
@@ -10,6 +10,14 @@ class CrawlResult:
         self.text = text
         self.metadata = metadata or {}
         self.error = error
+        # Crawlable links found on the page (site crawls only)
+        self.links: List[str] = []
+        # Page was not re-fetched because it hasn't changed since the last crawl;
+        # its stored chunks are kept (site crawls only)
+        self.unchanged = False
+        # Headings/paragraphs/tables of the page when the extractor keeps its
+        # structure; text == join_elements(elements) then
+        self.elements = None
 
 
 class ContentExtractor(ABC):
@@ -1,43 +1,341 @@
-from typing import Optional, Dict
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Optional, Dict
+from urllib.parse import urlparse
+import asyncio
 import hashlib
 import logging
+import queue
+import threading
 
 from services.crawling.base import CrawlResult
-from services.crawling.robots import SimpleRobots
-from services.crawling.fetcher import RequestsFetcher
-from services.crawling.extractor import ReadabilityExtractor
-from services.crawling.url_utils import normalize_url
+from services.crawling.robots import MAX_CRAWL_DELAY_SECONDS, robots_cache
+from services.crawling.fetcher import AsyncHttpFetcher, RequestsFetcher
+from services.crawling.extractor import LxmlExtractor, ReadabilityExtractor
+from services.crawling.frontier import HostThrottle, VisitedSet
+from services.crawling.sitemap import SitemapEntry, SitemapReader, parse_lastmod
+from services.crawling.url_utils import extract_links, normalize_url
 from services.crawling.js_fetcher import PlaywrightFetcher
+from services.crawling.render_hints import PageHints, inspect_page, render_memory
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# End of a site crawl (queue sentinel)
+_DONE = object()
+# Statuses meaning a page was removed; other failures keep its indexed content
+GONE_STATUSES = {404, 410}
+
 
 class CrawlerService:
-    def __init__(self, max_depth: int = None, max_pages: int = None):
+    def __init__(
+        self,
+        max_depth: int = None,
+        max_pages: int = None,
+        concurrency: int = None,
+        politeness_delay: float = None,
+        use_sitemaps: bool = None,
+    ):
         self.max_depth = max_depth if max_depth is not None else settings.crawler_max_depth
         self.max_pages = max_pages if max_pages is not None else settings.crawler_max_pages
+        self.concurrency = max(1, concurrency if concurrency is not None else settings.crawler_concurrency)
+        self.politeness_delay = (
+            politeness_delay if politeness_delay is not None else settings.crawler_politeness_delay_seconds
+        )
+        self.use_sitemaps = use_sitemaps if use_sitemaps is not None else settings.crawler_use_sitemaps
         self.fetcher = RequestsFetcher()
         self.js_fetcher = PlaywrightFetcher()
-        self.extractor = ReadabilityExtractor()
+        self.extractor = (
+            ReadabilityExtractor() if settings.crawler_extraction_mode == "readability" else LxmlExtractor()
+        )
+
+    def iter_site(self, start_url: str, known_pages: Optional[Dict[str, dict]] = None) -> Iterator[CrawlResult]:
+        """
+        Crawl a site and yield each page as soon as it is crawled.
+
+        The async crawl runs on its own event loop in a helper thread, so
+        callers (ingestion workers) can chunk and store pages while the next
+        ones are being fetched. At most `concurrency * 2` crawled pages wait
+        for the caller; the crawl pauses when the caller falls behind and is
+        cancelled when the caller stops iterating.
+        """
+        pages: queue.Queue = queue.Queue(maxsize=self.concurrency * 2)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        async def produce() -> None:
+            async for page in self.crawl_site(start_url, known_pages):
+                while not stop.is_set():
+                    try:
+                        pages.put_nowait(page)
+                        break
+                    except queue.Full:
+                        await asyncio.sleep(0.05)
+                if stop.is_set():
+                    return
+
+        def run() -> None:
+            try:
+                asyncio.run(produce())
+            except BaseException as e:
+                put(e)
+            else:
+                put(_DONE)
+
+        thread = threading.Thread(target=run, name="site-crawl", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = pages.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+    async def crawl_site(
+        self,
+        start_url: str,
+        known_pages: Optional[Dict[str, dict]] = None,
+    ) -> AsyncIterator[CrawlResult]:
+        """
+        Breadth-first crawl of same-domain pages from start_url.
+
+        `concurrency` workers drain the frontier over one pooled HTTP client
+        (keep-alive connections are reused across pages); each host is
+        requested at most once per politeness delay (or robots.txt
+        Crawl-delay). Pages are yielded in completion order.
+        Failed pages are yielded too, with success=False; an error that kills
+        a worker is raised. Links are followed up to max_depth and at most
+        max_pages pages are crawled.
+
+        With sitemaps enabled, the site's sitemap pages (under the start URL's
+        path) are queued right after the start page and their links are not
+        followed. A page whose sitemap <lastmod> is not newer than the one
+        recorded in known_pages (the previous crawl's pages, keyed by URL) is
+        not fetched; other known pages are fetched conditionally (see
+        crawl_single). Unchanged pages are yielded with unchanged=True and
+        their stored links are followed.
+        """
+        start_url = normalize_url(start_url, start_url)
+        hosts = {urlparse(start_url).netloc}
+        visited = VisitedSet()
+        throttle = HostThrottle(self.politeness_delay)
+        frontier: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        known_pages = known_pages or {}
+        lastmods: Dict[str, datetime] = {}
+        scheduled = 1
+        visited.add(start_url)
+        frontier.put_nowait((start_url, 0))
+        fetcher = AsyncHttpFetcher(
+            max_bytes=settings.crawler_max_page_bytes,
+            max_connections=self.concurrency * 2,
+            max_connections_per_host=settings.crawler_max_connections_per_host,
+        )
+
+        async with fetcher:
+            if self.use_sitemaps:
+                for entry in await self._sitemap_entries(fetcher, start_url):
+                    if entry.lastmod:
+                        lastmods[entry.url] = entry.lastmod
+                    if scheduled < self.max_pages and visited.add(entry.url):
+                        scheduled += 1
+                        frontier.put_nowait((entry.url, self.max_depth))
+
+            async def worker() -> None:
+                nonlocal scheduled
+                while True:
+                    url, depth = await frontier.get()
+                    try:
+                        known = known_pages.get(url)
+                        lastmod = lastmods.get(url)
+                        follow = depth < self.max_depth
+                        if (
+                            known and self._unchanged_since(lastmod, known)
+                            and (not follow or known.get("links") is not None)
+                        ):
+                            page = self._unchanged_page(url, known, follow)
+                        else:
+                            try:
+                                page = await self._crawl_page(fetcher, throttle, url, follow, known)
+                            except Exception as e:
+                                logger.warning(f"Page crawl failed: url={url}, error={str(e)}")
+                                page = CrawlResult(False, url=url, error=str(e))
+                        if known and follow and not page.success and not page.metadata.get("gone"):
+                            # A page that failed for now still leads to the pages below it
+                            page.links = list(known.get("links") or [])
+                        if lastmod:
+                            page.metadata["lastmod"] = lastmod.isoformat()
+                        page.metadata["depth"] = depth
+                        final_url = normalize_url(page.canonical_url, page.canonical_url)
+                        # Redirect targets count as visited too
+                        visited.add(final_url)
+                        if depth == 0:
+                            # Links are relative to wherever the start page redirected
+                            hosts.add(urlparse(final_url).netloc)
+                        for link in page.links:
+                            if scheduled >= self.max_pages:
+                                break
+                            if urlparse(link).netloc in hosts and visited.add(link):
+                                scheduled += 1
+                                frontier.put_nowait((link, depth + 1))
+                        await results.put(page)
+                    finally:
+                        frontier.task_done()
+
+            async def finish() -> None:
+                # Workers only return by raising, so the first task to finish is
+                # either the drained frontier or a dead worker, whose error ends
+                # the crawl instead of leaving join() waiting for its pages
+                joined = asyncio.create_task(frontier.join())
+                try:
+                    done, _ = await asyncio.wait([joined, *workers], return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    joined.cancel()
+                for task in done:
+                    if task is not joined:
+                        error = None if task.cancelled() else task.exception()
+                        await results.put(error or RuntimeError("Crawl worker exited"))
+                        return
+                await results.put(_DONE)
 
-    def crawl_single(self, url: str) -> CrawlResult:
-        robots = SimpleRobots(url)
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            tasks = [*workers, asyncio.create_task(finish())]
+            try:
+                while True:
+                    page = await results.get()
+                    if page is _DONE:
+                        break
+                    if isinstance(page, BaseException):
+                        raise page
+                    yield page
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"Site crawl finished: start_url={start_url}, pages={scheduled}")
+
+    async def _sitemap_entries(self, fetcher: AsyncHttpFetcher, start_url: str) -> List[SitemapEntry]:
+        """Pages listed in the site's sitemaps (robots.txt `Sitemap:` lines or /sitemap.xml)"""
+        robots = await robots_cache.get(start_url, fetcher)
+        reader = SitemapReader(fetcher.fetch_bytes, settings.crawler_sitemap_max_files)
+        return await reader.discover(start_url, robots.sitemaps())
+
+    @staticmethod
+    def _unchanged_since(lastmod: Optional[datetime], known: dict) -> bool:
+        """Sitemap lastmod is not newer than the one recorded at the last crawl"""
+        known_lastmod = parse_lastmod(known.get("lastmod"))
+        return bool(lastmod and known_lastmod and lastmod <= known_lastmod)
+
+    def crawl_single(self, url: str, collect_links: bool = False, known: Optional[dict] = None) -> CrawlResult:
+        """
+        Fetch and extract one page.
+
+        With `known` (the page's record from the previous crawl) the fetch is
+        conditional (If-None-Match / If-Modified-Since). A 304, an identical
+        response body or identical extracted text yields an unchanged=True
+        result, so the caller skips chunking and embedding; the first two
+        also skip extraction.
+
+        Args:
+            url: Page URL
+            collect_links: Also record the page's crawlable links on the result
+                (even when the page itself fails the content threshold)
+            known: Previous crawl's {page_url, etag, last_modified,
+                body_checksum, page_checksum, links} for this URL
+        """
+        robots = robots_cache.get_sync(url)
+        if not robots.allowed(url):
+            return CrawlResult(False, url=url, error="Blocked by robots.txt")
+
+        known = self._conditional_known(known, collect_links)
+        resp = self.fetcher.fetch(url, **self._validators(known))
+        return self._process_response(url, resp, collect_links, known)
+
+    async def _crawl_page(
+        self,
+        fetcher: AsyncHttpFetcher,
+        throttle: HostThrottle,
+        url: str,
+        collect_links: bool,
+        known: Optional[dict],
+    ) -> CrawlResult:
+        """
+        crawl_single for site crawls: robots.txt comes from the shared cache, its
+        Crawl-delay (capped) stretches the host's politeness delay, and the fetch
+        goes through the crawl's pooled client
+        """
+        robots = await robots_cache.get(url, fetcher)
         if not robots.allowed(url):
             return CrawlResult(False, url=url, error="Blocked by robots.txt")
+        crawl_delay = robots.crawl_delay()
+        if crawl_delay:
+            throttle.set_delay(
+                urlparse(url).netloc.lower(),
+                max(self.politeness_delay, min(crawl_delay, MAX_CRAWL_DELAY_SECONDS)),
+            )
+        await throttle.wait(url)
+
+        known = self._conditional_known(known, collect_links)
+        resp = await fetcher.fetch(url, **self._validators(known))
+        # Extraction and any JS render are blocking
+        return await asyncio.to_thread(self._process_response, url, resp, collect_links, known)
+
+    @staticmethod
+    def _conditional_known(known: Optional[dict], collect_links: bool) -> Optional[dict]:
+        """The previous crawl's record if the fetch may be conditional, else None"""
+        # A 304 has no body to take links from; fetch in full if they weren't stored
+        if known and (not collect_links or known.get("links") is not None):
+            return known
+        return None
 
-        resp = self.fetcher.fetch(url)
+    @staticmethod
+    def _validators(known: Optional[dict]) -> Dict[str, Optional[str]]:
+        if not known:
+            return {}
+        return {"etag": known.get("etag"), "last_modified": known.get("last_modified")}
+
+    def _process_response(self, url: str, resp: Dict, collect_links: bool, known: Optional[dict]) -> CrawlResult:
+        """Turn a fetched page into a CrawlResult (see crawl_single)"""
+        if known and resp["status"] == 304:
+            return self._unchanged_page(url, known, collect_links)
         if resp["status"] >= 400:
-            return CrawlResult(False, url=url, error=f"HTTP {resp['status']}")
+            page = CrawlResult(False, url=url, error=f"HTTP {resp['status']}")
+            # Removed from the site, as opposed to failing for now
+            page.metadata["gone"] = resp["status"] in GONE_STATUSES
+            return page
 
+        http_resp = resp
         html = resp.get("content", "")
+        body_checksum = hashlib.sha256(html.encode("utf-8")).hexdigest() if html.strip() else None
+        if known and body_checksum and body_checksum == known.get("body_checksum"):
+            page = self._unchanged_page(url, known, False)
+            if collect_links:
+                page.links = extract_links(resp.get("final_url", url), html)
+            return page
         if not html.strip():
+            content_type = {name.lower(): value for name, value in resp.get("headers", {}).items()}.get("content-type", "")
+            if content_type and "html" not in content_type.lower():
+                # A browser won't make a PDF or an image into a page
+                return CrawlResult(False, url=url, error=f"Non-HTML content ({content_type})")
             # Try JS render if enabled
-            if settings.crawler_render_js:
+            if settings.crawler_render_js and render_memory.verdict(urlparse(url).netloc) is not False:
                 try:
                     logger.info(f"Attempting JS render fetch for {url}")
                     js_resp = self.js_fetcher.fetch(url)
                     html = js_resp.get("content", "")
+                    render_memory.record(urlparse(url).netloc, bool(html.strip()))
                     if not html.strip():
                         return CrawlResult(False, url=url, error="Empty or non-HTML content (even after JS)")
                     resp = js_resp
@@ -48,10 +346,23 @@ class CrawlerService:
         final_url = resp.get("final_url", url)
         result = self.extractor.extract(final_url, html)
         if not result.success:
+            if collect_links:
+                result.links = extract_links(final_url, html)
             return result
 
-        # If extracted content is too small, attempt JS-rendered retry before failing
-        if len(result.text) < settings.crawler_min_content_chars and settings.crawler_render_js:
+        # If extracted content is too small, look for the page's text in
+        # server-rendered JSON, then attempt a JS-rendered retry before failing
+        # when that's likely to help
+        hints = None
+        if len(result.text) < settings.crawler_min_content_chars:
+            hints = inspect_page(html)
+            if len(hints.ssr_text) > len(result.text):
+                logger.info(f"Using SSR JSON payload text (len={len(hints.ssr_text)}) for {url}")
+                result = CrawlResult(True, url=final_url, text=hints.ssr_text, metadata=result.metadata)
+        if (
+            len(result.text) < settings.crawler_min_content_chars and settings.crawler_render_js
+            and self._should_render(final_url, hints)
+        ):
             try:
                 logger.info(f"Content below threshold ({len(result.text)} chars). Retrying with JS render for {url}")
                 js_resp = self.js_fetcher.fetch(url)
@@ -74,6 +385,10 @@ class CrawlerService:
                 else:
                     if not js_html.strip() and not js_text.strip():
                         logger.warning("JS render returned empty content on retry")
+                render_memory.record(
+                    urlparse(final_url).netloc,
+                    resp is js_resp and len(result.text) >= settings.crawler_min_content_chars,
+                )
             except Exception as e:
                 logger.warning(f"JS render retry failed: {e}")
 
@@ -81,19 +396,68 @@ class CrawlerService:
         result.canonical_url = final_url
 
         # Build metadata
-        headers = resp.get("headers", {})
-        etag = headers.get("ETag") or headers.get("Etag")
-        last_modified = headers.get("Last-Modified")
+        headers = {name.lower(): value for name, value in resp.get("headers", {}).items()}
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
         checksum = hashlib.sha256(result.text.encode("utf-8")).hexdigest()
         result.metadata.update({
             "etag": etag,
             "last_modified": last_modified,
             "page_checksum": checksum,
+            # A JS-rendered page can change while its HTML shell doesn't, so
+            # only plain HTTP responses may be skipped by their body
+            "body_checksum": body_checksum if resp is http_resp else None,
         })
+        if not collect_links:
+            links = []
+        else:
+            # The extractor may have taken them from its own parse of this response
+            links = result.links or extract_links(final_url, resp.get("content", ""))
         # Minimum content threshold after possible JS retry
         if len(result.text) < settings.crawler_min_content_chars:
-            return CrawlResult(False, url=url, error=f"Extracted content too small ({len(result.text)} chars)")
+            result = CrawlResult(False, url=url, canonical_url=final_url, error=f"Extracted content too small ({len(result.text)} chars)")
+        elif known and checksum == known.get("page_checksum"):
+            # Same text (only markup changed): keep the stored chunks, which
+            # are filed under the previous crawl's page_url
+            result.unchanged = True
+            result.canonical_url = known.get("page_url") or final_url
+            result.metadata["simhash"] = known.get("simhash")
 
+        result.links = links
         return result
 
+    @staticmethod
+    def _should_render(url: str, hints: PageHints) -> bool:
+        """
+        Whether a JS render is likely to turn a short page into a usable one:
+        the page looks client-rendered (empty app root, noscript warning) or
+        rendering has usually helped on its host, and it has helped there at
+        least once. Short pages without such signs are taken as they are.
+        """
+        verdict = render_memory.verdict(urlparse(url).netloc)
+        if verdict is False:
+            logger.debug(f"Skipping JS render, it hasn't helped on this host: {url}")
+            return False
+        if hints.js_reason:
+            logger.debug(f"Page looks client-rendered ({hints.js_reason}): {url}")
+            return True
+        return bool(verdict)
+
+    @staticmethod
+    def _unchanged_page(url: str, known: dict, collect_links: bool) -> CrawlResult:
+        """Result for a page that hasn't changed: the previous crawl's record, carried forward"""
+        page = CrawlResult(
+            True,
+            url=url,
+            canonical_url=known.get("page_url") or url,
+            metadata={
+                key: known.get(key)
+                for key in ("etag", "last_modified", "page_checksum", "body_checksum", "simhash")
+            },
+        )
+        page.unchanged = True
+        if collect_links:
+            page.links = list(known.get("links") or [])
+        return page
+
 
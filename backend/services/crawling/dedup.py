@@ -0,0 +1,278 @@
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import hashlib
+import re
+
+from parsers.base import join_elements
+from services.crawling.base import CrawlResult
+
+# A block (or pair of adjacent blocks) on at least this many pages, and on at
+# least this share of the pages seen so far, is site boilerplate
+MIN_BOILERPLATE_PAGES = 3
+MIN_BOILERPLATE_SHARE = 0.3
+# Shorter blocks ("Overview", "Next") only count as boilerplate together with
+# a neighbour, so common section headings survive
+LONG_BLOCK_CHARS = 40
+# Pages buffered before the first one is cleaned
+WARMUP_PAGES = 20
+
+SIMHASH_BITS = 64
+# Pages whose SimHashes differ in at most this many bits are near-duplicates
+# (roughly >93% of word 3-shingles shared; unrelated pages differ in ~32)
+NEAR_DUPLICATE_DISTANCE = 5
+# The index is split into DISTANCE + 1 bands: near-duplicates share one exactly
+SIMHASH_BANDS = NEAR_DUPLICATE_DISTANCE + 1
+MIN_SIMHASH_WORDS = 20
+
+_WORD = re.compile(r"\w+")
+
+
+def _hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def block_key(text: str) -> str:
+    """Fingerprint of a block, ignoring case and spacing"""
+    return _hash(" ".join(text.lower().split()))
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash over word 3-shingles; None for pages too short to compare"""
+    words = _WORD.findall(text.lower())
+    if len(words) < MIN_SIMHASH_WORDS:
+        return None
+    # How many shingle hashes have each bit set, kept bit-sliced: counters[k]
+    # holds bit k of all 64 counts, so adding a hash is a short ripple carry
+    # instead of 64 separate increments
+    counters: List[int] = []
+    shingles = len(words) - 2
+    for i in range(shingles):
+        carry = int.from_bytes(
+            hashlib.blake2b(" ".join(words[i : i + 3]).encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for k in range(len(counters)):
+            counters[k], carry = counters[k] ^ carry, counters[k] & carry
+            if not carry:
+                break
+        if carry:
+            counters.append(carry)
+    value = 0
+    for bit in range(SIMHASH_BITS):
+        count = sum((counter >> bit & 1) << k for k, counter in enumerate(counters))
+        # Set where most shingles have the bit
+        if count * 2 > shingles:
+            value |= 1 << bit
+    return value
+
+
+class SimHashIndex:
+    """Near-duplicate lookup: SimHashes banded so a query checks a few candidates"""
+
+    def __init__(self):
+        self._bands: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in range(SIMHASH_BANDS)]
+        self._band_bits = SIMHASH_BITS // SIMHASH_BANDS
+
+    def _band_values(self, value: int) -> Iterator[Tuple[int, int]]:
+        mask = (1 << self._band_bits) - 1
+        for band in range(SIMHASH_BANDS):
+            yield band, value >> (band * self._band_bits) & mask
+
+    def add(self, value: int, url: str) -> None:
+        for band, key in self._band_values(value):
+            self._bands[band].setdefault(key, []).append((value, url))
+
+    def remove(self, value: int, url: str) -> None:
+        for band, key in self._band_values(value):
+            entries = self._bands[band].get(key)
+            if entries and (value, url) in entries:
+                entries.remove((value, url))
+
+    def find_all(self, value: int) -> List[str]:
+        """URLs of indexed near-duplicate pages, in the order they were added"""
+        found: List[str] = []
+        for band, key in self._band_values(value):
+            for other, url in self._bands[band].get(key, ()):
+                if url not in found and bin(value ^ other).count("1") <= NEAR_DUPLICATE_DISTANCE:
+                    found.append(url)
+        return found
+
+
+class SiteDeduplicator:
+    """
+    Cleans the pages of one site crawl before chunking.
+
+    Blocks (extracted paragraphs/headings/tables, or lines for pages without
+    structure) that repeat across the site's pages are removed: header,
+    nav, cookie banner and footer text would otherwise become duplicate
+    chunks on every page. A block is boilerplate when it, or the pair it
+    forms with a neighbouring block, is on MIN_BOILERPLATE_PAGES pages and
+    MIN_BOILERPLATE_SHARE of those seen. The first WARMUP_PAGES pages are
+    buffered to learn from; the keys learned by the previous crawl apply from
+    the first page.
+
+    Pages whose cleaned text is a near-duplicate (SimHash) of another page
+    get metadata["duplicate_of"]. The index starts with the pages indexed by
+    the previous crawl (their stored SimHash), so the page kept from a
+    near-duplicate pair stays the same across crawls. Such a page only
+    counts once this crawl has seen it again (unchanged, re-fetched and
+    still alike, or failing for now); pages matching it wait until then, and
+    are indexed after all if it never comes.
+    """
+
+    def __init__(self, known_boilerplate: Iterable[str] = (), known_pages: Optional[Dict[str, dict]] = None):
+        self.known_boilerplate: Set[str] = set(known_boilerplate)
+        self.pages_seen = 0
+        self._counts: Counter = Counter()
+        self._index = SimHashIndex()
+        # Previous crawl's pages, by URL, and their SimHashes not yet seen again, by page URL
+        self._known_pages = known_pages or {}
+        self._seeded: Dict[str, int] = {}
+        # Page URLs whose content is indexed by this crawl
+        self._confirmed: Set[str] = set()
+        # Near-duplicates waiting for the seeded page they match, by its page URL
+        self._waiting: Dict[str, List[CrawlResult]] = {}
+        for known in self._known_pages.values():
+            page_url = known.get("page_url")
+            if known.get("simhash") and page_url and page_url not in self._seeded:
+                self._seeded[page_url] = int(known["simhash"], 16)
+                self._index.add(self._seeded[page_url], page_url)
+
+    def process(self, pages: Iterable[CrawlResult]) -> Iterator[CrawlResult]:
+        buffered: List[Tuple[CrawlResult, List[str]]] = []
+        for page in pages:
+            if not page.success or page.unchanged:
+                yield page
+                yield from self._confirm_kept(page)
+                continue
+            blocks = self._blocks(page)
+            self._count(blocks)
+            if len(buffered) < WARMUP_PAGES:
+                buffered.append((page, blocks))
+                if len(buffered) < WARMUP_PAGES:
+                    continue
+                for buffered_page, buffered_blocks in buffered:
+                    yield from self._dedupe(self._clean(buffered_page, buffered_blocks))
+                continue
+            yield from self._dedupe(self._clean(page, blocks))
+        if len(buffered) < WARMUP_PAGES:
+            for buffered_page, buffered_blocks in buffered:
+                yield from self._dedupe(self._clean(buffered_page, buffered_blocks))
+        # Previous-crawl pages that didn't come back no longer count; pages
+        # that matched only those are indexed (or match a page of this crawl)
+        for page_url in list(self._seeded):
+            self._forget_seed(page_url)
+        while self._waiting:
+            _, waiting = self._waiting.popitem()
+            for page in waiting:
+                yield from self._dedupe(page)
+
+    def boilerplate_keys(self) -> List[str]:
+        """Keys to carry into the next crawl: this crawl's boilerplate, plus
+        known keys still present (or all of them if too few pages changed to tell)"""
+        learned = {key for key in self._counts if self._is_boilerplate(key)}
+        if self.pages_seen < WARMUP_PAGES:
+            learned |= self.known_boilerplate
+        else:
+            learned |= {key for key in self.known_boilerplate if self._counts[key]}
+        return sorted(learned)
+
+    @staticmethod
+    def _blocks(page: CrawlResult) -> List[str]:
+        if page.elements is not None:
+            return [element.text for element in page.elements]
+        return page.text.split("\n")
+
+    @staticmethod
+    def _keys(blocks: List[str]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """(block key if long enough, key of the pair with the next block) per block"""
+        block_keys = [block_key(block) if block.strip() else None for block in blocks]
+        keys = []
+        for i, block in enumerate(blocks):
+            single = block_keys[i] if len(block.strip()) >= LONG_BLOCK_CHARS else None
+            following = block_keys[i + 1] if i + 1 < len(blocks) else None
+            pair = _hash(block_keys[i] + following) if block_keys[i] and following else None
+            keys.append((single, pair))
+        return keys
+
+    def _count(self, blocks: List[str]) -> None:
+        self.pages_seen += 1
+        page_keys = {key for pair in self._keys(blocks) for key in pair if key}
+        self._counts.update(page_keys)
+
+    def _is_boilerplate(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        if key in self.known_boilerplate:
+            return True
+        count = self._counts[key]
+        return count >= MIN_BOILERPLATE_PAGES and count >= MIN_BOILERPLATE_SHARE * self.pages_seen
+
+    def _clean(self, page: CrawlResult, blocks: List[str]) -> CrawlResult:
+        """Drop the page's boilerplate blocks and record its SimHash"""
+        keys = self._keys(blocks)
+        drop = [False] * len(blocks)
+        for i, (single, pair) in enumerate(keys):
+            if self._is_boilerplate(single):
+                drop[i] = True
+            if self._is_boilerplate(pair):
+                drop[i] = drop[i + 1] = True
+
+        if any(drop):
+            if page.elements is not None:
+                page.elements = [element for element, dropped in zip(page.elements, drop) if not dropped]
+                page.text = join_elements(page.elements)
+            else:
+                page.text = "\n".join(block for block, dropped in zip(blocks, drop) if not dropped)
+            page.metadata["boilerplate_blocks"] = sum(drop)
+
+        value = simhash(page.text)
+        page.metadata["simhash"] = f"{value:016x}" if value is not None else None
+        return page
+
+    def _dedupe(self, page: CrawlResult) -> Iterator[CrawlResult]:
+        """Yield a cleaned page, marked if it's a near-duplicate (or hold it back, see the class)"""
+        page_url = page.canonical_url
+        # This page's stored SimHash is replaced by the one just computed
+        self._forget_seed(page_url)
+        value = int(page.metadata["simhash"], 16) if page.metadata.get("simhash") else None
+        matches = [url for url in self._index.find_all(value) if url != page_url] if value is not None else []
+        confirmed = [url for url in matches if url in self._confirmed]
+        if confirmed:
+            page.metadata["duplicate_of"] = confirmed[0]
+            page.metadata["simhash"] = None
+            yield page
+        elif matches:
+            self._waiting.setdefault(matches[0], []).append(page)
+        else:
+            if value is not None:
+                self._index.add(value, page_url)
+            yield page
+            yield from self._confirm(page_url)
+
+    def _confirm_kept(self, page: CrawlResult) -> Iterator[CrawlResult]:
+        """An unchanged page, or a failed one whose stored chunks are kept"""
+        if page.success:
+            page_url, stored = page.canonical_url, page.metadata.get("simhash")
+        elif not page.metadata.get("gone"):
+            page_url, stored = (self._known_pages.get(page.url) or {}).get("page_url"), None
+        else:
+            return
+        if page_url in self._seeded:
+            # Its stored SimHash is in the index already
+            del self._seeded[page_url]
+        elif page_url and stored:
+            self._index.add(int(stored, 16), page_url)
+        else:
+            return
+        yield from self._confirm(page_url)
+
+    def _confirm(self, page_url: str) -> Iterator[CrawlResult]:
+        """The page's content is indexed by this crawl: settle the pages waiting for it"""
+        self._confirmed.add(page_url)
+        for page in self._waiting.pop(page_url, []):
+            yield from self._dedupe(page)
+
+    def _forget_seed(self, page_url: str) -> None:
+        value = self._seeded.pop(page_url, None)
+        if value is not None:
+            self._index.remove(value, page_url)
@@ -1,5 +1,11 @@
+from typing import List, Optional
+import re
+
 from bs4 import BeautifulSoup
+from config.settings import settings
+from parsers.base import DocumentElement, join_elements
 from services.crawling.base import ContentExtractor, CrawlResult
+from services.crawling.url_utils import extract_tree_links
 
 try:
     from readability import Document  # readability-lxml
@@ -39,3 +45,196 @@ class ReadabilityExtractor(ContentExtractor):
             return CrawlResult(False, url=url, text="", metadata={}, error=str(e))
 
 
+# Never page content
+DROP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "nav", "footer", "aside", "button", "select", "dialog",
+}
+DROP_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search", "dialog", "alertdialog"}
+# Whole class names / ids of site chrome ("_" read as "-"); fragments like the
+# "sidebar" of "with-sidebar" don't count
+DROP_NAMES = {
+    "cookie", "cookies", "cookie-banner", "cookie-consent", "cookie-notice", "consent", "gdpr",
+    "newsletter", "breadcrumb", "breadcrumbs", "share", "sharing", "share-buttons", "social",
+    "social-share", "sidebar", "navbar", "nav-menu", "main-menu", "site-menu", "mobile-menu",
+    "skip-link", "skip-to-content", "advert", "advertisement", "ads", "promo", "popup", "modal",
+}
+# An element named like chrome is only dropped while it holds at most this
+# share of the content's text; more than that and it's a layout wrapper
+DROP_NAMED_MAX_SHARE = 0.3
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# Elements whose boundaries end a paragraph
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "ul", "ol", "li", "dl", "dt", "dd",
+    "blockquote", "pre", "figure", "figcaption", "address", "details", "summary", "hr",
+    "body", "center", "caption",
+}
+XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+TITLE_SEPARATOR = re.compile(r"\s+[|–—-]\s+")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _is_boilerplate(element, content_chars) -> bool:
+    """`content_chars()`: length of the content root's text (only computed when needed)"""
+    if element.tag in DROP_TAGS:
+        return True
+    # A <header> inside an article is its title block, elsewhere it's the site's
+    if element.tag == "header" and not any(a.tag in ("article", "main") for a in element.iterancestors()):
+        return True
+    if (element.get("role") or "").lower() in DROP_ROLES:
+        return True
+    if element.get("hidden") is not None or element.get("aria-hidden") == "true":
+        return True
+    style = (element.get("style") or "").replace(" ", "").lower()
+    if "display:none" in style or "visibility:hidden" in style:
+        return True
+    names = f"{element.get('class') or ''} {element.get('id') or ''}".lower().replace("_", "-")
+    if not DROP_NAMES.intersection(names.split()):
+        return False
+    return len(_normalize(element.text_content())) <= content_chars() * DROP_NAMED_MAX_SHARE
+
+
+def _content_root(root):
+    """<main>, role=main or a single <article>; otherwise <body>"""
+    for path in ("//main", "//*[@role='main']"):
+        found = root.xpath(path)
+        if found and _normalize(found[0].text_content()):
+            return found[0]
+    articles = root.xpath("//article")
+    if len(articles) == 1:
+        return articles[0]
+    body = root.find("body")
+    return body if body is not None else root
+
+
+def _table_text(table) -> str:
+    rows = []
+    for row in table.iter("tr"):
+        cells = [_normalize(cell.text_content()) for cell in row if cell.tag in ("td", "th")]
+        if any(cells):
+            rows.append(" | ".join(cells))
+    return "\n".join(rows)
+
+
+def html_elements(content) -> List[DocumentElement]:
+    """
+    Headings, paragraphs and tables of an lxml element, in document order.
+
+    Inline markup is flattened into its paragraph; block boundaries start a
+    new one. <pre> blocks keep their line breaks and indentation. Walks the
+    tree without recursion (deep DOMs are common).
+    """
+    elements: List[DocumentElement] = []
+    buffer: List[str] = []
+    total: List[int] = []
+
+    def content_chars() -> int:
+        if not total:
+            total.append(len(_normalize(content.text_content())))
+        return total[0]
+
+    def flush() -> None:
+        text = _normalize("".join(buffer))
+        buffer.clear()
+        if text:
+            elements.append(DocumentElement(DocumentElement.PARAGRAPH, text))
+
+    stack = [(content, False)]
+    while stack:
+        element, closing = stack.pop()
+        tail = element.tail if element is not content else None
+        if closing:
+            if element.tag in BLOCK_TAGS:
+                flush()
+            if tail:
+                buffer.append(tail)
+            continue
+        if not isinstance(element.tag, str) or (element is not content and _is_boilerplate(element, content_chars)):
+            # Comments and dropped elements keep only the text that follows them
+            if tail:
+                buffer.append(tail)
+            continue
+        if element.tag in HEADING_TAGS or element.tag in ("table", "pre"):
+            flush()
+            if element.tag == "table":
+                text = _table_text(element)
+                kind, level = DocumentElement.TABLE, None
+            elif element.tag == "pre":
+                text = "\n".join(line.rstrip() for line in element.text_content().strip("\n").split("\n"))
+                kind, level = DocumentElement.PARAGRAPH, None
+            else:
+                text = _normalize(element.text_content())
+                kind, level = DocumentElement.HEADING, int(element.tag[1])
+            if text:
+                elements.append(DocumentElement(kind, text, level=level))
+            if tail:
+                buffer.append(tail)
+            continue
+        if element.tag in BLOCK_TAGS:
+            flush()
+        elif element.tag == "br":
+            buffer.append(" ")
+        if element.text:
+            buffer.append(element.text)
+        stack.append((element, True))
+        for child in reversed(element):
+            stack.append((child, False))
+    flush()
+    return elements
+
+
+class LxmlExtractor(ContentExtractor):
+    """
+    Fast extraction from a single lxml parse.
+
+    Site chrome (nav, footer, aside, scripts, cookie banners, hidden
+    elements, ...) is dropped and the main content is walked into heading/
+    paragraph/table elements, so chunks keep the page's section headings.
+    The page's links are taken from the same parse, before chrome is
+    dropped. Pages where this finds too little text fall back to
+    readability.
+    """
+
+    def __init__(self):
+        self.fallback = ReadabilityExtractor()
+
+    def extract(self, url: str, html: str) -> CrawlResult:
+        try:
+            import lxml.html
+            root = lxml.html.fromstring(XML_DECLARATION.sub("", html, count=1))
+            links = extract_tree_links(url, root)
+            metadata = {}
+            page_title = self._title(root)
+            if page_title:
+                metadata["title"] = page_title
+
+            elements = html_elements(_content_root(root))
+            text = join_elements(elements)
+        except Exception as e:
+            return CrawlResult(False, url=url, text="", metadata={}, error=str(e))
+
+        if len(text) < settings.crawler_min_content_chars:
+            fallback = self.fallback.extract(url, html)
+            if fallback.success and len(fallback.text) > len(text):
+                fallback.links = links
+                return fallback
+
+        result = CrawlResult(True, url=url, canonical_url=None, text=text, metadata=metadata)
+        result.elements = elements
+        result.links = links
+        return result
+
+    @staticmethod
+    def _title(root) -> Optional[str]:
+        """og:title, else <title> without its " | Site name" part"""
+        og_title = root.xpath("//meta[@property='og:title']/@content")
+        if og_title and og_title[0].strip():
+            return og_title[0].strip()
+        title = _normalize(root.findtext(".//title") or "")
+        if not title:
+            return None
+        # The longest part is usually the page's own title
+        return max(TITLE_SEPARATOR.split(title), key=len)
@@ -1,18 +1,66 @@
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import asyncio
+import codecs
+import re
+
+import httpx
 import requests
-from typing import Dict
+
+USER_AGENT = "ConvotCrawler/1.0 (+https://example.com)"
+
+# <meta charset="..."> / <meta http-equiv="Content-Type" content="...; charset=...">
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+
+
+def _conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def _is_text_type(content_type: str) -> bool:
+    return "text/html" in content_type or content_type.startswith("text/") or "xhtml" in content_type
+
+
+def _looks_like_html(head: bytes) -> bool:
+    """Sniff an untyped (or application/octet-stream) body from its first bytes"""
+    start = head[:1024].lstrip().lower()
+    return start.startswith((b"<!doctype html", b"<html")) or b"<html" in start or b"<head" in start
+
+
+def _charset(content_type: str, head: bytes) -> str:
+    """Declared charset (header, then <meta>), defaulting to UTF-8"""
+    match = re.search(r"charset\s*=\s*[\"']?([\w.:-]+)", content_type, re.IGNORECASE)
+    declared = match.group(1) if match else None
+    if not declared:
+        meta = _META_CHARSET.search(head[:4096])
+        declared = meta.group(1).decode("ascii", "ignore") if meta else None
+    try:
+        return codecs.lookup(declared).name if declared else "utf-8"
+    except LookupError:
+        return "utf-8"
 
 
 class RequestsFetcher:
     def __init__(self, timeout: int = 15):
         self.timeout = timeout
         self.headers = {
-            "User-Agent": "ConvotCrawler/1.0 (+https://example.com)"
+            "User-Agent": USER_AGENT
         }
 
-    def fetch(self, url: str) -> Dict:
-        resp = requests.get(url, headers=self.headers, timeout=self.timeout, allow_redirects=True)
+    def fetch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Dict:
+        """
+        Fetch a page. With the validators of an earlier fetch, the request is
+        conditional and an unchanged page comes back as status 304 with no content.
+        """
+        headers = {**self.headers, **_conditional_headers(etag, last_modified)}
+        resp = requests.get(url, headers=headers, timeout=self.timeout, allow_redirects=True)
         content_type = resp.headers.get("Content-Type", "")
-        text = resp.text if "text/html" in content_type or content_type.startswith("text/") else ""
+        text = resp.text if _is_text_type(content_type) else ""
         return {
             "status": resp.status_code,
             "headers": dict(resp.headers),
@@ -21,3 +69,121 @@ class RequestsFetcher:
         }
 
 
+class AsyncHttpFetcher:
+    """
+    Pooled async fetcher for site crawls.
+
+    One httpx client (and its keep-alive connection pool) serves a whole
+    crawl, so pages on a host reuse TCP/TLS connections instead of
+    reconnecting per request. At most `max_connections_per_host` requests run
+    against one host at a time. Bodies are streamed: non-HTML responses are
+    dropped after the headers (or the first bytes, when untyped), and pages
+    are decoded incrementally and cut at `max_bytes`.
+
+    Returns the same dicts as RequestsFetcher. Use as an async context manager
+    on the event loop that makes the requests.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 15,
+        max_bytes: int = 5 * 1024 * 1024,
+        max_connections: int = 32,
+        max_connections_per_host: int = 4,
+    ):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_connections = max_connections
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        self.headers = {"User-Agent": USER_AGENT}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "AsyncHttpFetcher":
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=30,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _slot(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_slots[host]
+
+    async def fetch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Dict:
+        """
+        Fetch a page, conditionally when validators are given (see RequestsFetcher.fetch).
+
+        content is "" for error, 304 and non-HTML responses; their bodies are
+        never downloaded.
+        """
+        async with self._slot(url):
+            async with self._client.stream("GET", url, headers=_conditional_headers(etag, last_modified)) as resp:
+                result = {
+                    "status": resp.status_code,
+                    "headers": dict(resp.headers),
+                    "content": "",
+                    "final_url": str(resp.url),
+                }
+                content_type = resp.headers.get("Content-Type", "").lower()
+                if resp.status_code >= 300 or (content_type and not _is_text_type(content_type)
+                                               and "octet-stream" not in content_type):
+                    return result
+                result["content"], result["truncated"] = await self._read_text(resp, content_type)
+                return result
+
+    async def _read_text(self, resp, content_type: str):
+        """Decode the body as it streams in; (text, truncated)"""
+        decoder = None
+        parts = []
+        size = 0
+        async for chunk in resp.aiter_bytes():
+            if decoder is None:
+                if not _is_text_type(content_type) and not _looks_like_html(chunk):
+                    return "", False
+                decoder = codecs.getincrementaldecoder(_charset(content_type, chunk))(errors="replace")
+            chunk = chunk[: self.max_bytes - size]
+            size += len(chunk)
+            parts.append(decoder.decode(chunk))
+            if size >= self.max_bytes:
+                return "".join(parts), True
+        if decoder is not None:
+            parts.append(decoder.decode(b"", final=True))
+        return "".join(parts), False
+
+    async def fetch_bytes(self, url: str, max_bytes: int = 50 * 1024 * 1024) -> Dict:
+        """Fetch a non-HTML resource (sitemaps) as raw bytes, reading at most max_bytes"""
+        async with self._slot(url):
+            async with self._client.stream("GET", url) as resp:
+                body = b""
+                if resp.status_code < 400:
+                    chunks = []
+                    size = 0
+                    async for chunk in resp.aiter_bytes():
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size >= max_bytes:
+                            break
+                    body = b"".join(chunks)[:max_bytes]
+                return {
+                    "status": resp.status_code,
+                    "headers": dict(resp.headers),
+                    "body": body,
+                    "final_url": str(resp.url),
+                }
@@ -1,101 +1,281 @@
-from typing import Dict
+from concurrent.futures import Future
+from typing import Dict, Optional, Set
+import asyncio
+import atexit
 import logging
 import subprocess
 import sys
+import threading
+
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Use a realistic desktop user-agent for Next.js sites
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
 
-class PlaywrightFetcher:
-    def __init__(self, timeout_ms: int = 20000):
-        self.timeout_ms = timeout_ms
-        self._browsers_checked = False
+# Not needed for text extraction; aborted before they are downloaded
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+# Resolves once the DOM has had no mutations for `quiet` ms (or after `limit` ms)
+DOM_SETTLED_JS = """([quiet, limit]) => new Promise((resolve) => {
+    let timer;
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(done, quiet);
+    });
+    function done() {
+        observer.disconnect();
+        resolve();
+    }
+    observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    timer = setTimeout(done, quiet);
+    setTimeout(done, limit);
+})"""
+
+# Empties the page origin's storage before its context goes back to the pool
+CLEAR_STORAGE_JS = "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+
+# Starting the browser may first install Chromium (up to 300s), so it gets
+# its own wait instead of counting against a render's timeout
+BROWSER_START_TIMEOUT_S = 360
+
+# Settle windows for readiness (ms)
+DOM_QUIET_MS = 300
+DOM_SETTLE_LIMIT_MS = 3000
+NETWORK_IDLE_LIMIT_MS = 5000
+
+# Shared browser pool (created on first JS render)
+_pool: Optional["BrowserPool"] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(max_contexts: int) -> "BrowserPool":
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(max_contexts)
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def warm_up(max_contexts: int = None) -> None:
+    """Start the shared browser ahead of the first render (e.g. when a worker starts)"""
+    import playwright.async_api  # noqa: F401
 
-    def _ensure_browsers_installed(self):
-        """Check if Playwright browsers are installed, install if missing"""
-        if self._browsers_checked:
+    _get_pool(max_contexts if max_contexts is not None else settings.crawler_js_max_contexts).start()
+
+
+def _install_chromium() -> None:
+    """Install Playwright's Chromium (first launch found no browser)"""
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "playwright", "install", "chromium"],
+            check=True,
+            capture_output=True,
+            timeout=300  # 5 minute timeout
+        )
+        logger.info("Playwright browsers installed successfully")
+    except subprocess.TimeoutExpired:
+        logger.error("Playwright browser installation timed out")
+        raise RuntimeError(
+            "Playwright browsers installation timed out. "
+            "Please install manually: playwright install chromium"
+        )
+    except Exception as install_error:
+        logger.error(f"Failed to install Playwright browsers: {install_error}")
+        raise RuntimeError(
+            "Playwright browsers are not installed and automatic installation failed. "
+            "Please install manually: playwright install chromium"
+        ) from install_error
+
+
+class BrowserPool:
+    """
+    One long-lived headless Chromium shared by every JS render in the process.
+
+    Playwright objects belong to the event loop that created them, so the
+    browser lives on a dedicated thread with its own loop; render() can be
+    called from any thread and blocks until its page is done. At most
+    `max_contexts` pages render at once, each in a reused browser context
+    (cookies and storage cleared between pages). Images, fonts and media are
+    never downloaded. A browser that crashed is relaunched on the next render.
+    """
+
+    def __init__(self, max_contexts: int):
+        self.max_contexts = max(1, max_contexts)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+        self._playwright = None
+        self._browser = None
+        self._contexts: Optional[asyncio.Queue] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        # Contexts being closed after a failed render
+        self._closing: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Launch the browser if it isn't running (installing Chromium if needed)"""
+        future: Future = asyncio.run_coroutine_threadsafe(self._launch(), self._loop)
+        try:
+            future.result(timeout=BROWSER_START_TIMEOUT_S)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def render(self, url: str, timeout_ms: int) -> Dict:
+        """Render a page; returns {status, headers, content, body_text, final_url}"""
+        self.start()
+        future: Future = asyncio.run_coroutine_threadsafe(self._render(url, timeout_ms), self._loop)
+        try:
+            # Queueing for a context plus the page's own budget
+            return future.result(timeout=timeout_ms / 1000 * 3)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def shutdown(self) -> None:
+        if not self._loop.is_running():
             return
-        
         try:
-            from playwright.sync_api import sync_playwright
-            # Try to launch to verify browsers are installed
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                browser.close()
-            self._browsers_checked = True
-            logger.debug("Playwright browsers verified")
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(timeout=10)
         except Exception as e:
-            logger.warning(f"Playwright browsers not found, attempting installation: {e}")
+            logger.debug(f"Browser pool shutdown: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    async def _launch(self) -> None:
+        """Start (or restart) Chromium and an empty context pool"""
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            await self._close()
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+            try:
+                self._browser = await self._playwright.chromium.launch(headless=True)
+            except Exception as e:
+                if "Executable doesn't exist" not in str(e):
+                    raise
+                logger.warning(f"Playwright browsers not found, attempting installation: {e}")
+                await asyncio.to_thread(_install_chromium)
+                self._browser = await self._playwright.chromium.launch(headless=True)
+            self._contexts = asyncio.Queue()
+            for _ in range(self.max_contexts):
+                self._contexts.put_nowait(None)
+            logger.info(f"Browser pool started: contexts={self.max_contexts}")
+
+    async def _close(self) -> None:
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    async def _new_context(self):
+        context = await self._browser.new_context(user_agent=USER_AGENT, viewport={"width": 1366, "height": 900})
+        await context.route("**/*", self._route)
+        return context
+
+    @staticmethod
+    async def _route(route) -> None:
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _render(self, url: str, timeout_ms: int) -> Dict:
+        if self._browser is None or not self._browser.is_connected():
+            await self._launch()
+        contexts = self._contexts
+        # A context slot; None until its context is first created
+        context = await contexts.get()
+        reusable = False
+        try:
+            if context is None:
+                context = await self._new_context()
+            page = await context.new_page()
+            page.set_default_timeout(timeout_ms)
             try:
-                # Try to install chromium
-                subprocess.run(
-                    [sys.executable, "-m", "playwright", "install", "chromium"],
-                    check=True,
-                    capture_output=True,
-                    timeout=300  # 5 minute timeout
-                )
-                logger.info("Playwright browsers installed successfully")
-                self._browsers_checked = True
-            except subprocess.TimeoutExpired:
-                logger.error("Playwright browser installation timed out")
-                raise RuntimeError(
-                    "Playwright browsers installation timed out. "
-                    "Please install manually: playwright install chromium"
-                )
-            except Exception as install_error:
-                logger.error(f"Failed to install Playwright browsers: {install_error}")
-                raise RuntimeError(
-                    "Playwright browsers are not installed and automatic installation failed. "
-                    "Please install manually: playwright install chromium"
-                ) from install_error
+                result = await self._load(page, url)
+                await page.evaluate(CLEAR_STORAGE_JS)
+            finally:
+                await page.close()
+            await context.clear_cookies()
+            state = await context.storage_state()
+            # Storage left by other origins (iframes): start the next page afresh
+            reusable = not any(origin.get("localStorage") for origin in state.get("origins", []))
+        finally:
+            if not reusable and context is not None:
+                # Failed, timed out, cancelled or left storage behind: don't reuse
+                # a context in an unknown state. Closed in the background, as a
+                # cancelled render can't await
+                task = asyncio.ensure_future(self._discard(context))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+                context = None
+            # Slots of a relaunched browser's old queue are simply dropped
+            contexts.put_nowait(context)
+        return result
+
+    @staticmethod
+    async def _discard(context) -> None:
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    async def _load(page, url: str) -> Dict:
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+        # Initial load, then wait for hydration/data fetching to quiet down;
+        # pages that poll or stream never go network-idle, so that wait is capped
+        response = await page.goto(url, wait_until="domcontentloaded")
+        try:
+            await page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_LIMIT_MS)
+        except PlaywrightTimeoutError:
+            pass
+        await page.evaluate(DOM_SETTLED_JS, [DOM_QUIET_MS, DOM_SETTLE_LIMIT_MS])
+        # Scroll to trigger lazy content, then wait for it to render
+        await page.evaluate("window.scrollTo(0, document.body ? document.body.scrollHeight : 0)")
+        await page.evaluate(DOM_SETTLED_JS, [DOM_QUIET_MS, DOM_SETTLE_LIMIT_MS])
+        content = await page.content()
+        body_text = await page.evaluate("document.body ? document.body.innerText : ''") or ""
+        return {
+            "status": response.status if response else 200,
+            "headers": {"Content-Type": "text/html; charset=utf-8"},
+            "content": content,
+            "body_text": body_text,
+            "final_url": page.url,
+        }
+
+
+class PlaywrightFetcher:
+    def __init__(self, timeout_ms: int = 20000, max_contexts: int = None):
+        self.timeout_ms = timeout_ms
+        self.max_contexts = max_contexts if max_contexts is not None else settings.crawler_js_max_contexts
 
     def fetch(self, url: str) -> Dict:
         try:
-            from playwright.sync_api import sync_playwright
+            import playwright.async_api  # noqa: F401
         except Exception as e:
             raise RuntimeError(
                 "Playwright is not installed. Install with `pip install playwright` and run `playwright install`."
             ) from e
 
-        # Ensure browsers are installed before attempting to use them
-        self._ensure_browsers_installed()
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            # Use a realistic desktop user-agent for Next.js sites
-            ua = (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            )
-            context = browser.new_context(user_agent=ua, viewport={"width": 1366, "height": 900})
-            page = context.new_page()
-            page.set_default_timeout(self.timeout_ms)
-            try:
-                # Step 1: initial load
-                page.goto(url, wait_until="domcontentloaded")
-                # Step 2: wait for network to be idle (hydration, data fetching)
-                page.wait_for_load_state("networkidle")
-                # Step 3: ensure body is visible
-                page.wait_for_selector("body", state="visible")
-                # Small post-hydration delay for late scripts/components
-                page.wait_for_timeout(1200)
-                # Optionally scroll to trigger lazy content
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(400)
-                content = page.content()
-                body_text = page.evaluate("document.body.innerText") or ""
-                final_url = page.url
-            finally:
-                browser.close()
-
-            headers = {"Content-Type": "text/html; charset=utf-8"}
-            return {
-                "status": 200,
-                "headers": headers,
-                "content": content,
-                "body_text": body_text,
-                "final_url": final_url,
-            }
-
-
+        return _get_pool(self.max_contexts).render(url, self.timeout_ms)
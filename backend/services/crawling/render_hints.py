@@ -0,0 +1,167 @@
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+import json
+import re
+import threading
+import time
+
+# Mount points client-side frameworks render into
+APP_ROOT_IDS = {"root", "app", "__next", "__nuxt", "___gatsby", "svelte", "q-app"}
+APP_ROOT_ATTRIBUTES = ("ng-app", "ng-version", "data-reactroot", "data-v-app")
+
+# <script> ids/types carrying a server-rendered page's data as JSON
+SSR_JSON_SCRIPT_IDS = {"__NEXT_DATA__", "__NUXT_DATA__"}
+# window.__INITIAL_STATE__ = {...}; (Redux, Apollo and similar hydration state)
+WINDOW_STATE = re.compile(r"^\s*window\.(__[A-Za-z_]+__)\s*=\s*(.+?);?\s*$", re.DOTALL)
+
+# Next.js bookkeeping, not page content
+SKIP_KEYS = {
+    "buildId", "runtimeConfig", "query", "locale", "locales", "defaultLocale",
+    "scriptLoader", "dynamicIds", "assetPrefix", "isFallback", "gssp", "gsp",
+    "appGip", "__N_SSG", "__N_SSP", "@context", "@id", "url", "image", "logo",
+}
+MIN_PROSE_CHARS = 20
+MAX_SSR_STRINGS = 5000
+
+NOSCRIPT_HINT = re.compile(r"(enable|requires?|need|turn on)\W+(\w+\W+){0,3}javascript", re.IGNORECASE)
+
+
+class PageHints(NamedTuple):
+    # Why the page looks client-rendered, or None
+    js_reason: Optional[str]
+    # Text found in server-rendered JSON payloads ("" if none)
+    ssr_text: str
+
+
+def inspect_page(html: str) -> PageHints:
+    """Look at a page whose extracted text came out short (one lxml parse)"""
+    try:
+        import lxml.html
+        root = lxml.html.fromstring(html)
+    except Exception:
+        return PageHints(None, "")
+    return PageHints(_js_reason(root), _ssr_text(root))
+
+
+def _js_reason(root) -> Optional[str]:
+    for element in root.iter("div", "main", "app-root", "body"):
+        marked = element.get("id") in APP_ROOT_IDS or any(
+            element.get(attribute) is not None for attribute in APP_ROOT_ATTRIBUTES
+        )
+        if marked and not element.text_content().strip():
+            return f"empty app root <{element.tag} id={element.get('id')!r}>"
+    for noscript in root.iter("noscript"):
+        if NOSCRIPT_HINT.search(noscript.text_content()):
+            return "noscript asks for JavaScript"
+    return None
+
+
+def _ssr_text(root) -> str:
+    payloads = []
+    for script in root.iter("script"):
+        body = script.text or ""
+        if not body.strip():
+            continue
+        script_type = (script.get("type") or "").lower()
+        try:
+            if script.get("id") in SSR_JSON_SCRIPT_IDS or script_type == "application/ld+json":
+                data = json.loads(body)
+                if script.get("id") == "__NEXT_DATA__" and isinstance(data, dict):
+                    props = data.get("props") or {}
+                    data = props.get("pageProps", props)
+                payloads.append(data)
+            elif not script_type or "javascript" in script_type:
+                match = WINDOW_STATE.match(body)
+                if match:
+                    payloads.append(json.loads(match.group(2)))
+        except (ValueError, TypeError):
+            continue
+
+    strings: List[str] = []
+    seen = set()
+    for payload in payloads:
+        _collect_prose(payload, strings, seen, 0)
+    return "\n".join(strings)
+
+
+def _collect_prose(value, out: List[str], seen: set, depth: int) -> None:
+    """Prose-like strings of a JSON value, in document order"""
+    if depth > 50 or len(out) >= MAX_SSR_STRINGS:
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key not in SKIP_KEYS:
+                _collect_prose(item, out, seen, depth + 1)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_prose(item, out, seen, depth + 1)
+    elif isinstance(value, str):
+        text = value.strip()
+        if "<" in text and ">" in text:
+            # Rich-text fields (CMS bodies) are often HTML
+            try:
+                import lxml.html
+                text = lxml.html.fromstring(text).text_content().strip()
+            except Exception:
+                return
+        if (
+            len(text) >= MIN_PROSE_CHARS and " " in text
+            and not text.startswith(("http://", "https://", "/", "{", "["))
+            and text not in seen
+        ):
+            seen.add(text)
+            out.append(text)
+
+
+class RenderMemory:
+    """
+    Per-host record of whether JS rendering produced a usable page.
+
+    Shared by every crawl in the process (most sites render all their pages
+    the same way), bounded to the most recently used hosts. A host's record
+    is started over `ttl_seconds` after its first render, so one bad run
+    doesn't settle it for good. Only completed renders are recorded: a
+    render that failed or timed out says nothing about the page.
+    """
+
+    # Renders on a host before its record is trusted
+    MIN_ATTEMPTS = 3
+
+    def __init__(self, max_hosts: int = 10000, ttl_seconds: float = 6 * 3600):
+        self.max_hosts = max_hosts
+        self.ttl_seconds = ttl_seconds
+        # host -> [attempts, helps, expires_at]
+        self._hosts: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, host: str) -> List[float]:
+        entry = self._hosts.pop(host, None)
+        if entry is None or entry[2] <= time.monotonic():
+            entry = [0, 0, time.monotonic() + self.ttl_seconds]
+        return entry
+
+    def record(self, host: str, helped: bool) -> None:
+        with self._lock:
+            entry = self._entry(host)
+            entry[0] += 1
+            entry[1] += int(helped)
+            self._hosts[host] = entry
+            while len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+
+    def verdict(self, host: str) -> Optional[bool]:
+        """
+        True if rendering usually helps on this host, False if it never has
+        (after MIN_ATTEMPTS renders), None if unknown or it only sometimes helps
+        """
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None or entry[2] <= time.monotonic():
+                return None
+            attempts, helps = entry[0], entry[1]
+        if helps == 0:
+            return False if attempts >= self.MIN_ATTEMPTS else None
+        return True if helps * 2 >= attempts else None
+
+
+render_memory = RenderMemory()
@@ -1,7 +1,29 @@
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import threading
+import time
 import urllib.robotparser as robotparser
 from urllib.parse import urljoin, urlparse
 
 from services.crawling.base import RobotsPolicy
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Product token matched against robots.txt User-agent lines
+ROBOTS_AGENT = "ConvotCrawler"
+# RFC 9309: crawlers must parse at least the first 500 KiB
+MAX_ROBOTS_BYTES = 512 * 1024
+# An unreachable (or 5xx) robots.txt is retried after this long
+ERROR_TTL_SECONDS = 300
+# Longer Crawl-delays would stall a crawl; they are honoured up to this
+MAX_CRAWL_DELAY_SECONDS = 30.0
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}".lower()
 
 
 class SimpleRobots(RobotsPolicy):
@@ -9,14 +31,54 @@ class SimpleRobots(RobotsPolicy):
         parsed = urlparse(start_url)
         robots_url = urljoin(f"{parsed.scheme}://{parsed.netloc}", "/robots.txt")
         self.rp = robotparser.RobotFileParser()
+        self.unreachable = False
         try:
             self.rp.set_url(robots_url)
             self.rp.read()
         except Exception:
             # If robots can't be fetched, default allow
             self.rp = None
+            self.unreachable = True
 
-    def allowed(self, url: str, user_agent: str = "*") -> bool:
+    @classmethod
+    def from_response(cls, status: Optional[int], text: str = "") -> "SimpleRobots":
+        """
+        Rules from an already fetched robots.txt (status None: unreachable).
+
+        401/403 disallow everything and other 4xx allow everything, as in
+        RobotFileParser.read. A 5xx or unreachable robots.txt disallows
+        everything (RFC 9309) until it is fetched again.
+        """
+        robots = cls.__new__(cls)
+        robots.rp = robotparser.RobotFileParser()
+        robots.unreachable = status is None or status >= 500
+        if robots.unreachable:
+            robots.rp.disallow_all = True
+        elif status in (401, 403):
+            robots.rp.disallow_all = True
+        elif status >= 400:
+            robots.rp.allow_all = True
+        else:
+            robots.rp.parse(text.splitlines())
+        return robots
+
+    def sitemaps(self) -> List[str]:
+        """Sitemap URLs listed in robots.txt"""
+        if not self.rp:
+            return []
+        return list(self.rp.site_maps() or [])
+
+    def crawl_delay(self, user_agent: str = ROBOTS_AGENT) -> Optional[float]:
+        """Crawl-delay (seconds) for the user agent, if robots.txt sets one"""
+        if not self.rp:
+            return None
+        try:
+            delay = self.rp.crawl_delay(user_agent)
+            return float(delay) if delay is not None else None
+        except Exception:
+            return None
+
+    def allowed(self, url: str, user_agent: str = ROBOTS_AGENT) -> bool:
         if not self.rp:
             return True
         try:
@@ -25,3 +87,79 @@ class SimpleRobots(RobotsPolicy):
             return True
 
 
+class RobotsCache:
+    """
+    Parsed robots.txt per scheme+host, kept for `ttl_seconds`.
+
+    Shared by every crawl in the process: a site crawl's workers ask for a
+    host's rules concurrently and the file is fetched once (through the
+    crawl's pooled client); later crawls reuse it until it expires.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, SimpleRobots]] = {}
+        self._lock = threading.Lock()
+        # Fetches in progress, by origin (futures of the crawl's event loop)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _cached(self, origin: str) -> Optional[SimpleRobots]:
+        with self._lock:
+            entry = self._entries.get(origin)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            self._entries.pop(origin, None)
+            return None
+
+    def _store(self, origin: str, robots: SimpleRobots) -> None:
+        ttl = min(self.ttl_seconds, ERROR_TTL_SECONDS) if robots.unreachable else self.ttl_seconds
+        with self._lock:
+            self._entries[origin] = (time.monotonic() + ttl, robots)
+
+    def get_sync(self, url: str) -> SimpleRobots:
+        """Rules for a URL's host, fetched with urllib on a cache miss (single-page crawls)"""
+        origin = _origin(url)
+        robots = self._cached(origin)
+        if robots is None:
+            robots = SimpleRobots(url)
+            self._store(origin, robots)
+        return robots
+
+    async def get(self, url: str, fetcher) -> SimpleRobots:
+        """Rules for a URL's host; concurrent misses for one host share a single fetch"""
+        origin = _origin(url)
+        robots = self._cached(origin)
+        if robots is not None:
+            return robots
+
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.get(origin)
+        if pending is not None and pending.get_loop() is loop:
+            return await asyncio.shield(pending)
+
+        future = loop.create_future()
+        self._inflight[origin] = future
+        try:
+            robots = await self._fetch(origin, fetcher)
+            self._store(origin, robots)
+            future.set_result(robots)
+            return robots
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            if self._inflight.get(origin) is future:
+                del self._inflight[origin]
+
+    @staticmethod
+    async def _fetch(origin: str, fetcher) -> SimpleRobots:
+        robots_url = origin + "/robots.txt"
+        try:
+            resp = await fetcher.fetch_bytes(robots_url, max_bytes=MAX_ROBOTS_BYTES)
+        except Exception as e:
+            logger.debug(f"robots.txt unreachable: url={robots_url}, error={str(e)}")
+            return SimpleRobots.from_response(None)
+        return SimpleRobots.from_response(resp["status"], resp["body"].decode("utf-8", errors="replace"))
+
+
+robots_cache = RobotsCache(settings.crawler_robots_ttl_seconds)
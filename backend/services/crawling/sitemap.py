@@ -0,0 +1,133 @@
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+import asyncio
+import io
+import logging
+import zlib
+
+from services.crawling.url_utils import is_crawlable, normalize_url
+
+logger = logging.getLogger(__name__)
+
+# sitemaps.org limits: 50,000 URLs and 50 MB (uncompressed) per file
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+
+class SitemapEntry(NamedTuple):
+    url: str
+    lastmod: Optional[datetime]
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """W3C datetime ("2024-05-01", "2024-05-01T10:00:00Z", ...) as an aware datetime"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def decompress_sitemap(data: bytes) -> bytes:
+    """Gunzip `.xml.gz` sitemaps (sniffed by magic bytes), capped at MAX_SITEMAP_BYTES"""
+    if not data.startswith(b"\x1f\x8b"):
+        return data[:MAX_SITEMAP_BYTES]
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    return inflater.decompress(data, MAX_SITEMAP_BYTES)
+
+
+def parse_sitemap(data: bytes, base_url: str) -> Tuple[List[SitemapEntry], List[str]]:
+    """
+    Parse a sitemap or sitemap index.
+
+    Returns:
+        (page entries, child sitemap URLs); a sitemap index has only children
+    """
+    from lxml import etree
+
+    entries: List[SitemapEntry] = []
+    children: List[str] = []
+    # Stream the document; entity resolution and network access stay off
+    events = etree.iterparse(
+        io.BytesIO(decompress_sitemap(data)),
+        events=("end",),
+        tag=("{*}url", "{*}sitemap"),
+        resolve_entities=False,
+        no_network=True,
+        recover=True,
+    )
+    for _, element in events:
+        loc = element.findtext("{*}loc")
+        if loc and loc.strip():
+            url = normalize_url(base_url, loc.strip())
+            if etree.QName(element).localname == "sitemap":
+                children.append(url)
+            else:
+                entries.append(SitemapEntry(url, parse_lastmod(element.findtext("{*}lastmod"))))
+        element.clear()
+    return entries, children
+
+
+class SitemapReader:
+    """
+    Discovers a site's pages from its sitemaps.
+
+    Sitemaps are taken from robots.txt `Sitemap:` lines, falling back to
+    /sitemap.xml; sitemap indexes are followed breadth-first.
+    """
+
+    def __init__(self, fetch_bytes: Callable[[str], Awaitable[dict]], max_files: int):
+        """
+        Args:
+            fetch_bytes: Async fetch of a URL as {status, body(bytes), final_url}
+            max_files: Maximum number of sitemap files read per site
+        """
+        self.fetch_bytes = fetch_bytes
+        self.max_files = max_files
+
+    async def discover(self, start_url: str, robots_sitemaps: Optional[List[str]] = None) -> List[SitemapEntry]:
+        """
+        Pages listed in the site's sitemaps under start_url's path, in sitemap order.
+
+        Sitemaps usually cover a whole host; only pages in the start URL's
+        directory are returned, so crawling /docs/ doesn't pull in the blog.
+        """
+        parsed = urlparse(start_url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+        scope = root + parsed.path[: parsed.path.rfind("/") + 1]
+        pending = list(robots_sitemaps or []) or [urljoin(root, "/sitemap.xml")]
+        seen = set()
+        entries: List[SitemapEntry] = []
+        seen_pages = set()
+
+        while pending and len(seen) < self.max_files:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+            try:
+                resp = await self.fetch_bytes(sitemap_url)
+                if resp["status"] >= 400:
+                    logger.debug(f"Sitemap unavailable: url={sitemap_url}, status={resp['status']}")
+                    continue
+                pages, children = await asyncio.to_thread(
+                    parse_sitemap, resp["body"], resp.get("final_url", sitemap_url)
+                )
+            except Exception as e:
+                logger.warning(f"Sitemap skipped: url={sitemap_url}, error={str(e)}")
+                continue
+            pending.extend(children)
+            for entry in pages:
+                if entry.url.startswith(scope) and is_crawlable(entry.url) and entry.url not in seen_pages:
+                    seen_pages.add(entry.url)
+                    entries.append(entry)
+
+        if entries:
+            logger.info(f"Sitemaps read: start_url={start_url}, files={len(seen)}, pages={len(entries)}")
+        return entries
@@ -1,13 +1,29 @@
+from typing import List
 from urllib.parse import urlparse, urljoin, urlunparse
+import os
+
+# Links to these are never crawled as pages
+NON_HTML_EXTENSIONS = {
+    ".pdf", ".zip", ".gz", ".tar", ".rar", ".7z", ".exe", ".dmg", ".apk",
+    ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".bmp",
+    ".mp3", ".mp4", ".avi", ".mov", ".webm", ".wav", ".ogg",
+    ".css", ".js", ".json", ".xml", ".rss", ".woff", ".woff2", ".ttf", ".eot",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".csv",
+}
 
 
 def normalize_url(base: str, href: str) -> str:
     if not href:
         return base
-    joined = urljoin(base, href)
+    joined = urljoin(base, href.strip())
     parsed = urlparse(joined)
-    # drop fragments, normalize scheme/host
-    cleaned = parsed._replace(fragment="")
+    # drop fragments, normalize scheme/host (paths and queries are case-sensitive)
+    cleaned = parsed._replace(
+        scheme=parsed.scheme.lower(),
+        netloc=parsed.netloc.lower(),
+        path=parsed.path or "/",
+        fragment="",
+    )
     # optional: enforce https if present
     return urlunparse(cleaned)
 
@@ -18,3 +34,41 @@ def same_domain(u1: str, u2: str) -> bool:
     return p1.netloc.lower() == p2.netloc.lower()
 
 
+def is_crawlable(url: str) -> bool:
+    """http(s) URL that doesn't point at a known non-HTML file"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        return False
+    return os.path.splitext(parsed.path)[1].lower() not in NON_HTML_EXTENSIONS
+
+
+def extract_links(base_url: str, html: str) -> List[str]:
+    """
+    Normalized, crawlable <a href> targets of a page, in document order.
+
+    Honours <base href>; links marked rel="nofollow" are skipped.
+    """
+    try:
+        import lxml.html
+        root = lxml.html.fromstring(html)
+    except Exception:
+        return []
+    return extract_tree_links(base_url, root)
+
+
+def extract_tree_links(base_url: str, root) -> List[str]:
+    """extract_links for an already parsed lxml.html document"""
+    base_hrefs = root.xpath("//base/@href")
+    if base_hrefs:
+        base_url = urljoin(base_url, base_hrefs[0])
+
+    links: List[str] = []
+    seen = set()
+    for anchor in root.xpath("//a[@href]"):
+        if "nofollow" in (anchor.get("rel") or "").lower():
+            continue
+        url = normalize_url(base_url, anchor.get("href"))
+        if url not in seen and is_crawlable(url):
+            seen.add(url)
+            links.append(url)
+    return links
@@ -1,4 +1,5 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+import hashlib
 import logging
 from uuid import UUID
 
@@ -6,11 +7,18 @@ from services.embeddings.base import EmbeddingProvider, TransientEmbeddingError,
 from config.settings import settings
 from services.embeddings.openai_provider import OpenAIEmbeddingProvider
 from services.embeddings.gemini_provider import GeminiEmbeddingProvider
+from services.embeddings.local_provider import LocalEmbeddingProvider
 from repositories.chunk_repo import ChunkRepository
+from repositories.embedding_cache_repo import EmbeddingCacheRepository
 
 logger = logging.getLogger(__name__)
 
 
+def content_hash(text: str) -> str:
+    """Content address of a chunk text (sha256 hex digest)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
 class EmbeddingService:
     def __init__(
         self,
@@ -18,12 +26,16 @@ class EmbeddingService:
         preferred: str = settings.embedding_preferred,
         openai_model: str = settings.openai_embedding_model,
         gemini_model: str = settings.gemini_embedding_model,
+        local_model: str = settings.local_embedding_model,
         embedding_dimension: int = settings.embedding_dimension,
         batch_size: int = settings.embedding_batch_size,
+        use_cache: bool = settings.embedding_cache_enabled,
+        fallback: bool = True,
     ):
         self.access_token = access_token
         self.batch_size = batch_size
         self.embedding_dimension = embedding_dimension
+        self.use_cache = use_cache
 
         self.providers: List[EmbeddingProvider] = []
         # Preferred-first provider order
@@ -37,8 +49,28 @@ class EmbeddingService:
                 GeminiEmbeddingProvider(model=gemini_model, target_dimension=embedding_dimension),
                 OpenAIEmbeddingProvider(model=openai_model),
             ]
+        # Local CPU model is opt-in (needs a model on disk). Its vectors aren't
+        # comparable with remote ones, so it never falls back to them
+        if preferred == "local":
+            fallback = False
+            self.providers.insert(
+                0,
+                LocalEmbeddingProvider(
+                    model=local_model,
+                    model_dir=settings.local_embedding_model_path,
+                    target_dimension=embedding_dimension,
+                    workers=settings.local_embedding_workers,
+                    batch_size=settings.local_embedding_batch_size,
+                    max_length=settings.local_embedding_max_length,
+                ),
+            )
+
+        # Without fallback every vector comes from the preferred provider (one embedding space)
+        if not fallback:
+            self.providers = self.providers[:1]
 
         self.repository = ChunkRepository(access_token=access_token)
+        self.cache_repo = EmbeddingCacheRepository() if use_cache else None
 
     def _select_provider(self) -> List[EmbeddingProvider]:
         return self.providers
@@ -47,14 +79,7 @@ class EmbeddingService:
         last_error: Optional[Exception] = None
         for provider in self._select_provider():
             try:
-                vectors = provider.embed_texts(texts, user=user)
-                # dimension guard
-                if any(len(v) != self.embedding_dimension for v in vectors):
-                    logger.warning(
-                        f"Provider {provider.name}:{provider.model} returned mismatched dimension; conforming"
-                    )
-                    vectors = [v[: self.embedding_dimension] for v in vectors]
-                return vectors, provider.name
+                return self._embed_with(provider, texts, user=user), provider.name
             except FatalEmbeddingError as e:
                 logger.error(f"Fatal error from {provider.name} embeddings: {e}")
                 last_error = e
@@ -70,6 +95,74 @@ class EmbeddingService:
                 continue
         raise TransientEmbeddingError(str(last_error) if last_error else "Embedding failed")
 
+    def _embed_with(self, provider: EmbeddingProvider, texts: List[str], user: Optional[str] = None) -> List[List[float]]:
+        vectors = provider.embed_texts(texts, user=user)
+        # dimension guard
+        if any(len(v) != self.embedding_dimension for v in vectors):
+            logger.warning(
+                f"Provider {provider.name}:{provider.model} returned mismatched dimension; conforming"
+            )
+            vectors = [v[: self.embedding_dimension] for v in vectors]
+        return vectors
+
+    def _embed_with_cache(self, texts: List[str], user: Optional[str] = None) -> Tuple[List[List[float]], str]:
+        """
+        Embed texts, reusing cached vectors for byte-identical texts.
+
+        Lookups use the preferred provider's key; texts that miss (deduplicated
+        within the batch) are embedded with fallback and written back under the
+        provider that actually produced them. If that was a fallback provider,
+        the cache hits are re-embedded with it too, so a batch never mixes
+        embedding spaces (the batch fails if it can't). Cache failures never
+        fail embedding.
+        """
+        if not self.use_cache or self.cache_repo is None:
+            return self._embed_with_fallback(texts, user=user)
+
+        hashes = [content_hash(t) for t in texts]
+        primary = self.providers[0]
+        try:
+            vectors_by_hash: Dict[str, List[float]] = self.cache_repo.get_embeddings(
+                hashes, primary.name, primary.model, self.embedding_dimension
+            )
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup skipped: {e}")
+            vectors_by_hash = {}
+
+        missing: Dict[str, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in vectors_by_hash and h not in missing:
+                missing[h] = t
+
+        provider_used = primary.name
+        if missing:
+            vectors, provider_used = self._embed_with_fallback(list(missing.values()), user=user)
+            fresh = dict(zip(missing.keys(), vectors))
+            provider = next(p for p in self.providers if p.name == provider_used)
+            if provider is not primary and vectors_by_hash:
+                hits = {h: t for h, t in zip(hashes, texts) if h not in fresh}
+                logger.warning(
+                    f"Embedding fell back to {provider.name}; re-embedding {len(hits)} cached texts with it"
+                )
+                fresh.update(zip(hits.keys(), self._embed_with(provider, list(hits.values()), user=user)))
+                missing.update(hits)
+                vectors_by_hash = {}
+            try:
+                self.cache_repo.upsert_embeddings(fresh, provider.name, provider.model, self.embedding_dimension)
+            except Exception as e:
+                logger.warning(f"Embedding cache write skipped: {e}")
+            vectors_by_hash.update(fresh)
+
+        logger.debug(
+            f"Embedding cache: texts={len(texts)}, hits={len(texts) - len(missing)}, embedded={len(missing)}"
+        )
+        return [vectors_by_hash[h] for h in hashes], provider_used
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts (through the cache when enabled); one vector per text"""
+        vectors, _ = self._embed_with_cache(texts)
+        return vectors
+
     def embed_chunks_for_source(self, source_id: UUID, texts: List[str], chunk_ids: List[UUID]) -> int:
         if not texts or not chunk_ids or len(texts) != len(chunk_ids):
             logger.warning("embed_chunks_for_source called with invalid inputs")
@@ -88,7 +181,7 @@ class EmbeddingService:
                 f"Processing batch {batch_num}/{total_batches} for source {source_id}: size={len(batch_texts)}"
             )
 
-            vectors, provider_used = self._embed_with_fallback(batch_texts)
+            vectors, provider_used = self._embed_with_cache(batch_texts)
             logger.debug(
                 f"Embedded batch {batch_num}/{total_batches} (size={len(batch_texts)}) using provider {provider_used}"
             )
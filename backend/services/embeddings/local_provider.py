@@ -0,0 +1,176 @@
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from services.embeddings.base import (
+    EmbeddingProvider,
+    TransientEmbeddingError,
+    FatalEmbeddingError,
+)
+
+logger = logging.getLogger(__name__)
+
+# Native output size of common ONNX sentence-embedding exports
+_KNOWN_DIMENSIONS = {
+    "all-MiniLM-L6-v2": 384,
+    "all-MiniLM-L12-v2": 384,
+    "bge-small-en-v1.5": 384,
+    "bge-base-en-v1.5": 768,
+    "e5-small-v2": 384,
+    "e5-base-v2": 768,
+}
+
+# Per-process model state. In pool workers it is loaded once by the initializer;
+# in the API process it is only loaded when running with workers=0.
+_session = None
+_tokenizer = None
+_max_length = 256
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _load_model(model_dir: str, max_length: int) -> None:
+    global _session, _tokenizer, _max_length
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+
+    options = ort.SessionOptions()
+    # Parallelism comes from the process pool; keep each session single-threaded
+    options.intra_op_num_threads = 1
+    options.inter_op_num_threads = 1
+    _session = ort.InferenceSession(
+        os.path.join(model_dir, "model.onnx"),
+        sess_options=options,
+        providers=["CPUExecutionProvider"],
+    )
+    tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+    tokenizer.enable_truncation(max_length=max_length)
+    tokenizer.enable_padding()
+    _tokenizer = tokenizer
+    _max_length = max_length
+
+
+def _embed_batch(texts: List[str]) -> List[List[float]]:
+    """Mean-pooled, L2-normalized sentence embeddings for one batch (runs in a worker)."""
+    import numpy as np
+
+    encodings = _tokenizer.encode_batch(texts)
+    input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+    attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+    feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+    input_names = {i.name for i in _session.get_inputs()}
+    if "token_type_ids" in input_names:
+        feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+    token_embeddings = _session.run(None, feeds)[0]
+    mask = attention_mask[..., None].astype(np.float32)
+    pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    pooled = pooled / np.clip(norms, 1e-12, None)
+    return pooled.astype(np.float32).tolist()
+
+
+def _get_pool(model_dir: str, max_length: int, workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_load_model,
+                initargs=(model_dir, max_length),
+            )
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+            logger.info(f"Local embedding pool started: workers={workers}, model_dir={model_dir}")
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    CPU embedding provider backed by an ONNX sentence-embedding export.
+
+    `model_dir` must contain `model.onnx` and a HuggingFace `tokenizer.json`.
+    Batches are spread across a shared process pool; `workers=0` runs inference
+    in the calling process. Vectors are zero-padded to `target_dimension`, which
+    keeps cosine similarity unchanged while fitting the `vector(1536)` column.
+    """
+
+    def __init__(
+        self,
+        model: str = "all-MiniLM-L6-v2",
+        model_dir: Optional[str] = None,
+        target_dimension: int = 1536,
+        workers: int = 2,
+        batch_size: int = 32,
+        max_length: int = 256,
+    ):
+        self._model = model
+        self._model_dir = model_dir
+        self._target_dimension = target_dimension
+        self._native_dimension = _KNOWN_DIMENSIONS.get(model, target_dimension)
+        self._workers = max(0, workers)
+        self._batch_size = max(1, batch_size)
+        self._max_length = max_length
+
+    @property
+    def name(self) -> str:
+        return "local"
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        return self._native_dimension
+
+    def _conform_dimension(self, vec: List[float]) -> List[float]:
+        if len(vec) >= self._target_dimension:
+            return vec[: self._target_dimension]
+        return vec + [0.0] * (self._target_dimension - len(vec))
+
+    def embed_texts(self, texts: List[str], *, user: Optional[str] = None) -> List[List[float]]:
+        if not self._model_dir or not os.path.isfile(os.path.join(self._model_dir, "model.onnx")):
+            raise FatalEmbeddingError("Missing LOCAL_EMBEDDING_MODEL_PATH (directory with model.onnx and tokenizer.json)")
+        try:
+            import onnxruntime  # noqa: F401
+            import tokenizers  # noqa: F401
+            import numpy  # noqa: F401
+        except Exception as e:
+            raise FatalEmbeddingError(f"Local embedding runtime not available (onnxruntime, tokenizers, numpy): {e}")
+
+        if not texts:
+            return []
+
+        batches = [texts[i : i + self._batch_size] for i in range(0, len(texts), self._batch_size)]
+        try:
+            if self._workers == 0:
+                if _session is None:
+                    _load_model(self._model_dir, self._max_length)
+                results = [_embed_batch(b) for b in batches]
+            else:
+                pool = _get_pool(self._model_dir, self._max_length, self._workers)
+                results = list(pool.map(_embed_batch, batches))
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM); start a fresh pool on the next call
+            _reset_pool()
+            raise TransientEmbeddingError(f"Local embedding worker crashed: {e}")
+        except Exception as e:
+            message = str(e).lower()
+            if any(t in message for t in ["no such file", "invalid", "protobuf", "load model"]):
+                raise FatalEmbeddingError(str(e))
+            raise TransientEmbeddingError(str(e))
+
+        return [self._conform_dimension(vec) for batch in results for vec in batch]
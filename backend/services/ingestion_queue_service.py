@@ -0,0 +1,265 @@
+"""
+Ingestion Queue Service
+
+Durable job queue for source ingestion (parse, chunk, embed, crawl). The API
+only enqueues a job; worker processes (backend/worker.py) claim jobs from the
+`ingestion_jobs` table with SELECT ... FOR UPDATE SKIP LOCKED, so heavy work
+never runs inside API workers and survives restarts. Failed jobs are retried
+with exponential backoff and resume from the source's ingestion checkpoint;
+a job whose worker dies is reclaimed once its lease expires.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import logging
+import os
+import random
+import socket
+import threading
+
+from config.settings import settings
+from models.source_model import SourceStatus
+from repositories.ingestion_job_repo import IngestionJobRepository
+from repositories.source_repo import SourceRepository
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionQueueService:
+    """
+    Service for enqueueing ingestion jobs.
+
+    Usage:
+        queue = IngestionQueueService()
+        queue.enqueue(source_id, bot_id)
+    """
+
+    def __init__(self, max_attempts: int = settings.ingest_job_max_attempts):
+        """
+        Args:
+            max_attempts: Attempts per job before the source stays failed
+        """
+        self.max_attempts = max_attempts
+        self.repository = IngestionJobRepository()
+
+    def enqueue(self, source_id: UUID, bot_id: UUID) -> Dict[str, Any]:
+        """
+        Queue a source for ingestion.
+
+        Raises:
+            ValidationError: If the source already has a queued or running job
+            DatabaseError: If the job can't be created
+        """
+        job = self.repository.enqueue(source_id, bot_id, self.max_attempts)
+        logger.info(f"Ingestion queued: job_id={job.get('id')}, source_id={source_id}, bot_id={bot_id}")
+        return job
+
+    def is_queued(self, source_id: UUID) -> bool:
+        """Whether a source has a queued or running job"""
+        return self.repository.has_active_job(source_id)
+
+
+class IngestionWorker:
+    """
+    Claims and runs ingestion jobs until stopped.
+
+    Each worker process runs `concurrency` job slots (threads); run more
+    processes to scale out. Parsing and chunking already fan CPU work out to
+    their own process pools, so threads are enough to keep a host busy.
+    Workers also queue scheduled refresh crawls of URL sources.
+
+    Usage:
+        worker = IngestionWorker(concurrency=2)
+        worker.run()  # blocks; call worker.stop() from a signal handler
+    """
+
+    def __init__(
+        self,
+        concurrency: int = settings.ingest_worker_concurrency,
+        poll_interval: float = settings.ingest_job_poll_interval_seconds,
+        lease_seconds: int = settings.ingest_job_lease_seconds,
+        max_running_per_bot: int = settings.ingest_max_running_per_bot,
+        backoff_base: float = settings.ingest_job_backoff_base_seconds,
+        backoff_max: float = settings.ingest_job_backoff_max_seconds,
+    ):
+        """
+        Args:
+            concurrency: Jobs run at once by this process
+            poll_interval: Seconds to sleep when the queue is empty
+            lease_seconds: Job lease; renewed every lease_seconds / 3 while running
+            max_running_per_bot: Jobs of one bot running at once across all workers
+            backoff_base: Delay before the first retry (doubles per attempt)
+            backoff_max: Upper bound for the retry delay
+        """
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_running_per_bot = max_running_per_bot
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.refresh_interval_seconds = int(settings.crawler_refresh_interval_hours * 3600)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.repository = IngestionJobRepository()
+        self._stop = threading.Event()
+
+    def run(self) -> None:
+        """Run job slots until stop() is called; running jobs are finished first."""
+        logger.info(f"Ingestion worker started: worker_id={self.worker_id}, concurrency={self.concurrency}")
+        threads: List[threading.Thread] = [
+            threading.Thread(target=self._run_slot, name=f"ingest-{slot}", daemon=True)
+            for slot in range(self.concurrency)
+        ]
+        if self.refresh_interval_seconds > 0:
+            threads.append(threading.Thread(target=self._run_refresh_scheduler, name="ingest-refresh", daemon=True))
+        if settings.crawler_render_js:
+            # Not joined: only gets the browser (and a first-time Chromium install) out of the way
+            threading.Thread(target=self._warm_up_browser, name="browser-warmup", daemon=True).start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        logger.info(f"Ingestion worker stopped: worker_id={self.worker_id}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run_slot(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self.repository.claim(self.worker_id, self.lease_seconds, self.max_running_per_bot)
+            except Exception as e:
+                logger.warning(f"Ingestion job claim failed, backing off: {str(e)}")
+                job = None
+            if job is None:
+                # Jitter keeps idle workers from polling in lockstep
+                self._stop.wait(self.poll_interval * random.uniform(0.5, 1.5))
+                continue
+            self.run_job(job)
+
+    @staticmethod
+    def _warm_up_browser() -> None:
+        """Start the headless browser for JS renders before a crawl needs it"""
+        try:
+            from services.crawling.js_fetcher import warm_up
+            warm_up()
+        except Exception as e:
+            logger.warning(f"Headless browser not started, JS renders will start it: {str(e)}")
+
+    def _run_refresh_scheduler(self) -> None:
+        """Queue refresh crawls for URL sources that are due (safe to run in every worker)"""
+        while True:
+            try:
+                queued = self.repository.enqueue_due_refreshes(
+                    self.refresh_interval_seconds,
+                    settings.ingest_job_max_attempts,
+                )
+                if queued:
+                    logger.info(f"URL refreshes queued: count={queued}")
+            except Exception as e:
+                logger.warning(f"URL refresh scheduling failed: {str(e)}")
+            if self._stop.wait(settings.crawler_refresh_check_seconds):
+                return
+
+    def run_job(self, job: Dict[str, Any]) -> bool:
+        """
+        Run one claimed job and record the outcome.
+
+        Returns:
+            True if the source was indexed
+        """
+        # Imported here so the API process never loads the parsing stack for enqueueing
+        from services.parsing_service import ParsingService
+
+        job_id = job["id"]
+        source_id = UUID(job["source_id"])
+        bot_id = UUID(job["bot_id"])
+        attempt = job.get("attempts") or 1
+        max_attempts = job.get("max_attempts") or 1
+
+        if attempt > max_attempts:
+            # Lease expired on the final attempt (worker crashed mid-job)
+            self.repository.fail(job_id, self.worker_id, job.get("last_error") or "Worker lost during final attempt")
+            self._mark_source_failed(source_id, "Ingestion did not complete")
+            return False
+
+        logger.info(f"Ingestion job started: job_id={job_id}, source_id={source_id}, attempt={attempt}/{max_attempts}")
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, heartbeat_stop), daemon=True)
+        heartbeat.start()
+
+        error: Optional[str] = None
+        try:
+            # Retries resume from the source's ingestion checkpoint
+            parsing_service = ParsingService(use_service_role=True)
+            success = parsing_service.parse_source(source_id, bot_id)
+            if not success:
+                source = parsing_service.source_repo.get_source_by_id(source_id) or {}
+                error = source.get("error_message") or "Ingestion failed"
+        except Exception as e:
+            logger.error(f"Ingestion job error: job_id={job_id}, source_id={source_id}, error={str(e)}", exc_info=True)
+            success = False
+            error = str(e)
+        finally:
+            heartbeat_stop.set()
+            heartbeat.join()
+
+        try:
+            if success:
+                self.repository.complete(job_id, self.worker_id)
+                logger.info(f"Ingestion job succeeded: job_id={job_id}, source_id={source_id}")
+            elif attempt < max_attempts:
+                delay = self._backoff(attempt)
+                self.repository.retry(
+                    job_id,
+                    self.worker_id,
+                    datetime.now(timezone.utc) + timedelta(seconds=delay),
+                    error,
+                )
+                self._mark_source_retrying(source_id, attempt, max_attempts, error)
+                logger.warning(
+                    f"Ingestion job failed, retrying in {delay:.0f}s: job_id={job_id}, "
+                    f"source_id={source_id}, attempt={attempt}/{max_attempts}, error={error}"
+                )
+            else:
+                self.repository.fail(job_id, self.worker_id, error)
+                logger.error(f"Ingestion job failed permanently: job_id={job_id}, source_id={source_id}, error={error}")
+        except Exception as e:
+            # The lease expires and the job is reclaimed
+            logger.error(f"Ingestion job state update failed: job_id={job_id}, error={str(e)}")
+        return success
+
+    def _heartbeat(self, job_id: str, stop: threading.Event) -> None:
+        """Renew the job lease until the job finishes"""
+        interval = max(self.lease_seconds / 3, 1)
+        while not stop.wait(interval):
+            try:
+                self.repository.heartbeat(job_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Ingestion job heartbeat failed: job_id={job_id}, error={str(e)}")
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with jitter: base, 2x base, 4x base, ... capped"""
+        delay = min(self.backoff_base * (2 ** (attempt - 1)), self.backoff_max)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _mark_source_retrying(self, source_id: UUID, attempt: int, max_attempts: int, error: str) -> None:
+        """Show the source as pending again while its retry waits"""
+        try:
+            SourceRepository(use_service_role=True).update_source_status(
+                source_id=source_id,
+                status=SourceStatus.UPLOADED.value,
+                error_message=f"Attempt {attempt}/{max_attempts} failed, retrying: {error}",
+            )
+        except Exception as e:
+            logger.warning(f"Source status update failed: source_id={source_id}, error={str(e)}")
+
+    def _mark_source_failed(self, source_id: UUID, error: str) -> None:
+        try:
+            SourceRepository(use_service_role=True).update_source_status(
+                source_id=source_id,
+                status=SourceStatus.FAILED.value,
+                error_message=error,
+            )
+        except Exception as e:
+            logger.warning(f"Source status update failed: source_id={source_id}, error={str(e)}")
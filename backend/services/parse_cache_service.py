@@ -0,0 +1,219 @@
+"""
+Parse Cache Service
+
+Caches parser output in storage, keyed by the sha256 of the source file, so
+retries, re-indexes and identical uploads (across bots) skip download and
+parsing. Entries are gzip-compressed JSON lines written next to the uploads:
+
+    parsed-cache/{sha[:2]}/{sha}/{parser cache key}-v{version}.jsonl.gz
+
+Each line is {"type": "element", ...}, {"type": "text", "text": ...} (parsers
+without an element stream) or, last, {"type": "metadata", "metadata": {...}}.
+Entries are written and read as streams, so a cached document is never
+materialized in memory on the streaming ingestion path. A sha's folder is
+purged when the last source with that file is deleted.
+"""
+
+from tempfile import SpooledTemporaryFile, TemporaryFile
+from typing import BinaryIO, Iterable, Iterator, Optional
+import gzip
+import hashlib
+import io
+import json
+import logging
+
+from config.settings import settings
+from parsers.base import BaseParser, DocumentElement, ParseResult, join_elements
+from repositories.storage_repo import StorageRepository
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "parsed-cache"
+# Bump when parser output changes so stale entries are ignored
+CACHE_VERSION = 2
+
+
+def file_sha256(file_obj: BinaryIO, block_size: int = 1024 * 1024) -> str:
+    """sha256 hex digest of a seekable file; leaves it positioned at 0."""
+    digest = hashlib.sha256()
+    file_obj.seek(0)
+    for block in iter(lambda: file_obj.read(block_size), b""):
+        digest.update(block)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
+class ParseCacheWriter:
+    """Incrementally writes one cache entry to a temp file, uploaded on commit"""
+
+    def __init__(self, storage: StorageRepository, path: str):
+        self.storage = storage
+        self.path = path
+        self._file = TemporaryFile()
+        self._gzip = gzip.GzipFile(fileobj=self._file, mode="wb")
+        self._records = 0
+        self._closed = False
+
+    def _write(self, record: dict) -> None:
+        self._gzip.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._records += 1
+
+    def add(self, element: DocumentElement) -> None:
+        self._write({
+            "type": "element",
+            "kind": element.kind,
+            "text": element.text,
+            "level": element.level,
+            "page": element.page,
+        })
+
+    def add_text(self, text: str) -> None:
+        self._write({"type": "text", "text": text})
+
+    def tee(self, elements: Iterable[DocumentElement], metadata: dict) -> Iterator[DocumentElement]:
+        """
+        Pass elements through while recording them.
+
+        The entry is committed as soon as the source iterator is exhausted
+        (i.e. parsing finished), even if later ingestion steps fail; it is
+        discarded if iteration stops early.
+        """
+        try:
+            for element in elements:
+                self.add(element)
+                yield element
+            self.commit(metadata)
+        finally:
+            self.discard()
+
+    def commit(self, metadata: dict) -> None:
+        """Finish the entry and upload it; failures are logged, not raised."""
+        if self._closed:
+            return
+        if not self._records:
+            self.discard()
+            return
+        try:
+            self._write({"type": "metadata", "metadata": metadata})
+            self._gzip.close()
+            self._file.seek(0)
+            self.storage.upload(self.path, self._file.read(), "application/gzip", upsert=True)
+            logger.info(f"Parse cache stored: path={self.path}, records={self._records}")
+        except Exception as e:
+            logger.warning(f"Parse cache write failed: path={self.path}, error={str(e)}")
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._gzip.close()
+            self._file.close()
+
+
+class ParseCacheService:
+    """
+    Service for the content-addressed parsed-text cache.
+
+    Usage:
+        cache = ParseCacheService()
+        cached = cache.lookup(sha256, parser)
+        if cached:
+            result = cache.load(cached)
+    """
+
+    def __init__(self, enabled: bool = settings.parse_cache_enabled):
+        self.enabled = enabled
+        self.storage = StorageRepository()
+
+    @staticmethod
+    def cache_path(content_sha256: str, parser: BaseParser) -> str:
+        return (
+            f"{CACHE_PREFIX}/{content_sha256[:2]}/{content_sha256}/"
+            f"{parser.cache_key()}-v{CACHE_VERSION}.jsonl.gz"
+        )
+
+    def lookup(self, content_sha256: Optional[str], parser: BaseParser) -> Optional[SpooledTemporaryFile]:
+        """
+        Fetch a cache entry.
+
+        Returns:
+            Spooled entry file (caller closes it), or None on a miss or error
+        """
+        if not self.enabled or not content_sha256:
+            return None
+        path = self.cache_path(content_sha256, parser)
+        try:
+            return self.storage.download_to_spool(path, missing_ok=True)
+        except Exception as e:
+            logger.warning(f"Parse cache lookup failed: path={path}, error={str(e)}")
+            return None
+
+    def writer(self, content_sha256: Optional[str], parser: BaseParser) -> Optional[ParseCacheWriter]:
+        if not self.enabled or not content_sha256:
+            return None
+        return ParseCacheWriter(self.storage, self.cache_path(content_sha256, parser))
+
+    def purge(self, content_sha256: str) -> int:
+        """
+        Delete every cache entry of a file (all parsers and versions).
+
+        Runs even when the cache is disabled, so entries written earlier
+        don't outlive their sources. Failures are logged, not raised.
+
+        Returns:
+            Number of entries removed
+        """
+        prefix = f"{CACHE_PREFIX}/{content_sha256[:2]}/{content_sha256}"
+        try:
+            removed = self.storage.remove_prefix(prefix)
+        except Exception as e:
+            logger.warning(f"Parse cache purge failed: prefix={prefix}, error={str(e)}")
+            return 0
+        if removed:
+            logger.info(f"Parse cache purged: prefix={prefix}, entries={removed}")
+        return removed
+
+    @staticmethod
+    def _iter_records(entry: BinaryIO) -> Iterator[dict]:
+        entry.seek(0)
+        with gzip.GzipFile(fileobj=entry, mode="rb") as stream:
+            for line in io.TextIOWrapper(stream, encoding="utf-8"):
+                if line.strip():
+                    yield json.loads(line)
+
+    def iter_elements(self, entry: BinaryIO, metadata: Optional[dict] = None) -> Iterator[DocumentElement]:
+        """Stream cached elements (same contract as BaseParser.iter_elements)"""
+        for record in self._iter_records(entry):
+            if record["type"] == "element":
+                yield DocumentElement(record["kind"], record["text"], level=record.get("level"), page=record.get("page"))
+            elif record["type"] == "metadata" and metadata is not None:
+                metadata.update(record.get("metadata") or {})
+
+    def load(self, entry: BinaryIO) -> ParseResult:
+        """Rebuild a full ParseResult from a cache entry"""
+        elements = []
+        texts = []
+        metadata: dict = {}
+        for record in self._iter_records(entry):
+            if record["type"] == "element":
+                elements.append(DocumentElement(record["kind"], record["text"], level=record.get("level"), page=record.get("page")))
+            elif record["type"] == "text":
+                texts.append(record["text"])
+            elif record["type"] == "metadata":
+                metadata = record.get("metadata") or {}
+        if elements:
+            return ParseResult(text=join_elements(elements), metadata=metadata, elements=elements)
+        return ParseResult(text="".join(texts), metadata=metadata)
+
+    def store(self, content_sha256: Optional[str], parser: BaseParser, result: ParseResult) -> None:
+        """Cache a successful ParseResult"""
+        writer = self.writer(content_sha256, parser)
+        if writer is None or not result.success:
+            return
+        if result.elements:
+            for element in result.elements:
+                writer.add(element)
+        else:
+            writer.add_text(result.text)
+        writer.commit(result.metadata)
@@ -6,19 +6,33 @@ Coordinates between parsers, storage, and source repository.
 Handles parsing asynchronously with proper error handling and status updates.
 """
 
-from typing import Optional
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, List, Optional, Union
 from uuid import UUID
 import logging
-from config.supabasedb import get_supabase_client
+from core.exceptions import DatabaseError
+from config.settings import settings
 from parsers.factory import ParserFactory
-from parsers.base import ParseResult
+from parsers.base import DocumentElement, ParseResult
+from repositories.crawled_page_repo import PAGE_STATE_FIELDS, CrawledPageRepository
 from repositories.source_repo import SourceRepository
-from services.chunk_service import ChunkService
-from models.source_model import SourceStatus, SourceType
+from repositories.storage_repo import StorageRepository
+from services.chunk_service import ChunkService, KeepPage, ResumeMismatchError
+from services.chunking_service import TextChunk
+from services.crawling.base import CrawlResult
+from services.embedding_service import content_hash
+from services.parse_cache_service import ParseCacheService, file_sha256
+from models.source_model import FILE_SOURCE_TYPES, IngestStage, SourceStatus, SourceType
 
 logger = logging.getLogger(__name__)
 
 
+class NothingCrawledError(Exception):
+    """A site crawl ended without a single page crawled"""
+
+
 class ParsingService:
     """
     Service for orchestrating document parsing operations.
@@ -29,20 +43,26 @@ class ParsingService:
     - Extracts text and metadata
     - Updates source status
     - Handles errors gracefully
+    - Checkpoints progress (IngestStage plus chunks stored / batches embedded)
+      on the source, so a retry resumes instead of starting over
     """
     
-    def __init__(self, access_token: Optional[str] = None):
+    def __init__(self, access_token: Optional[str] = None, use_service_role: bool = False):
         """
         Initialize parsing service.
         
         Args:
             access_token: User's JWT token for RLS-enabled operations
+            use_service_role: Run without a user token (ingestion workers); the
+                caller is responsible for authorization
         """
         self.access_token = access_token
         self.parser_factory = ParserFactory()
-        self.source_repo = SourceRepository(access_token=access_token)
+        self.source_repo = SourceRepository(access_token=access_token, use_service_role=use_service_role)
         self.chunk_service = ChunkService(access_token=access_token)
-        self.storage_client = get_supabase_client(use_service_role=True)
+        self.page_repo = CrawledPageRepository(access_token=access_token)
+        self.storage = StorageRepository()
+        self.parse_cache = ParseCacheService()
 
     @staticmethod
     def _derive_title_from_url(url: str) -> str:
@@ -97,19 +117,21 @@ class ParsingService:
             source_type = source.get("source_type")
             storage_path = source.get("storage_path")
             mime_type = source.get("mime_type")
+            stage = source.get("ingest_stage")
+            checkpoint = dict(source.get("ingest_checkpoint") or {})
+            
+            if stage in (IngestStage.CHUNKED.value, IngestStage.EMBEDDED.value):
+                # All chunks are stored; only missing embeddings are left
+                logger.info(f"Resuming ingestion at embedding: source_id={source_id}, checkpoint={checkpoint}")
+                return self._embed_pending(source_id, checkpoint)
             
             # Handle file sources
-            if source_type in (SourceType.PDF.value, SourceType.DOCX.value, SourceType.TEXT.value):
+            if source_type in FILE_SOURCE_TYPES:
                 if not storage_path:
                     raise ValueError(f"Storage path missing for source {source_id}")
                 
                 logger.debug(f"Parsing file: source_id={source_id}, type={source_type}, mime_type={mime_type}, path={storage_path}")
                 
-                # Download file from storage
-                file_content = self._download_file(storage_path)
-                file_size = len(file_content)
-                logger.debug(f"File downloaded: source_id={source_id}, size_bytes={file_size}")
-                
                 # Get file extension from storage path
                 file_extension = self._get_file_extension(storage_path)
                 
@@ -123,8 +145,52 @@ class ParsingService:
                 
                 logger.debug(f"Parser selected: source_id={source_id}, parser={parser.get_name()}")
                 
-                # Parse document
-                result: ParseResult = parser.parse(file_content, storage_path)
+                # Parsed-text cache (keyed by file sha256) lets retries and
+                # identical uploads skip download and parsing
+                content_sha256 = source.get("content_sha256")
+                with ExitStack() as stack:
+                    cached = self.parse_cache.lookup(content_sha256, parser)
+                    if cached is None:
+                        # Download file from storage (spooled to disk when large)
+                        file_obj = stack.enter_context(self.storage.download_to_spool(storage_path))
+                        file_size = file_obj.seek(0, 2)
+                        file_obj.seek(0)
+                        logger.debug(f"File downloaded: source_id={source_id}, size_bytes={file_size}")
+                        if not content_sha256:
+                            # Sources uploaded before hashes were recorded
+                            content_sha256 = file_sha256(file_obj)
+                            try:
+                                # Recorded so deleting the source can purge the cache entry
+                                self.source_repo.set_content_sha256(source_id, content_sha256)
+                            except DatabaseError as e:
+                                logger.warning(f"Content hash not recorded: source_id={source_id}, error={str(e)}")
+                            cached = self.parse_cache.lookup(content_sha256, parser)
+                    if cached is not None:
+                        stack.enter_context(cached)
+                        logger.info(f"Parse cache hit: source_id={source_id}, sha256={content_sha256}")
+                        stage = IngestStage.PARSED.value
+                    else:
+                        stage = IngestStage.DOWNLOADED.value
+                    self._checkpoint(source_id, stage, checkpoint)
+                    
+                    if parser.supports_streaming:
+                        metadata: dict = {}
+                        if cached is not None:
+                            elements = self.parse_cache.iter_elements(cached, metadata)
+                        else:
+                            elements = parser.iter_elements(file_obj, metadata)
+                            writer = self.parse_cache.writer(content_sha256, parser)
+                            if writer is not None:
+                                elements = writer.tee(elements, metadata)
+                        return self._ingest_stream(source_id, bot_id, parser, elements, metadata, stage, checkpoint)
+                    
+                    if cached is not None:
+                        result: ParseResult = self.parse_cache.load(cached)
+                    else:
+                        # Parse document
+                        result = parser.parse(file_obj.read(), storage_path)
+                        if result.success:
+                            self.parse_cache.store(content_sha256, parser, result)
                 
                 if not result.success:
                     # Update status to failed
@@ -165,17 +231,20 @@ class ParsingService:
                 if text_length <= 5000:
                     logger.debug(f"Full extracted text for source {source_id}:\n{extracted_text}")
                 
+                self._checkpoint(source_id, IngestStage.PARSED.value, checkpoint)
+                
                 # Chunk the extracted text and store in database
                 logger.debug(f"Chunking started: source_id={source_id}")
                 try:
-                    created_chunks = self.chunk_service.chunk_and_store_source(
-                        source_id=source_id,
-                        bot_id=bot_id,
-                        text=extracted_text,
-                        source_type=SourceType(source_type)
+                    # Diffed against the stored chunks: unchanged chunks keep their embeddings
+                    text_chunks = self.chunk_service.chunk_source_text(
+                        extracted_text,
+                        SourceType(source_type),
+                        result.elements
                     )
+                    sync = self.chunk_service.sync_chunks(source_id, bot_id, text_chunks)
                     
-                    logger.info(f"Chunking completed: source_id={source_id}, chunks={len(created_chunks)}")
+                    logger.info(f"Chunking completed: source_id={source_id}, chunks={sync['total']}")
                     
                 except Exception as e:
                     logger.error(f"Chunking failed: source_id={source_id}, error={str(e)}", exc_info=True)
@@ -187,129 +256,14 @@ class ParsingService:
                     )
                     return False
                 
+                self._checkpoint_synced(source_id, sync, checkpoint)
+                
                 # Phase 6: Generate embeddings for created chunks
-                try:
-                    from services.embedding_service import EmbeddingService
-                    chunk_texts = [c.get("excerpt", "") for c in created_chunks]
-                    chunk_ids = [c.get("id") for c in created_chunks]
-                    embedding_service = EmbeddingService(access_token=self.access_token)
-                    updated = embedding_service.embed_chunks_for_source(
-                        source_id=source_id,
-                        texts=chunk_texts,
-                        chunk_ids=chunk_ids,
-                    )
-                    logger.info(f"Embeddings updated: source_id={source_id}, chunks={updated}/{len(created_chunks)}")
-                except Exception as e:
-                    logger.error(f"Embedding failed: source_id={source_id}, error={str(e)}", exc_info=True)
-                    self.source_repo.update_source_status(
-                        source_id=source_id,
-                        status=SourceStatus.FAILED.value,
-                        error_message=f"Embedding failed: {str(e)}"
-                    )
-                    return False
-
-                # Update status to indexed (chunking + embeddings complete)
-                self.source_repo.update_source_status(
-                    source_id=source_id,
-                    status=SourceStatus.INDEXED.value
-                )
-
-                return True
+                return self._embed_pending(source_id, checkpoint)
             
             # Handle URL sources (HTML) - Phase 7
             elif source_type == SourceType.HTML.value:
-                try:
-                    from services.crawling.crawler_service import CrawlerService
-                    crawler = CrawlerService(max_depth=1, max_pages=10)
-                    start_url = source.get("original_url") or source.get("canonical_url")
-                    if not start_url:
-                        raise ValueError("Source has no URL")
-                    logger.info(f"Crawl started: source_id={source_id}, url={start_url}")
-                    crawl_result = crawler.crawl_single(start_url)
-                    if not crawl_result.success:
-                        self.source_repo.update_source_status(
-                            source_id=source_id,
-                            status=SourceStatus.FAILED.value,
-                            error_message=f"Crawl failed: {crawl_result.error}"
-                        )
-                        logger.error(f"Crawl failed: source_id={source_id}, error={crawl_result.error}")
-                        return False
-
-                    # Update source with canonical_url and metadata
-                    try:
-                        self.source_repo.update_source_status(
-                            source_id=source_id,
-                            status=SourceStatus.PARSING.value,
-                            error_message=None
-                        )
-                    except Exception:
-                        pass
-
-                    # Use extracted text and continue pipeline (chunk + embed)
-                    extracted_text = crawl_result.text
-                    metadata = {
-                        "etag": crawl_result.metadata.get("etag"),
-                        "last_modified": crawl_result.metadata.get("last_modified"),
-                        "page_checksum": crawl_result.metadata.get("page_checksum"),
-                        "canonical_url": crawl_result.canonical_url,
-                        "title": crawl_result.metadata.get("title"),
-                    }
-
-                    # Derive a fallback title from URL if missing
-                    default_heading = metadata.get("title")
-                    if not default_heading and crawl_result.canonical_url:
-                        default_heading = self._derive_title_from_url(crawl_result.canonical_url)
-
-                    # Log details
-                    text_length = len(extracted_text)
-                    logger.info(f"Crawl completed: source_id={source_id}, url={crawl_result.canonical_url}, chars={text_length}")
-
-                    # Chunk and embed (reuse same flow as files)
-                    logger.debug(f"Chunking started: source_id={source_id}")
-                    created_chunks = self.chunk_service.chunk_and_store_source(
-                        source_id=source_id,
-                        bot_id=bot_id,
-                        text=extracted_text,
-                        source_type=SourceType.HTML,
-                        default_heading=default_heading
-                    )
-                    if not created_chunks:
-                        logger.warning(f"No chunks generated: source_id={source_id}, reason=empty_or_non_extractive")
-                        self.source_repo.update_source_status(
-                            source_id=source_id,
-                            status=SourceStatus.INDEXED.value
-                        )
-                        return True
-                    else:
-                        logger.info(f"Chunking completed: source_id={source_id}, chunks={len(created_chunks)}")
-
-                    # Embeddings
-                    from services.embedding_service import EmbeddingService
-                    chunk_texts = [c.get("excerpt", "") for c in created_chunks]
-                    chunk_ids = [c.get("id") for c in created_chunks]
-                    embedding_service = EmbeddingService(access_token=self.access_token)
-                    updated = embedding_service.embed_chunks_for_source(
-                        source_id=source_id,
-                        texts=chunk_texts,
-                        chunk_ids=chunk_ids,
-                    )
-                    logger.info(f"Embeddings updated: source_id={source_id}, chunks={updated}/{len(created_chunks)}")
-
-                    # Mark indexed
-                    self.source_repo.update_source_status(
-                        source_id=source_id,
-                        status=SourceStatus.INDEXED.value
-                    )
-                    return True
-                except Exception as e:
-                    error_msg = f"Crawl error: {str(e)}"
-                    logger.error(f"Crawl error: source_id={source_id}, error={str(e)}", exc_info=True)
-                    self.source_repo.update_source_status(
-                        source_id=source_id,
-                        status=SourceStatus.FAILED.value,
-                        error_message=error_msg
-                    )
-                    return False
+                return self._ingest_site(source_id, bot_id, source, checkpoint)
             
             else:
                 raise ValueError(f"Unsupported source type: {source_type}")
@@ -330,33 +284,405 @@ class ParsingService:
             
             return False
     
-    def _download_file(self, storage_path: str) -> bytes:
+    def _ingest_site(self, source_id: UUID, bot_id: UUID, source: dict, checkpoint: dict) -> bool:
         """
-        Download file from Supabase Storage.
+        Crawl a URL source's site and index every crawled page.
         
-        Args:
-            storage_path: Path to file in storage bucket (format: bots/{bot_id}/sources/{source_id}/{filename})
+        Pages stream from the crawler into chunking and storage as they are
+        crawled, diffed against the stored chunks, so a re-crawl only inserts
+        and embeds chunks whose text changed. Each chunk records its page URL.
+        Pages the crawler reports unchanged since the last crawl (sitemap
+        lastmod, HTTP 304, same body or text checksum) keep their stored
+        chunks and are never re-embedded; a re-index request re-fetches all.
+        Pages that fail for now (anything but 404/410) keep their chunks too,
+        and a crawl in which no page succeeded changes nothing.
         
         Returns:
-            File content as bytes
+            True if the source was indexed, False otherwise
+        """
+        from services.crawling.crawler_service import CrawlerService
+        from services.crawling.dedup import SiteDeduplicator
+        start_url = source.get("original_url") or source.get("canonical_url")
+        crawl = {
+            "pages": 0, "unchanged": 0, "duplicates": 0, "failed": 0, "error": None,
+            "page_states": [], "known_pages": {},
+        }
+        crawled_at = datetime.now(timezone.utc)
+        
+        try:
+            if not start_url:
+                raise ValueError("Source has no URL")
+            reindex = checkpoint.get("mode") == "reindex"
+            crawl["known_pages"] = self.page_repo.get_pages(source_id)
+            known_pages = {} if reindex else crawl["known_pages"]
+            logger.info(f"Crawl started: source_id={source_id}, url={start_url}, known_pages={len(known_pages)}")
+            pages = CrawlerService().iter_site(start_url, known_pages)
+            dedup = None
+            if settings.crawler_dedup_enabled:
+                boilerplate = [] if reindex else source.get("crawl_boilerplate") or []
+                dedup = SiteDeduplicator(boilerplate, crawl["known_pages"])
+                pages = dedup.process(pages)
+            sync = self.chunk_service.sync_chunks(source_id, bot_id, self._iter_page_chunks(pages, crawl))
+            self.page_repo.save_pages(source_id, bot_id, crawl["page_states"], crawled_at)
+            self._record_crawl(
+                source_id, crawl.get("start_page"), crawled_at, dedup.boilerplate_keys() if dedup else None
+            )
+        except NothingCrawledError:
+            # Reported below; the stored chunks and page states are untouched
+            pass
+        except Exception as e:
+            error_msg = f"Crawl error: {str(e)}"
+            logger.error(f"Crawl error: source_id={source_id}, error={str(e)}", exc_info=True)
+            self.source_repo.update_source_status(
+                source_id=source_id,
+                status=SourceStatus.FAILED.value,
+                error_message=error_msg
+            )
+            return False
+        
+        if not crawl["pages"]:
+            self.source_repo.update_source_status(
+                source_id=source_id,
+                status=SourceStatus.FAILED.value,
+                error_message=f"Crawl failed: {crawl['error']}"
+            )
+            logger.error(f"Crawl failed: source_id={source_id}, error={crawl['error']}")
+            return False
+        
+        logger.info(
+            f"Crawl completed: source_id={source_id}, url={start_url}, pages={crawl['pages']}, "
+            f"unchanged={crawl['unchanged']}, duplicates={crawl['duplicates']}, failed={crawl['failed']}, "
+            f"chunks={sync['total']}"
+        )
+        if not sync["total"]:
+            logger.warning(f"No chunks generated: source_id={source_id}, reason=empty_or_non_extractive")
+            self.source_repo.update_source_status(
+                source_id=source_id,
+                status=SourceStatus.INDEXED.value
+            )
+            return True
+        
+        self._checkpoint_synced(source_id, sync, checkpoint)
+        return self._embed_pending(source_id, checkpoint)
+    
+    def _record_crawl(
+        self,
+        source_id: UUID,
+        start_page: Optional[CrawlResult],
+        crawled_at: datetime,
+        boilerplate: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Store the start page's validators, the crawl time and the site's
+        boilerplate block keys (for the next crawl) on the source (best effort)
+        """
+        fields = {"last_crawled_at": crawled_at.isoformat()}
+        if boilerplate is not None:
+            fields["crawl_boilerplate"] = boilerplate
+        if start_page is not None:
+            last_modified = start_page.metadata.get("last_modified")
+            try:
+                last_modified = parsedate_to_datetime(last_modified).isoformat() if last_modified else None
+            except (TypeError, ValueError):
+                last_modified = None
+            fields.update({
+                "canonical_url": start_page.canonical_url,
+                "etag": start_page.metadata.get("etag"),
+                "last_modified": last_modified,
+                "page_checksum": start_page.metadata.get("page_checksum"),
+            })
+        try:
+            self.source_repo.update_crawl_metadata(source_id, fields)
+        except Exception as e:
+            logger.warning(f"Crawl metadata update skipped: source_id={source_id}, error={str(e)}")
+    
+    def _iter_page_chunks(self, pages: Iterator[CrawlResult], crawl: dict) -> Iterator[Union[TextChunk, KeepPage]]:
+        """
+        Chunk crawled pages one at a time, for sync_chunks.
         
+        Pages without a heading of their own are headed by their title (or
+        one derived from the URL); unchanged pages become KeepPage markers.
+        Failed pages are counted in `crawl` and skipped; a page of the last
+        crawl that failed for now keeps its stored chunks and state. Indexed
+        pages are recorded in crawl["page_states"] for the next crawl.
+
         Raises:
-            ValueError: If file download fails
+            NothingCrawledError: At the end of the stream if no page was
+                crawled, so sync_chunks stops before deleting stored chunks
+        """
+        chunking_service = self.chunk_service.chunking_service
+        for page in pages:
+            if not page.success:
+                crawl["failed"] += 1
+                crawl["error"] = crawl["error"] or page.error
+                logger.info(f"Page skipped: url={page.url}, error={page.error}")
+                previous = crawl["known_pages"].get(page.url)
+                if previous and previous.get("page_url") and not page.metadata.get("gone"):
+                    crawl["page_states"].append({key: previous.get(key) for key in PAGE_STATE_FIELDS})
+                    yield KeepPage(previous["page_url"])
+                continue
+            crawl["pages"] += 1
+            page_url = page.canonical_url
+            if page.unchanged:
+                # Stored chunks are filed under the page_url they were indexed with
+                page_url = (crawl["known_pages"].get(page.url) or {}).get("page_url") or page_url
+            duplicate_of = page.metadata.get("duplicate_of")
+            crawl["page_states"].append({
+                "url": page.url,
+                "page_url": page_url,
+                "lastmod": page.metadata.get("lastmod"),
+                "etag": page.metadata.get("etag"),
+                "last_modified": page.metadata.get("last_modified"),
+                "page_checksum": page.metadata.get("page_checksum"),
+                "body_checksum": page.metadata.get("body_checksum"),
+                "simhash": page.metadata.get("simhash"),
+                "links": page.links,
+            })
+            if duplicate_of:
+                # No validators or checksums: the page is fetched and compared again
+                # next crawl, in case the page it duplicates changed or went away
+                crawl["page_states"][-1].update(
+                    {key: None for key in ("lastmod", "etag", "last_modified", "page_checksum", "body_checksum")}
+                )
+            if page.metadata.get("depth") == 0:
+                crawl["start_page"] = page
+            if page.unchanged:
+                crawl["unchanged"] += 1
+                yield KeepPage(page_url)
+                continue
+            if duplicate_of:
+                crawl["duplicates"] += 1
+                logger.info(f"Page not indexed: url={page.url}, near-duplicate of {duplicate_of}")
+                continue
+            default_heading = page.metadata.get("title") or self._derive_title_from_url(page_url)
+            if page.elements:
+                text_chunks = chunking_service.iter_element_chunks(page.elements)
+            else:
+                text_chunks = chunking_service.chunk_text(page.text, SourceType.HTML.value)
+            for text_chunk in text_chunks:
+                text_chunk.metadata.heading = text_chunk.metadata.heading or default_heading
+                text_chunk.metadata.page_url = page_url
+                yield text_chunk
+        if not crawl["pages"]:
+            raise NothingCrawledError(crawl["error"] or "no pages crawled")
+    
+    def _ingest_stream(
+        self,
+        source_id: UUID,
+        bot_id: UUID,
+        parser,
+        elements: Iterator[DocumentElement],
+        metadata: dict,
+        stage: str,
+        checkpoint: dict
+    ) -> bool:
+        """
+        Chunk, store and embed a lazily produced element stream.
+        
+        Each stage consumes the previous one lazily (pages -> elements ->
+        chunks -> batches), so peak memory is bounded by one page plus one
+        chunk batch regardless of document size. Every stored and embedded
+        batch is checkpointed; a retry re-chunks the document but only
+        stores chunks past the checkpoint.
+        
+        A re-index (checkpoint mode "reindex") diffs the stream against the
+        stored chunks instead; see _reindex_stream.
+        
+        Returns:
+            True if the source was indexed, False otherwise
         """
+        if checkpoint.get("mode") == "reindex":
+            return self._reindex_stream(source_id, bot_id, parser, elements, metadata, checkpoint)
+        
+        from services.embedding_service import EmbeddingService
+        embedding_service = EmbeddingService(access_token=self.access_token)
+        resume_from = checkpoint.get("chunks_stored", 0)
+        chunk_count = 0
+        embedded = 0
+        
         try:
-            # Storage path format: bots/{bot_id}/sources/{source_id}/{filename}
-            # Supabase Storage download uses the full path as stored (same as upload)
-            # Download from sources bucket
-            response = self.storage_client.storage.from_("sources").download(storage_path)
-            
-            if not response:
-                raise ValueError(f"Failed to download file from storage: {storage_path}")
-            
-            return response
-            
+            # Chunks stored after the last checkpoint are re-created below
+            self.chunk_service.repository.delete_chunks_from_index(source_id, resume_from)
+            if resume_from:
+                logger.info(f"Resuming ingestion after chunk {resume_from - 1}: source_id={source_id}")
+            batches = self.chunk_service.iter_store_chunks(
+                source_id,
+                bot_id,
+                elements,
+                resume_from=resume_from,
+                resume_hash=checkpoint.get("last_chunk_hash")
+            )
+            for batch in batches:
+                chunk_count += len(batch)
+                self._checkpoint_stored(source_id, stage, batch, checkpoint)
+                embedded += embedding_service.embed_chunks_for_source(
+                    source_id=source_id,
+                    texts=[c.get("excerpt", "") for c in batch],
+                    chunk_ids=[c.get("id") for c in batch],
+                )
+                checkpoint["embedded_batches"] = checkpoint.get("embedded_batches", 0) + 1
+                self._checkpoint(source_id, stage, checkpoint)
+        except ResumeMismatchError as e:
+            # Parser output isn't reproducible (e.g. OCR cut short by its time
+            # budget); drop the checkpoint so the next attempt starts over
+            logger.warning(f"Ingestion checkpoint discarded: source_id={source_id}, reason={str(e)}")
+            self._checkpoint(source_id, None, {})
+            self.source_repo.update_source_status(
+                source_id=source_id,
+                status=SourceStatus.FAILED.value,
+                error_message="Document changed since the last attempt; ingestion will restart"
+            )
+            return False
+        except Exception as e:
+            logger.error(f"Streaming ingestion failed: source_id={source_id}, error={str(e)}", exc_info=True)
+            self.source_repo.update_source_status(
+                source_id=source_id,
+                status=SourceStatus.FAILED.value,
+                error_message=f"Ingestion failed: {str(e)}"
+            )
+            return False
+        
+        if resume_from + chunk_count == 0:
+            error_message = getattr(parser, "NO_TEXT_MESSAGE", "Document contains no extractable text.")
+            logger.error(f"Parsing failed: source_id={source_id}, error={error_message}")
+            self.source_repo.update_source_status(
+                source_id=source_id,
+                status=SourceStatus.FAILED.value,
+                error_message=error_message
+            )
+            return False
+        
+        logger.info(
+            f"Streaming ingestion completed: source_id={source_id}, pages={metadata.get('page_count')}, "
+            f"chars={metadata.get('total_chars')}, chunks={resume_from + chunk_count}, embedded={embedded}"
+        )
+        self._checkpoint(source_id, IngestStage.CHUNKED.value, checkpoint)
+        # Chunks stored by earlier attempts whose embedding batch failed
+        return self._embed_pending(source_id, checkpoint)
+    
+    def _reindex_stream(
+        self,
+        source_id: UUID,
+        bot_id: UUID,
+        parser,
+        elements: Iterator[DocumentElement],
+        metadata: dict,
+        checkpoint: dict
+    ) -> bool:
+        """
+        Re-index an already indexed source from its element stream.
+        
+        Chunks are matched to the stored ones by content hash, so only new
+        chunks are inserted and embedded; unchanged chunks keep their rows and
+        embeddings. A retry after a partial sync simply diffs again.
+        
+        Returns:
+            True if the source was indexed, False otherwise
+        """
+        try:
+            text_chunks = self.chunk_service.chunking_service.iter_element_chunks(elements)
+            sync = self.chunk_service.sync_chunks(source_id, bot_id, text_chunks)
+        except Exception as e:
+            logger.error(f"Re-indexing failed: source_id={source_id}, error={str(e)}", exc_info=True)
+            self.source_repo.update_source_status(
+                source_id=source_id,
+                status=SourceStatus.FAILED.value,
+                error_message=f"Ingestion failed: {str(e)}"
+            )
+            return False
+        
+        if not sync["total"]:
+            error_message = getattr(parser, "NO_TEXT_MESSAGE", "Document contains no extractable text.")
+            logger.error(f"Parsing failed: source_id={source_id}, error={error_message}")
+            self.source_repo.update_source_status(
+                source_id=source_id,
+                status=SourceStatus.FAILED.value,
+                error_message=error_message
+            )
+            return False
+        
+        logger.info(
+            f"Re-indexing completed: source_id={source_id}, pages={metadata.get('page_count')}, "
+            f"chars={metadata.get('total_chars')}, chunks={sync['total']}"
+        )
+        self._checkpoint_synced(source_id, sync, checkpoint)
+        return self._embed_pending(source_id, checkpoint)
+    
+    def _embed_pending(self, source_id: UUID, checkpoint: dict) -> bool:
+        """
+        Embed the source's chunks that have no embedding yet, then mark it indexed.
+        
+        Only `embedding IS NULL` chunks are fetched (keyset-paginated), so a
+        retry after an embedding failure never re-embeds finished batches.
+        
+        Returns:
+            True if the source was indexed, False otherwise
+        """
+        from services.embedding_service import EmbeddingService
+        embedding_service = EmbeddingService(access_token=self.access_token)
+        chunk_repo = self.chunk_service.repository
+        after_index = -1
+        embedded = 0
+        
+        try:
+            while True:
+                pending = chunk_repo.get_unembedded_chunks(source_id, after_index, embedding_service.batch_size)
+                if not pending:
+                    break
+                embedded += embedding_service.embed_chunks_for_source(
+                    source_id=source_id,
+                    texts=[c.get("excerpt", "") for c in pending],
+                    chunk_ids=[c.get("id") for c in pending],
+                )
+                after_index = pending[-1]["chunk_index"]
+                checkpoint["embedded_batches"] = checkpoint.get("embedded_batches", 0) + 1
+                self._checkpoint(source_id, IngestStage.CHUNKED.value, checkpoint)
+        except Exception as e:
+            logger.error(f"Embedding failed: source_id={source_id}, error={str(e)}", exc_info=True)
+            self.source_repo.update_source_status(
+                source_id=source_id,
+                status=SourceStatus.FAILED.value,
+                error_message=f"Embedding failed: {str(e)}"
+            )
+            return False
+        
+        if embedded:
+            logger.info(f"Embeddings updated: source_id={source_id}, chunks={embedded}")
+        self._checkpoint(source_id, IngestStage.EMBEDDED.value, checkpoint)
+        
+        # Update status to indexed (chunking + embeddings complete)
+        self.source_repo.update_source_status(
+            source_id=source_id,
+            status=SourceStatus.INDEXED.value
+        )
+        return True
+    
+    def _checkpoint_stored(self, source_id: UUID, stage: str, chunks: List[dict], checkpoint: dict) -> None:
+        """Record that chunks up to the last of `chunks` are stored"""
+        if chunks:
+            last = chunks[-1]
+            checkpoint["chunks_stored"] = last.get("chunk_index", 0) + 1
+            checkpoint["last_chunk_hash"] = content_hash(last.get("excerpt", ""))
+        self._checkpoint(source_id, stage, checkpoint)
+    
+    def _checkpoint_synced(self, source_id: UUID, sync: dict, checkpoint: dict) -> None:
+        """Record that the source's chunks match its current content"""
+        checkpoint.pop("mode", None)
+        checkpoint["chunks_stored"] = sync["total"]
+        checkpoint["last_chunk_hash"] = sync["last_chunk_hash"]
+        self._checkpoint(source_id, IngestStage.CHUNKED.value, checkpoint)
+    
+    def _checkpoint(self, source_id: UUID, stage: Optional[str], checkpoint: dict) -> None:
+        """
+        Persist ingestion progress (best effort).
+        
+        A missed write only makes a retry redo more work: chunks past a stale
+        chunks_stored are deleted and re-created.
+        """
+        try:
+            self.source_repo.update_ingest_checkpoint(source_id, stage, checkpoint)
         except Exception as e:
-            logger.error(f"File download failed: path={storage_path}, error={str(e)}")
-            raise ValueError(f"Failed to download file: {str(e)}")
+            logger.warning(f"Ingest checkpoint skipped: source_id={source_id}, stage={stage}, error={str(e)}")
     
     def _get_file_extension(self, file_path: str) -> Optional[str]:
         """
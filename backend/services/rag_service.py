@@ -10,6 +10,7 @@ from services.bot_service import BotService
 from services.plan_service import PlanService
 from repositories.query_repo import QueryRepository
 from repositories.source_repo import SourceRepository
+from models.source_model import FILE_SOURCE_TYPES
 from core.exceptions import ValidationError, DatabaseError
 
 logger = logging.getLogger(__name__)
@@ -155,6 +156,11 @@ class RagService:
                     "heading": c.get("heading"),
                     "score": c.get("similarity"),
                 }
+                if c.get("page_start") is not None:
+                    citation["page_start"] = c.get("page_start")
+                    citation["page_end"] = c.get("page_end")
+                if c.get("page_url"):
+                    citation["page_url"] = c.get("page_url")
                 
                 # Add source info if available
                 if source_info:
@@ -166,7 +172,7 @@ class RagService:
                         "storage_path": source_info.get("storage_path"),
                     }
                     # Extract filename from storage_path for file sources
-                    if source_info.get("source_type") in ["pdf", "docx", "txt"]:
+                    if source_info.get("source_type") in FILE_SOURCE_TYPES:
                         storage_path = source_info.get("storage_path", "")
                         if storage_path:
                             # Extract filename from path like "bots/{bot_id}/sources/{source_id}/{filename}"
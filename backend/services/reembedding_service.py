@@ -0,0 +1,245 @@
+"""
+Re-embedding Service
+
+Migrates existing chunk embeddings to a new embedding model/dimension.
+Chunks are streamed in keyset-paginated pages, re-embedded with bounded
+concurrency into the `embedding_next` shadow column, and then switched in
+atomically so search never mixes two embedding spaces.
+
+Queries and new ingestion always embed with the configured model
+(EMBEDDING_PREFERRED and the provider's model setting), so a single bot can
+only be switched to that model; switching every bot to another model
+requires deploying that configuration alongside the switch.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+import logging
+import time
+
+from config.settings import settings
+from repositories.embedding_migration_repo import EmbeddingMigrationRepository
+from services.embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+# Catch-up passes tried before giving up on switching (chunks keep being
+# embedded by ingestion while a pass runs)
+SWITCH_ATTEMPTS = 5
+
+
+class ReembeddingService:
+    """
+    Service for resumable embedding model migrations.
+
+    Usage:
+        service = ReembeddingService(provider="openai", model="text-embedding-3-large")
+        job = service.start(bot_id=None)
+        service.run(job["id"])
+    """
+
+    def __init__(
+        self,
+        provider: str = settings.embedding_preferred,
+        model: Optional[str] = None,
+        embedding_dimension: int = settings.embedding_dimension,
+        page_size: int = 500,
+        concurrency: int = 4,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            provider: Target provider ("openai", "gemini" or "local")
+            model: Target model (defaults to the configured model for the provider)
+            embedding_dimension: Target embedding dimension
+            page_size: Chunks fetched per page
+            concurrency: Embedding batches in flight at once
+        """
+        model_defaults = {
+            "openai": settings.openai_embedding_model,
+            "gemini": settings.gemini_embedding_model,
+            "local": settings.local_embedding_model,
+        }
+        if provider not in model_defaults:
+            raise ValueError(f"Unknown embedding provider: {provider}")
+
+        self.provider = provider
+        self.model = model or model_defaults[provider]
+        self.embedding_dimension = embedding_dimension
+        self.page_size = page_size
+        self.concurrency = max(1, concurrency)
+        self.repository = EmbeddingMigrationRepository()
+        self.is_configured_model = (
+            provider == settings.embedding_preferred
+            and self.model == model_defaults[provider]
+            and embedding_dimension == settings.embedding_dimension
+        )
+
+        model_kwarg = {"openai": "openai_model", "gemini": "gemini_model", "local": "local_model"}[provider]
+        # No fallback: a migration must produce vectors from exactly one model
+        self.embedding = EmbeddingService(
+            access_token=None,
+            preferred=provider,
+            embedding_dimension=embedding_dimension,
+            fallback=False,
+            **{model_kwarg: self.model},
+        )
+
+    def start(self, bot_id: Optional[UUID] = None) -> Dict[str, Any]:
+        """
+        Create a migration job and clear the shadow column in its scope
+        (rebuilt with the target dimension if that differs).
+
+        Args:
+            bot_id: Bot to migrate, or None for all bots
+
+        Returns:
+            Created job record
+
+        Raises:
+            ValueError: If a single bot would be moved off the configured model
+        """
+        self._check_scope(bot_id)
+        cleared = self.repository.reset_shadow(bot_id, self.embedding_dimension)
+        total = self.repository.count_chunks(bot_id)
+        job = self.repository.create_job(
+            bot_id=bot_id,
+            provider=self.provider,
+            model=self.model,
+            dimension=self.embedding_dimension,
+            total_chunks=total,
+        )
+        logger.info(
+            f"Embedding migration created: job_id={job['id']}, bot_id={bot_id or 'all'}, "
+            f"target={self.provider}:{self.model}, chunks={total}, shadow_cleared={cleared}"
+        )
+        return job
+
+    def _embed_batch(self, batch: List[Dict[str, Any]]) -> int:
+        texts = [c.get("excerpt", "") for c in batch]
+        ids = [c["id"] for c in batch]
+        vectors = self.embedding.embed_texts(texts)
+        return self.embedding.repository.update_chunk_embeddings(ids, vectors, column="embedding_next")
+
+    def _check_scope(self, bot_id: Optional[UUID]) -> None:
+        """Refuse migrations whose vectors queries couldn't be compared with"""
+        if bot_id is not None and not self.is_configured_model:
+            raise ValueError(
+                f"Bot {bot_id} can't be migrated to {self.provider}:{self.model} ({self.embedding_dimension}d): "
+                f"queries and ingestion use the configured model "
+                f"{settings.embedding_preferred} ({settings.embedding_dimension}d) for every bot"
+            )
+
+    def _run_pass(self, job_id: UUID, bot_id: Optional[UUID], cursor: Optional[str], processed: int, started: float, resumed_from: int) -> int:
+        """Process pages after `cursor` until none are left; returns the processed total."""
+        batch_size = self.embedding.batch_size
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while True:
+                page = self.repository.get_pending_chunks(bot_id, cursor, self.page_size)
+                if not page:
+                    return processed
+
+                batches = [page[i : i + batch_size] for i in range(0, len(page), batch_size)]
+                processed += sum(pool.map(self._embed_batch, batches))
+                cursor = page[-1]["id"]
+
+                elapsed = max(time.monotonic() - started, 1e-6)
+                rate = (processed - resumed_from) / elapsed
+                self.repository.update_job(job_id, {
+                    "last_chunk_id": cursor,
+                    "processed_chunks": processed,
+                    "chunks_per_second": round(rate, 2),
+                })
+                logger.info(
+                    f"Embedding migration progress: job_id={job_id}, processed={processed}, "
+                    f"rate={rate:.1f} chunks/s"
+                )
+
+    def _switch(self, job_id: UUID, bot_id: Optional[UUID], processed: int, started: float, resumed_from: int) -> Tuple[int, int]:
+        """Switch columns, embedding chunks that arrived since the last pass first; returns (switched, processed)"""
+        for _ in range(SWITCH_ATTEMPTS):
+            switched = self.repository.switch_column(bot_id)
+            if switched >= 0:
+                return switched, processed
+            logger.info(f"Embedding switch deferred: job_id={job_id}, chunks without shadow vector={-switched}")
+            processed = self._run_pass(job_id, bot_id, None, processed, started, resumed_from)
+        raise RuntimeError(f"Chunks without a shadow vector kept arriving; switch not done after {SWITCH_ATTEMPTS} tries")
+
+    def run(self, job_id: UUID, switch: bool = True) -> Dict[str, Any]:
+        """
+        Run (or resume) a migration job.
+
+        The main pass resumes from the stored cursor. A catch-up pass then picks up
+        chunks inserted while the job ran. When everything in scope has a shadow
+        vector, the column is switched atomically unless `switch` is False; the
+        switch is refused while chunks embedded since the last pass lack one,
+        and another catch-up pass is run for them.
+
+        Args:
+            job_id: Migration job ID
+            switch: Switch search to the new vectors when complete
+
+        Returns:
+            Final job record
+
+        Raises:
+            ValueError: If the job doesn't match the service's target or the
+                shadow column's dimension, or a single bot would be moved off
+                the configured model
+            RuntimeError: If chunks kept arriving without shadow vectors
+                through every switch attempt
+        """
+        job = self.repository.get_job(job_id)
+        if job.get("status") == "switched":
+            logger.info(f"Embedding migration already switched: job_id={job_id}")
+            return job
+        if job.get("provider") != self.provider or job.get("model") != self.model:
+            raise ValueError(
+                f"Job targets {job.get('provider')}:{job.get('model')}, "
+                f"service configured for {self.provider}:{self.model}"
+            )
+        shadow_dimension = self.repository.shadow_dimension()
+        if int(job.get("dimension") or 0) != self.embedding_dimension or shadow_dimension != self.embedding_dimension:
+            raise ValueError(
+                f"Job targets {job.get('dimension')} dimensions, service {self.embedding_dimension}, "
+                f"embedding_next is vector({shadow_dimension}); start a new migration"
+            )
+
+        bot_id = UUID(job["bot_id"]) if job.get("bot_id") else None
+        if switch:
+            self._check_scope(bot_id)
+        processed = resumed_from = int(job.get("processed_chunks") or 0)
+        self.repository.update_job(job_id, {"status": "running", "error_message": None})
+        started = time.monotonic()
+        logger.info(f"Embedding migration running: job_id={job_id}, resume_after={job.get('last_chunk_id')}")
+
+        try:
+            processed = self._run_pass(job_id, bot_id, job.get("last_chunk_id"), processed, started, resumed_from)
+            # Catch-up pass: chunks created during the migration have random ids behind the cursor
+            processed = self._run_pass(job_id, bot_id, None, processed, started, resumed_from)
+            if switch:
+                switched, processed = self._switch(job_id, bot_id, processed, started, resumed_from)
+        except Exception as e:
+            logger.error(f"Embedding migration failed: job_id={job_id}, error={str(e)}", exc_info=True)
+            self.repository.update_job(job_id, {"status": "failed", "error_message": str(e)[:2000]})
+            raise
+
+        fields: Dict[str, Any] = {
+            "status": "completed",
+            "processed_chunks": processed,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if switch:
+            fields["status"] = "switched"
+            logger.info(f"Embedding column switched: job_id={job_id}, bot_id={bot_id or 'all'}, chunks={switched}")
+            if not self.is_configured_model:
+                logger.warning(
+                    f"Search now uses {self.provider}:{self.model} vectors; deploy EMBEDDING_PREFERRED={self.provider}, "
+                    f"its model setting and EMBEDDING_DIMENSION={self.embedding_dimension} so queries and "
+                    f"new ingestion embed with the same model"
+                )
+        self.repository.update_job(job_id, fields)
+        return self.repository.get_job(job_id)
@@ -13,8 +13,10 @@ from urllib.parse import urlparse
 from core.exceptions import ValidationError, NotFoundError, AuthorizationError, DatabaseError
 from repositories.source_repo import SourceRepository
 from services.bot_service import BotService
+from services.ingestion_queue_service import IngestionQueueService
+from services.parse_cache_service import ParseCacheService
 from services.plan_service import PlanService
-from models.source_model import SourceType, SourceStatus
+from models.source_model import FILE_SOURCE_TYPES, SourceType, SourceStatus
 from config.supabasedb import get_supabase_client
 
 logger = logging.getLogger(__name__)
@@ -77,6 +79,7 @@ class SourceService:
         storage_path: str,
         file_size: int,
         mime_type: Optional[str] = None,
+        content_sha256: Optional[str] = None,
     ) -> dict:
         """
         Create a source record for an uploaded file.
@@ -88,6 +91,7 @@ class SourceService:
             storage_path: Path in storage (Supabase Storage/S3)
             file_size: File size in bytes
             mime_type: Optional MIME type
+            content_sha256: sha256 hex digest of the file (parsed-text cache key)
 
         Returns:
             Created source record
@@ -102,7 +106,7 @@ class SourceService:
         bot_service.get_bot(str(bot_id), str(user_id), access_token=self.access_token)
 
         # Validate source type for files
-        if source_type not in (SourceType.PDF, SourceType.DOCX, SourceType.TEXT):
+        if source_type not in FILE_SOURCE_TYPES:
             raise ValidationError(f"Invalid source type for file upload: {source_type}")
 
         # Get user plan to check limits
@@ -111,8 +115,8 @@ class SourceService:
         
         # Check document limit per bot
         existing_sources = self.get_sources_by_bot(bot_id, user_id)
-        # Count document sources (pdf, docx, text) for this bot
-        document_sources = [s for s in existing_sources if s.get("source_type") in ("pdf", "docx", "text")]
+        # Count document (uploaded file) sources for this bot
+        document_sources = [s for s in existing_sources if s.get("source_type") in FILE_SOURCE_TYPES]
         current_doc_count = len(document_sources)
         
         # Check if document limit is exceeded
@@ -148,6 +152,7 @@ class SourceService:
             "status": SourceStatus.UPLOADED.value,
             "file_size": file_size,
             "mime_type": mime_type,
+            "content_sha256": content_sha256,
         }
 
         return self.repository.create_source(source_data)
@@ -267,9 +272,68 @@ class SourceService:
 
         return source
 
+    def reindex_source(self, source_id: UUID, bot_id: UUID, user_id: UUID) -> dict:
+        """
+        Re-index a source from its current content and queue the ingestion job.
+
+        The ingestion run diffs the re-chunked content against the stored
+        chunks, so only new or changed chunks are written and embedded. If the
+        job can't be queued, the source's previous status and checkpoint are
+        restored.
+
+        Args:
+            source_id: ID of the source
+            bot_id: ID of the bot
+            user_id: ID of the user (for authorization)
+
+        Returns:
+            Updated source record
+
+        Raises:
+            AuthorizationError: If user doesn't own the bot
+            NotFoundError: If source not found
+            ValidationError: If the source is being ingested or already queued
+            DatabaseError: If database operation fails
+        """
+        source = self.get_source(source_id, bot_id, user_id)
+        if source.get("status") == SourceStatus.PARSING.value:
+            raise ValidationError("Source is already being indexed")
+
+        queue = IngestionQueueService()
+        if queue.is_queued(source_id):
+            raise ValidationError("Source is already queued for indexing")
+
+        self.repository.update_ingest_checkpoint(source_id, None, {"mode": "reindex"})
+        updated = self.repository.update_source_status(
+            source_id=source_id,
+            status=SourceStatus.UPLOADED.value,
+        )
+        try:
+            queue.enqueue(source_id, bot_id)
+        except ValidationError:
+            # A concurrent request queued it first; its reset stands
+            raise
+        except Exception:
+            self._restore_ingest_state(source)
+            raise
+        logger.info(f"Source re-index requested: source_id={source_id}, bot_id={bot_id}")
+        return updated
+
+    def _restore_ingest_state(self, source: dict) -> None:
+        """Put back a source's status and checkpoint after a failed re-index request"""
+        source_id = source["id"]
+        try:
+            self.repository.update_ingest_checkpoint(
+                source_id, source.get("ingest_stage"), source.get("ingest_checkpoint") or {}
+            )
+            self.repository.update_source_status(source_id=source_id, status=source["status"])
+        except DatabaseError as e:
+            logger.error(f"Source state restore failed: source_id={source_id}, error={str(e)}")
+
     def delete_source(self, source_id: UUID, bot_id: UUID, user_id: UUID) -> bool:
         """
-        Delete a source and its associated file from storage.
+        Delete a source, its file in storage and, if no other source has
+        the same file, its parsed-text cache entries.
 
         Args:
             source_id: ID of the source to delete
@@ -297,7 +361,7 @@ class SourceService:
         source_type = source.get("source_type")
 
         # Delete file from storage if it's a file source (not URL)
-        if source_type in (SourceType.PDF.value, SourceType.DOCX.value, SourceType.TEXT.value) and storage_path:
+        if source_type in FILE_SOURCE_TYPES and storage_path:
             try:
                 # TODO: check why service role and not token?
                 # Use service role to delete from storage (we've already verified ownership)
@@ -322,5 +386,17 @@ class SourceService:
             logger.info(f"Skipping storage deletion for URL source {source_id}")
 
         # Delete the database row
-        return self.repository.delete_source(source_id, bot_id)
+        deleted = self.repository.delete_source(source_id, bot_id)
+
+        # Parsed-text cache entries are shared by identical files (across
+        # bots), so they go only once no other source has the same file
+        content_sha256 = source.get("content_sha256")
+        if deleted and content_sha256:
+            try:
+                if not SourceRepository(use_service_role=True).content_sha256_in_use(content_sha256):
+                    ParseCacheService().purge(content_sha256)
+            except DatabaseError as e:
+                logger.error(f"Parse cache cleanup skipped: sha256={content_sha256}, error={str(e)}")
+
+        return deleted
 
@@ -6,10 +6,14 @@ Provides accurate token estimation for chunking decisions.
 """
 
 import logging
-from typing import Optional
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
+# encode_ordinary_batch starts a thread pool per call; below this many texts
+# a plain loop is cheaper
+MIN_THREADED_BATCH = 8
+
 
 class Tokenizer:
     """
@@ -71,6 +75,33 @@ class Tokenizer:
             # Fallback: rough estimate (1 token ≈ 4 characters)
             return len(text) // 4
     
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens for many texts in one call.
+        
+        tiktoken encodes batches on native threads, so this is much cheaper
+        than calling count_tokens() in a Python loop. Small batches are
+        encoded in a loop, as the thread pool costs more than it saves.
+        
+        Args:
+            texts: Texts to count tokens for
+        
+        Returns:
+            Token count per input text
+        """
+        if not texts:
+            return []
+        
+        try:
+            encoding = self._get_encoding()
+            if len(texts) < MIN_THREADED_BATCH:
+                return [len(encoding.encode_ordinary(text)) for text in texts]
+            return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+        except Exception as e:
+            logger.error(f"Error counting tokens in batch: {str(e)}")
+            # Fallback: rough estimate (1 token ≈ 4 characters)
+            return [len(t) // 4 for t in texts]
+    
     def estimate_tokens(self, text: str) -> int:
         """
         Alias for count_tokens for backwards compatibility.
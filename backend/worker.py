@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Ingestion worker: drains the ingestion job queue (parse, chunk, embed, crawl).
+Run one or more of these next to the API, from the backend directory:
+
+    python worker.py
+    python worker.py --concurrency 4
+"""
+import argparse
+import logging
+import signal
+import sys
+
+from config.settings import settings
+from core.logging import setup_logging
+from services.ingestion_queue_service import IngestionWorker
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run ingestion jobs from the durable job queue")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.ingest_worker_concurrency,
+        help="Jobs run at once by this process",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    worker = IngestionWorker(concurrency=args.concurrency)
+
+    def shutdown(signum, frame):
+        logging.getLogger(__name__).info("Shutdown requested, finishing running jobs...")
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    worker.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,8 +26,36 @@ const ALLOWED_FILE_TYPES = {
     label: "DOCX",
   },
   "text/plain": { ext: ".txt", label: "TXT" },
+  "text/markdown": { ext: ".md", label: "Markdown" },
+  "text/x-markdown": { ext: ".md", label: "Markdown" },
+  "text/html": { ext: ".html", label: "HTML" },
+  "text/csv": { ext: ".csv", label: "CSV" },
+  "text/tab-separated-values": { ext: ".tsv", label: "TSV" },
+  // Windows reports CSV files as Excel
+  "application/vnd.ms-excel": { ext: ".csv", label: "CSV" },
+  "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": {
+    ext: ".xlsx",
+    label: "XLSX",
+  },
+  "application/zip": { ext: ".zip", label: "ZIP" },
+  "application/x-zip-compressed": { ext: ".zip", label: "ZIP" },
+  "application/octet-stream": { ext: "", label: "" },
 };
 
+const VALID_EXTENSIONS = [
+  ".pdf",
+  ".docx",
+  ".txt",
+  ".md",
+  ".markdown",
+  ".html",
+  ".htm",
+  ".csv",
+  ".tsv",
+  ".xlsx",
+  ".zip",
+];
+
 const MAX_FILE_SIZE = 50 * 1024 * 1024; // 50MB
 
 export default function SourceUpload({ botId }: SourceUploadProps) {
@@ -48,9 +76,8 @@ export default function SourceUpload({ botId }: SourceUploadProps) {
 
     // Check file extension
     const ext = "." + file.name.split(".").pop()?.toLowerCase();
-    const validExtensions = [".pdf", ".docx", ".txt"];
-    if (!validExtensions.includes(ext)) {
-      return `File type not allowed. Allowed types: ${validExtensions.join(", ")}`;
+    if (!VALID_EXTENSIONS.includes(ext)) {
+      return `File type not allowed. Allowed types: ${VALID_EXTENSIONS.join(", ")}`;
     }
 
     // Check MIME type if available
@@ -193,12 +220,12 @@ export default function SourceUpload({ botId }: SourceUploadProps) {
                 <span className="text-muted-foreground"> or drag and drop</span>
               </div>
               <p className="text-sm text-muted-foreground">
-                PDF, DOCX, TXT up to 50MB
+                PDF, DOCX, TXT, Markdown, HTML, CSV, XLSX or ZIP up to 50MB
               </p>
               <Input
                 id="file-input"
                 type="file"
-                accept=".pdf,.docx,.txt,application/pdf,application/vnd.openxmlformats-officedocument.wordprocessingml.document,text/plain"
+                accept={VALID_EXTENSIONS.join(",")}
                 onChange={handleFileInput}
                 className="hidden"
               />
@@ -210,7 +237,8 @@ export default function SourceUpload({ botId }: SourceUploadProps) {
         <Alert>
           <AlertCircle className="h-4 w-4" />
           <AlertDescription className="text-sm">
-            <strong>Supported formats:</strong> PDF, DOCX, TXT. Files will be
+            <strong>Supported formats:</strong> PDF, DOCX, TXT, Markdown,
+            HTML, CSV, XLSX, or a ZIP of these for bulk import. Files will be
             processed and indexed automatically after upload.
           </AlertDescription>
         </Alert>
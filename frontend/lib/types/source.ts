@@ -4,7 +4,16 @@
 // TypeScript types matching the backend Pydantic models
 // =====================================================
 
-export type SourceType = "pdf" | "docx" | "html" | "text";
+export type SourceType =
+  | "pdf"
+  | "docx"
+  | "html"
+  | "text"
+  | "markdown"
+  | "html_file"
+  | "csv"
+  | "xlsx"
+  | "zip";
 
 export type SourceStatus = "uploaded" | "parsing" | "indexed" | "failed";
 
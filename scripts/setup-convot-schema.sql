@@ -405,6 +405,8 @@ END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
 -- Function for vector similarity search
+-- (dropped first because the result columns changed when page ranges and page URLs were added)
+DROP FUNCTION IF EXISTS public.search_similar_chunks(UUID, vector(1536), FLOAT, INT);
 CREATE OR REPLACE FUNCTION public.search_similar_chunks(
     bot_uuid UUID,
     query_embedding vector(1536),
@@ -417,6 +419,9 @@ RETURNS TABLE (
     chunk_index INTEGER,
     excerpt TEXT,
     heading TEXT,
+    page_start INTEGER,
+    page_end INTEGER,
+    page_url TEXT,
     similarity FLOAT
 ) AS $$
 BEGIN
@@ -427,6 +432,9 @@ BEGIN
         c.chunk_index,
         c.excerpt,
         c.heading,
+        c.page_start,
+        c.page_end,
+        c.page_url,
         1 - (c.embedding <=> query_embedding) as similarity
     FROM public.chunks c
     WHERE c.bot_id = bot_uuid
@@ -749,7 +757,7 @@ GRANT SELECT ON public.unanswered_queries TO authenticated;
 TypeScript types to add to your project:
 
 export type LLMProvider = 'openai' | 'gemini';
-export type SourceType = 'pdf' | 'docx' | 'html' | 'text';
+export type SourceType = 'pdf' | 'docx' | 'html' | 'text' | 'markdown' | 'html_file' | 'csv' | 'xlsx' | 'zip';
 export type SourceStatus = 'uploaded' | 'parsing' | 'indexed' | 'failed';
 
 export interface Bot {
@@ -854,6 +862,521 @@ export interface RateLimit {
 }
 */
 
+-- =====================================================
+-- 23. CREATE EMBEDDING CACHE TABLE
+-- =====================================================
+
+-- Content-addressed embedding cache shared across sources and bots.
+-- Re-crawled pages, revised uploads and templated boilerplate reuse vectors
+-- for byte-identical chunk texts instead of calling the provider again.
+CREATE TABLE IF NOT EXISTS public.embedding_cache (
+    content_hash TEXT NOT NULL,  -- sha256 hex digest of the chunk text
+    provider TEXT NOT NULL,  -- 'openai' | 'gemini'
+    model TEXT NOT NULL,
+    dimension INTEGER NOT NULL,
+    embedding vector(1536) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    PRIMARY KEY (content_hash, provider, model, dimension)
+);
+
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_created_at ON public.embedding_cache(created_at);
+
+-- Managed by service role only (entries are not owned by a single bot)
+ALTER TABLE public.embedding_cache ENABLE ROW LEVEL SECURITY;
+
+-- =====================================================
+-- 24. EMBEDDING MIGRATIONS (re-embedding into a shadow column)
+-- =====================================================
+
+-- Shadow column filled by re-embedding jobs; search keeps reading `embedding`
+-- until switch_embedding_column() swaps the new vectors in. Its dimension is
+-- set to the migration target's by reset_embedding_shadow().
+ALTER TABLE public.chunks ADD COLUMN IF NOT EXISTS embedding_next vector(1536);
+
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding_next_hnsw ON public.chunks
+    USING hnsw (embedding_next vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64)
+    WHERE embedding_next IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS public.embedding_migrations (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    bot_id UUID REFERENCES public.bots(id) ON DELETE CASCADE,  -- NULL = all bots
+
+    -- Target embedding space
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    dimension INTEGER NOT NULL,
+
+    -- Progress (resumable via last_chunk_id keyset cursor)
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending | running | completed | switched | failed
+    last_chunk_id UUID,
+    processed_chunks INTEGER NOT NULL DEFAULT 0,
+    total_chunks INTEGER NOT NULL DEFAULT 0,
+    chunks_per_second FLOAT,
+    error_message TEXT,
+
+    -- Timestamps
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    finished_at TIMESTAMP WITH TIME ZONE,
+
+    CONSTRAINT valid_migration_status CHECK (status IN ('pending', 'running', 'completed', 'switched', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_embedding_migrations_bot_id ON public.embedding_migrations(bot_id);
+CREATE INDEX IF NOT EXISTS idx_embedding_migrations_status ON public.embedding_migrations(status);
+
+DROP TRIGGER IF EXISTS trigger_embedding_migrations_updated_at ON public.embedding_migrations;
+CREATE TRIGGER trigger_embedding_migrations_updated_at
+    BEFORE UPDATE ON public.embedding_migrations
+    FOR EACH ROW
+    EXECUTE FUNCTION public.handle_updated_at();
+
+-- Managed by service role only (migrations are run by operators)
+ALTER TABLE public.embedding_migrations ENABLE ROW LEVEL SECURITY;
+
+-- Dimension of the shadow column (pgvector keeps it in the type modifier)
+CREATE OR REPLACE FUNCTION public.shadow_embedding_dimension()
+RETURNS INTEGER AS $$
+    SELECT atttypmod FROM pg_attribute
+    WHERE attrelid = 'public.chunks'::regclass AND attname = 'embedding_next' AND NOT attisdropped;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+-- Clear the shadow column before a fresh migration, giving it the target
+-- dimension. Changing the dimension rebuilds the column (and its index), so
+-- it is only done by an all-bots migration; HNSW indexes at most 2000
+-- dimensions, larger vectors are left unindexed until they are switched in.
+DROP FUNCTION IF EXISTS public.reset_embedding_shadow(UUID);
+CREATE OR REPLACE FUNCTION public.reset_embedding_shadow(target_dimension INTEGER, bot_uuid UUID DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    cleared_count INTEGER;
+BEGIN
+    IF public.shadow_embedding_dimension() IS DISTINCT FROM target_dimension THEN
+        IF bot_uuid IS NOT NULL THEN
+            RAISE EXCEPTION 'embedding_next is vector(%), a single bot can''t be migrated to % dimensions',
+                public.shadow_embedding_dimension(), target_dimension;
+        END IF;
+        SELECT COUNT(*) INTO cleared_count FROM public.chunks WHERE embedding_next IS NOT NULL;
+        ALTER TABLE public.chunks DROP COLUMN IF EXISTS embedding_next;
+        EXECUTE format('ALTER TABLE public.chunks ADD COLUMN embedding_next vector(%s)', target_dimension);
+        IF target_dimension <= 2000 THEN
+            -- Unnamed: after a switch, the original index names belong to the other column
+            CREATE INDEX ON public.chunks
+                USING hnsw (embedding_next vector_cosine_ops)
+                WITH (m = 16, ef_construction = 64)
+                WHERE embedding_next IS NOT NULL;
+        END IF;
+        RETURN cleared_count;
+    END IF;
+
+    UPDATE public.chunks
+    SET embedding_next = NULL
+    WHERE embedding_next IS NOT NULL
+    AND (bot_uuid IS NULL OR bot_id = bot_uuid);
+
+    GET DIAGNOSTICS cleared_count = ROW_COUNT;
+    RETURN cleared_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Atomically make the shadow vectors the searched ones.
+-- Global switch renames the columns (O(1), indexes follow their columns) and
+-- keeps the previous vectors in embedding_next for rollback; a per-bot switch
+-- copies the bot's rows in a single statement.
+-- Chunks embedded after the migration's last pass have no shadow vector: with
+-- the table locked against writes, any such chunk in scope cancels the switch
+-- and -N (their number) is returned, so the caller embeds them and retries.
+CREATE OR REPLACE FUNCTION public.switch_embedding_column(bot_uuid UUID DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    switched_count INTEGER;
+    missing_count INTEGER;
+BEGIN
+    IF bot_uuid IS NULL THEN
+        LOCK TABLE public.chunks IN ACCESS EXCLUSIVE MODE;
+    ELSE
+        LOCK TABLE public.chunks IN SHARE ROW EXCLUSIVE MODE;
+    END IF;
+
+    SELECT COUNT(*) INTO missing_count
+    FROM public.chunks
+    WHERE embedding IS NOT NULL
+    AND embedding_next IS NULL
+    AND (bot_uuid IS NULL OR bot_id = bot_uuid);
+    IF missing_count > 0 THEN
+        RETURN -missing_count;
+    END IF;
+
+    IF bot_uuid IS NULL THEN
+        ALTER TABLE public.chunks RENAME COLUMN embedding TO embedding_prev;
+        ALTER TABLE public.chunks RENAME COLUMN embedding_next TO embedding;
+        ALTER TABLE public.chunks RENAME COLUMN embedding_prev TO embedding_next;
+        SELECT COUNT(*) INTO switched_count FROM public.chunks WHERE embedding IS NOT NULL;
+    ELSE
+        UPDATE public.chunks
+        SET embedding = embedding_next,
+            embedding_next = embedding
+        WHERE bot_id = bot_uuid
+        AND embedding_next IS NOT NULL;
+        GET DIAGNOSTICS switched_count = ROW_COUNT;
+    END IF;
+    RETURN switched_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Operators only: callable through PostgREST otherwise, and they bypass RLS
+REVOKE EXECUTE ON FUNCTION public.shadow_embedding_dimension() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.reset_embedding_shadow(INTEGER, UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.switch_embedding_column(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.shadow_embedding_dimension() TO service_role;
+GRANT EXECUTE ON FUNCTION public.reset_embedding_shadow(INTEGER, UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION public.switch_embedding_column(UUID) TO service_role;
+
+-- =====================================================
+-- 25. CHUNK PAGE RANGES (structure-aware chunking)
+-- =====================================================
+
+-- Pages a chunk spans, for citations; NULL for sources without pages
+ALTER TABLE public.chunks ADD COLUMN IF NOT EXISTS page_start INTEGER;
+ALTER TABLE public.chunks ADD COLUMN IF NOT EXISTS page_end INTEGER;
+
+-- =====================================================
+-- 26. SOURCE FILE HASHES (parsed-text cache)
+-- =====================================================
+
+-- sha256 of uploaded files; keys the parsed-text cache stored under
+-- parsed-cache/ in the sources bucket
+ALTER TABLE public.sources ADD COLUMN IF NOT EXISTS content_sha256 TEXT;
+
+-- Deleting a source checks whether any other source has the same file
+-- before purging its parsed-cache/ entries
+CREATE INDEX IF NOT EXISTS idx_sources_content_sha256
+ON public.sources(content_sha256) WHERE content_sha256 IS NOT NULL;
+
+-- =====================================================
+-- 27. ADDITIONAL FILE SOURCE TYPES
+-- =====================================================
+
+-- Uploaded Markdown, HTML, CSV/TSV, XLSX and ZIP (bulk import) files.
+-- 'html' stays the crawled-URL type; uploaded HTML files are 'html_file'.
+ALTER TYPE source_type ADD VALUE IF NOT EXISTS 'markdown';
+ALTER TYPE source_type ADD VALUE IF NOT EXISTS 'html_file';
+ALTER TYPE source_type ADD VALUE IF NOT EXISTS 'csv';
+ALTER TYPE source_type ADD VALUE IF NOT EXISTS 'xlsx';
+ALTER TYPE source_type ADD VALUE IF NOT EXISTS 'zip';
+
+-- Every type except 'html' is a file without a URL. Written without the new
+-- enum literals, which can't be used in the transaction that adds them.
+ALTER TABLE public.sources DROP CONSTRAINT IF EXISTS valid_url;
+ALTER TABLE public.sources ADD CONSTRAINT valid_url CHECK (
+    (source_type <> 'html' AND original_url IS NULL) OR
+    (source_type = 'html' AND original_url IS NOT NULL)
+);
+
+-- =====================================================
+-- 28. INGESTION JOB QUEUE
+-- =====================================================
+
+-- Durable queue for parse/chunk/embed/crawl work, drained by worker processes
+-- (backend/worker.py) instead of the API. Workers claim jobs with
+-- claim_ingestion_job(); a running job whose lease expires (worker crashed or
+-- restarted) becomes claimable again.
+CREATE TABLE IF NOT EXISTS public.ingestion_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    source_id UUID NOT NULL REFERENCES public.sources(id) ON DELETE CASCADE,
+    bot_id UUID NOT NULL REFERENCES public.bots(id) ON DELETE CASCADE,
+
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued | running | succeeded | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),  -- not before (retry backoff)
+    locked_by TEXT,
+    locked_at TIMESTAMP WITH TIME ZONE,  -- lease start, renewed by worker heartbeats
+    last_error TEXT,
+
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    finished_at TIMESTAMP WITH TIME ZONE,
+
+    CONSTRAINT valid_ingestion_job_status CHECK (status IN ('queued', 'running', 'succeeded', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_queued ON public.ingestion_jobs(run_at)
+    WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_running ON public.ingestion_jobs(bot_id, locked_at)
+    WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_source_id ON public.ingestion_jobs(source_id);
+
+-- At most one queued or running job per source, so a re-index can't race a
+-- job already in flight. Older duplicates from before the index are retired.
+UPDATE public.ingestion_jobs j
+SET status = 'failed',
+    last_error = 'Superseded by another job for the same source',
+    locked_by = NULL,
+    locked_at = NULL,
+    finished_at = NOW()
+WHERE j.status IN ('queued', 'running')
+AND EXISTS (
+    SELECT 1 FROM public.ingestion_jobs k
+    WHERE k.source_id = j.source_id
+    AND k.status IN ('queued', 'running')
+    AND (k.status = 'running', k.created_at, k.id) > (j.status = 'running', j.created_at, j.id)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_ingestion_jobs_active_source ON public.ingestion_jobs(source_id)
+    WHERE status IN ('queued', 'running');
+
+DROP TRIGGER IF EXISTS trigger_ingestion_jobs_updated_at ON public.ingestion_jobs;
+CREATE TRIGGER trigger_ingestion_jobs_updated_at
+    BEFORE UPDATE ON public.ingestion_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION public.handle_updated_at();
+
+-- Managed by service role only (enqueued by the API, drained by workers)
+ALTER TABLE public.ingestion_jobs ENABLE ROW LEVEL SECURITY;
+
+-- Claim the next due job. FOR UPDATE SKIP LOCKED lets any number of workers
+-- poll concurrently without claiming the same row. Per-bot fairness: bots
+-- with fewer running jobs go first, and a bot never has more than
+-- max_running_per_bot jobs running, so one bulk upload can't starve others.
+CREATE OR REPLACE FUNCTION public.claim_ingestion_job(
+    worker_id TEXT,
+    lease_seconds INTEGER DEFAULT 300,
+    max_running_per_bot INTEGER DEFAULT 1
+)
+RETURNS SETOF public.ingestion_jobs AS $$
+DECLARE
+    lease_cutoff TIMESTAMP WITH TIME ZONE := NOW() - make_interval(secs => lease_seconds);
+    claimed_id UUID;
+BEGIN
+    WITH running AS (
+        SELECT r.bot_id, COUNT(*) AS running_count
+        FROM public.ingestion_jobs r
+        WHERE r.status = 'running' AND r.locked_at >= lease_cutoff
+        GROUP BY r.bot_id
+    )
+    SELECT j.id INTO claimed_id
+    FROM public.ingestion_jobs j
+    LEFT JOIN running ON running.bot_id = j.bot_id
+    WHERE (
+        (j.status = 'queued' AND j.run_at <= NOW())
+        OR (j.status = 'running' AND j.locked_at < lease_cutoff)
+    )
+    AND COALESCE(running.running_count, 0) < max_running_per_bot
+    ORDER BY COALESCE(running.running_count, 0) ASC, j.run_at ASC
+    LIMIT 1
+    FOR UPDATE OF j SKIP LOCKED;
+
+    IF claimed_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    UPDATE public.ingestion_jobs
+    SET status = 'running',
+        attempts = attempts + 1,
+        locked_by = worker_id,
+        locked_at = NOW()
+    WHERE id = claimed_id
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Workers only: callable through PostgREST otherwise, and it bypasses RLS
+REVOKE EXECUTE ON FUNCTION public.claim_ingestion_job(TEXT, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.claim_ingestion_job(TEXT, INTEGER, INTEGER) TO service_role;
+
+-- =====================================================
+-- 29. RESUMABLE INGESTION CHECKPOINTS
+-- =====================================================
+
+-- Last completed ingestion stage and progress within it, so a retry resumes
+-- instead of re-parsing and duplicating chunks:
+--   ingest_stage: NULL | downloaded | parsed | chunked | embedded
+--   ingest_checkpoint: {"chunks_stored": N, "last_chunk_hash": "...", "embedded_batches": M}
+ALTER TABLE public.sources ADD COLUMN IF NOT EXISTS ingest_stage TEXT;
+ALTER TABLE public.sources ADD COLUMN IF NOT EXISTS ingest_checkpoint JSONB NOT NULL DEFAULT '{}'::jsonb;
+
+-- Resumed embedding only fetches chunks still missing a vector
+CREATE INDEX IF NOT EXISTS idx_chunks_source_unembedded ON public.chunks(source_id, chunk_index)
+    WHERE embedding IS NULL;
+
+-- =====================================================
+-- 30. INCREMENTAL RE-INDEXING
+-- =====================================================
+
+-- sha256 hex of the chunk text. Re-indexing matches re-chunked content to
+-- stored chunks by it, so unchanged chunks keep their rows and embeddings.
+ALTER TABLE public.chunks ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+UPDATE public.chunks
+SET content_hash = encode(sha256(convert_to(excerpt, 'UTF8')), 'hex')
+WHERE content_hash IS NULL;
+
+-- A re-index request sets sources.ingest_checkpoint to {"mode": "reindex"}.
+CREATE INDEX IF NOT EXISTS idx_chunks_source_content_hash ON public.chunks(source_id, content_hash);
+
+-- Move matched chunks to their new positions in one statement. Text and
+-- embedding are left alone; RLS applies (SECURITY INVOKER).
+--   updates: [{"id": ..., "chunk_index": N, "heading": ..., "char_range": {...},
+--              "tokens_estimate": N, "page_start": N, "page_end": N, "page_url": ...}, ...]
+CREATE OR REPLACE FUNCTION public.update_chunk_positions(updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    UPDATE public.chunks c
+    SET chunk_index = u.chunk_index,
+        heading = u.heading,
+        char_range = u.char_range,
+        tokens_estimate = COALESCE(u.tokens_estimate, 0),
+        page_start = u.page_start,
+        page_end = u.page_end,
+        page_url = u.page_url
+    FROM jsonb_to_recordset(updates) AS u(
+        id UUID,
+        chunk_index INTEGER,
+        heading TEXT,
+        char_range JSONB,
+        tokens_estimate INTEGER,
+        page_start INTEGER,
+        page_end INTEGER,
+        page_url TEXT
+    )
+    WHERE c.id = u.id;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- 31. MULTI-PAGE SITE CRAWLS
+-- =====================================================
+
+-- URL sources crawl a whole site into one source; each chunk records the
+-- page it came from so answers can cite the page rather than the start URL.
+ALTER TABLE public.chunks ADD COLUMN IF NOT EXISTS page_url TEXT;
+
+-- =====================================================
+-- 32. CRAWLED PAGE STATE (SITEMAP CHANGE DETECTION)
+-- =====================================================
+
+-- One row per page indexed by a URL source's last site crawl. A page whose
+-- sitemap <lastmod> is not newer than the recorded one is not fetched again;
+-- its chunks are kept. Rows of pages a crawl no longer finds are deleted.
+CREATE TABLE IF NOT EXISTS public.crawled_pages (
+    source_id UUID NOT NULL REFERENCES public.sources(id) ON DELETE CASCADE,
+    bot_id UUID NOT NULL REFERENCES public.bots(id) ON DELETE CASCADE,
+    url TEXT NOT NULL,  -- URL as requested (normalized)
+    page_url TEXT,  -- Final URL after redirects (chunks.page_url)
+    lastmod TIMESTAMP WITH TIME ZONE,  -- Sitemap <lastmod> at crawl time
+    crawled_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (source_id, url)
+);
+
+CREATE INDEX IF NOT EXISTS idx_crawled_pages_bot_id ON public.crawled_pages(bot_id);
+
+ALTER TABLE public.crawled_pages ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can manage own bot crawled pages" ON public.crawled_pages;
+CREATE POLICY "Users can manage own bot crawled pages" ON public.crawled_pages
+    FOR ALL USING (
+        EXISTS (
+            SELECT 1 FROM public.bots b
+            WHERE b.id = crawled_pages.bot_id
+            AND b.created_by = auth.uid()
+        )
+    );
+
+-- =====================================================
+-- 33. CONDITIONAL RE-FETCH AND SCHEDULED URL REFRESH
+-- =====================================================
+
+-- Validators of each crawled page, sent back as If-None-Match /
+-- If-Modified-Since on the next crawl. A 304, the same response body or the
+-- same extracted text keeps the page's chunks without re-extracting,
+-- re-chunking or re-embedding it. links lets an unchanged page still seed
+-- the crawl frontier.
+ALTER TABLE public.crawled_pages ADD COLUMN IF NOT EXISTS etag TEXT;
+ALTER TABLE public.crawled_pages ADD COLUMN IF NOT EXISTS last_modified TEXT;  -- Raw Last-Modified header
+ALTER TABLE public.crawled_pages ADD COLUMN IF NOT EXISTS page_checksum TEXT;  -- sha256 of the extracted text
+ALTER TABLE public.crawled_pages ADD COLUMN IF NOT EXISTS body_checksum TEXT;  -- sha256 of the HTML (not for JS-rendered pages)
+ALTER TABLE public.crawled_pages ADD COLUMN IF NOT EXISTS links JSONB;
+
+ALTER TABLE public.sources ADD COLUMN IF NOT EXISTS last_crawled_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS idx_sources_refresh ON public.sources(COALESCE(last_crawled_at, updated_at))
+    WHERE source_type = 'html' AND status = 'indexed';
+
+-- Queue a refresh crawl for indexed URL sources not crawled within the
+-- interval and without a pending job. Every ingestion worker calls this
+-- periodically; the advisory lock keeps concurrent calls from queueing the
+-- same source twice. The checkpoint is reset so the job crawls again
+-- instead of resuming at the embedding stage.
+CREATE OR REPLACE FUNCTION public.enqueue_url_refreshes(
+    refresh_interval_seconds INTEGER,
+    max_attempts INTEGER DEFAULT 3,
+    batch_limit INTEGER DEFAULT 100
+)
+RETURNS INTEGER AS $$
+DECLARE
+    queued_count INTEGER;
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('enqueue_url_refreshes')) THEN
+        RETURN 0;
+    END IF;
+
+    WITH due AS (
+        SELECT s.id, s.bot_id
+        FROM public.sources s
+        WHERE s.source_type = 'html'
+        AND s.status = 'indexed'
+        AND COALESCE(s.last_crawled_at, s.updated_at) < NOW() - make_interval(secs => refresh_interval_seconds)
+        AND NOT EXISTS (
+            SELECT 1 FROM public.ingestion_jobs j
+            WHERE j.source_id = s.id AND j.status IN ('queued', 'running')
+        )
+        ORDER BY COALESCE(s.last_crawled_at, s.updated_at) ASC
+        LIMIT batch_limit
+    ),
+    reset AS (
+        UPDATE public.sources s
+        SET ingest_stage = NULL,
+            ingest_checkpoint = '{}'::jsonb
+        FROM due
+        WHERE s.id = due.id
+    )
+    INSERT INTO public.ingestion_jobs (source_id, bot_id, max_attempts, status)
+    SELECT due.id, due.bot_id, max_attempts, 'queued'
+    FROM due
+    ON CONFLICT (source_id) WHERE status IN ('queued', 'running') DO NOTHING;
+
+    GET DIAGNOSTICS queued_count = ROW_COUNT;
+    RETURN queued_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Workers only: callable through PostgREST otherwise, and it bypasses RLS
+REVOKE EXECUTE ON FUNCTION public.enqueue_url_refreshes(INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.enqueue_url_refreshes(INTEGER, INTEGER, INTEGER) TO service_role;
+
+-- =====================================================
+-- 34. CROSS-PAGE BOILERPLATE AND NEAR-DUPLICATE PAGES
+-- =====================================================
+
+-- Keys of the text blocks a URL source's last crawl found repeated across
+-- the site's pages (header, nav, footer, cookie banner). The next crawl
+-- strips them from changed pages from the first page on.
+ALTER TABLE public.sources ADD COLUMN IF NOT EXISTS crawl_boilerplate JSONB;
+
+-- SimHash (hex) of each indexed page's cleaned text. Pages within a few bits
+-- of an earlier page are near-duplicates and get no chunks; unchanged pages
+-- keep theirs so new pages are still compared against them.
+ALTER TABLE public.crawled_pages ADD COLUMN IF NOT EXISTS simhash TEXT;
+
 -- =====================================================
 -- SCRIPT COMPLETION
 -- =====================================================
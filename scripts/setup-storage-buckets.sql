@@ -3,7 +3,7 @@
 -- =====================================================
 -- This script creates the necessary storage buckets
 -- for the Convot product, including sources bucket for
--- file uploads (PDF, DOCX, TXT)
+-- file uploads (PDF, DOCX, TXT, Markdown, HTML, CSV, XLSX, ZIP)
 -- =====================================================
 
 -- =====================================================
@@ -17,7 +17,10 @@
 -- - Name: sources
 -- - Public: false (private)
 -- - File size limit: 50MB
--- - Allowed MIME types: application/pdf, application/vnd.openxmlformats-officedocument.wordprocessingml.document, text/plain
+-- - Allowed MIME types: application/pdf, application/vnd.openxmlformats-officedocument.wordprocessingml.document, text/plain,
+--   text/markdown, text/x-markdown, text/html, text/csv, text/tab-separated-values, application/vnd.ms-excel,
+--   application/vnd.openxmlformats-officedocument.spreadsheetml.sheet, application/zip, application/x-zip-compressed,
+--   application/octet-stream, application/gzip (parsed-text cache)
 --
 -- After creating the bucket, run this script to set up policies.
 
@@ -30,7 +33,7 @@ BEGIN
         RAISE NOTICE '- Name: sources';
         RAISE NOTICE '- Public: false (private)';
         RAISE NOTICE '- File size limit: 50MB';
-        RAISE NOTICE '- Allowed MIME types: PDF, DOCX, TXT';
+        RAISE NOTICE '- Allowed MIME types: PDF, DOCX, TXT, Markdown, HTML, CSV, XLSX, ZIP';
     ELSE
         RAISE NOTICE 'Sources bucket found. Creating policies...';
     END IF;